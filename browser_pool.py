@@ -0,0 +1,192 @@
+"""Bounded pool of long-lived headless Chrome sessions.
+
+Launching Chrome dominates cold-path latency, so sessions are kept alive and
+leased out one scrape at a time. A session is health-checked before each
+lease, recycled after a configurable number of page loads, and discarded if
+a scrape raises a browser error (WebDriver or emulation) while holding it.
+Location emulation (timezone + geolocation) is applied through CDP on every
+lease, scoped to that session and never via process-wide state such as
+os.environ['TZ'], so leases for different timezones can run in parallel.
+URL blocking is set once at launch by the factory (see block_urls).
+"""
+from contextlib import contextmanager
+from typing import Optional
+import threading
+import time
+
+
+class EmulationError(RuntimeError):
+    """A Chrome session could not be made to emulate the requested location."""
+
+
+def apply_location_emulation(driver, timezone: str, latitude: Optional[float], longitude: Optional[float]):
+    """Emulate the target location's timezone and geolocation on a Chrome session.
+
+    Both overrides are scoped to the session; without coordinates, any previous
+    geolocation override is cleared. Raises EmulationError if Chrome rejects
+    them or the page's timezone does not change, since scraping with the wrong
+    timezone silently returns another location's horas.
+    """
+    try:
+        driver.execute_cdp_cmd('Emulation.setTimezoneOverride', {'timezoneId': timezone})
+        if latitude is None or longitude is None:
+            driver.execute_cdp_cmd('Emulation.clearGeolocationOverride', {})
+        else:
+            driver.execute_cdp_cmd('Emulation.setGeolocationOverride', {
+                'latitude': latitude,
+                'longitude': longitude,
+                'accuracy': 100
+            })
+        effective = driver.execute_script("return Intl.DateTimeFormat().resolvedOptions().timeZone")
+    except Exception as e:
+        raise EmulationError(f"Could not emulate {timezone}: {e}") from e
+    if effective != timezone:
+        raise EmulationError(f"Session reports timezone {effective!r}, expected {timezone!r}")
+
+
+def block_urls(driver, patterns):
+    """Make a Chrome session refuse requests matching any of the wildcard URL patterns.
+
+    The block list lives on the session's Network domain, so it survives
+    navigations and only needs to be set once per browser.
+    """
+    if not patterns:
+        return
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(patterns)})
+
+
+def reset_session(driver):
+    """Drop cookies and site storage left behind by the previous scrape."""
+    driver.delete_all_cookies()
+    try:
+        driver.execute_cdp_cmd('Storage.clearDataForOrigin', {
+            'origin': 'https://www.drikpanchang.com',
+            'storageTypes': 'all',
+        })
+    except Exception:
+        pass
+
+
+class _Session:
+    """A pooled browser plus its usage bookkeeping."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created = time.monotonic()
+        # A lease may load several pages (retries), so count every driver.get, not every lease
+        get = driver.get
+
+        def counted_get(url):
+            self.pages += 1
+            return get(url)
+
+        driver.get = counted_get
+
+
+class BrowserPool:
+    """Thread-safe pool of at most `size` Chrome sessions."""
+
+    def __init__(self, factory, size: int = 2, max_pages: int = 50, lease_timeout: float = 60.0,
+                 session_errors: tuple = ()):
+        self._factory = factory
+        # Exceptions that mean the browser itself is broken (e.g. WebDriverException); any other
+        # exception from a lease, such as a page failing validation, returns the session to the pool
+        self._session_errors = (EmulationError, *session_errors)
+        self.size = size
+        self.max_pages = max_pages
+        self.lease_timeout = lease_timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._closed = False
+        self._stats = {
+            'launched': 0,
+            'recycled': 0,
+            'crashed': 0,
+            'unhealthy': 0,
+            'leases': 0,
+            'leased': 0,
+        }
+
+    def _healthy(self, session: _Session) -> bool:
+        try:
+            return session.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _quit(self, session: _Session):
+        try:
+            session.driver.quit()
+        except Exception:
+            pass
+
+    def _checkout(self) -> _Session:
+        while True:
+            with self._lock:
+                session = self._idle.pop() if self._idle else None
+            if session is None:
+                driver = self._factory()
+                with self._lock:
+                    self._stats['launched'] += 1
+                return _Session(driver)
+            if self._healthy(session):
+                return session
+            with self._lock:
+                self._stats['unhealthy'] += 1
+            self._quit(session)
+
+    def _checkin(self, session: _Session, broken: bool):
+        if broken or self._closed or session.pages >= self.max_pages:
+            with self._lock:
+                self._stats['crashed' if broken else 'recycled'] += 1
+            self._quit(session)
+            return
+        with self._lock:
+            self._idle.append(session)
+
+    @contextmanager
+    def lease(self, timezone: str, latitude: Optional[float], longitude: Optional[float]):
+        """Lease a browser emulating the given location for the duration of one scrape."""
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        if not self._slots.acquire(timeout=self.lease_timeout):
+            raise TimeoutError(f"No browser available within {self.lease_timeout:.0f}s")
+        session = None
+        broken = False
+        try:
+            session = self._checkout()
+            with self._lock:
+                self._stats['leases'] += 1
+                self._stats['leased'] += 1
+            reset_session(session.driver)
+            apply_location_emulation(session.driver, timezone, latitude, longitude)
+            yield session.driver
+        except self._session_errors:
+            broken = True
+            raise
+        finally:
+            if session is not None:
+                with self._lock:
+                    self._stats['leased'] -= 1
+                self._checkin(session, broken)
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """Return a snapshot of pool usage counters."""
+        with self._lock:
+            return {
+                'size': self.size,
+                'max_pages': self.max_pages,
+                'idle': len(self._idle),
+                **self._stats,
+            }
+
+    def close(self):
+        """Quit all idle browsers; leased ones are quit when returned."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for session in idle:
+            self._quit(session)
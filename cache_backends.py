@@ -0,0 +1,233 @@
+"""Shared (L2) schedule cache backends for multi-instance deployments.
+
+Every replica keeps its own in-memory L1 (hora_cache.TTLCache); a backend
+from this module sits behind it so replicas share schedules, and provides a
+lock so only one replica scrapes a given key at a time. Backends are chosen
+by URL:
+
+    memory://                 in-process (single instance, tests)
+    sqlite:///data/hora.db    SQLite file, shareable by processes on one volume
+    redis://host:6379/0       any Redis-protocol server (needs the redis package)
+"""
+from contextlib import contextmanager
+from typing import Optional
+import json
+import threading
+import time
+import uuid
+
+import hora_cache
+from schedule import DaySchedule, schedule_from_dict, schedule_to_dict
+from schedule_store import ScheduleStore, iso_day
+
+
+class CacheBackend:
+    """Interface shared by all L2 backends."""
+
+    name = "base"
+
+    def __init__(self):
+        self._counter_lock = threading.Lock()
+        self._counters = {'lock_acquired': 0, 'lock_contended': 0, 'lock_timeouts': 0, 'lock_errors': 0}
+
+    def _count(self, counter: str):
+        with self._counter_lock:
+            self._counters[counter] += 1
+
+    def get(self, geoname_id: int, date_str: str) -> Optional[DaySchedule]:
+        raise NotImplementedError
+
+    def put(self, schedule: DaySchedule, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def _acquire(self, name: str, token: str, ttl: float) -> bool:
+        raise NotImplementedError
+
+    def _release(self, name: str, token: str):
+        raise NotImplementedError
+
+    @contextmanager
+    def lock(self, name: str, ttl: float = 90.0, wait: float = 60.0, poll: float = 0.2):
+        """Hold a cross-replica lock on name; yields False if it could not be taken within `wait`.
+
+        The lock expires after `ttl` seconds so a crashed holder cannot block
+        the key forever. An unreachable backend is treated like a timeout, so
+        callers go ahead without the lock rather than failing.
+        """
+        token = uuid.uuid4().hex
+        try:
+            acquired = self._acquire(name, token, ttl)
+            if not acquired:
+                self._count('lock_contended')
+                deadline = time.monotonic() + wait
+                while not acquired and time.monotonic() < deadline:
+                    time.sleep(poll)
+                    acquired = self._acquire(name, token, ttl)
+            self._count('lock_acquired' if acquired else 'lock_timeouts')
+        except Exception as e:
+            print(f"Cache backend lock {name} failed, continuing without it: {e}")
+            self._count('lock_errors')
+            acquired = False
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    self._release(name, token)
+                except Exception as e:
+                    print(f"Cache backend lock {name} could not be released (expires on its own): {e}")
+
+    def compact(self) -> int:
+        """Drop expired entries; returns how many were removed."""
+        return 0
+
+    def stats(self) -> dict:
+        with self._counter_lock:
+            return {'backend': self.name, **self._counters}
+
+    def close(self):
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """In-process backend; only shared between threads of one process."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 4096):
+        super().__init__()
+        self._cache = hora_cache.TTLCache(max_entries=max_entries)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def get(self, geoname_id: int, date_str: str) -> Optional[DaySchedule]:
+        return self._cache.get(f"{geoname_id}_{date_str}")
+
+    def put(self, schedule: DaySchedule, ttl: Optional[float] = None):
+        self._cache.set(f"{schedule.geoname_id}_{schedule.date}", schedule, ttl=ttl)
+
+    def _acquire(self, name: str, token: str, ttl: float) -> bool:
+        now = time.monotonic()
+        with self._locks_guard:
+            holder = self._locks.get(name)
+            if holder and holder[1] > now:
+                return False
+            self._locks[name] = (token, now + ttl)
+            return True
+
+    def _release(self, name: str, token: str):
+        with self._locks_guard:
+            if self._locks.get(name, (None,))[0] == token:
+                del self._locks[name]
+
+    def compact(self) -> int:
+        return self._cache.purge_expired()
+
+    def stats(self) -> dict:
+        return {**super().stats(), **self._cache.stats()}
+
+
+class SQLiteBackend(ScheduleStore, CacheBackend):
+    """ScheduleStore plus a lock table, for processes sharing one volume."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        ScheduleStore.__init__(self, path)
+        CacheBackend.__init__(self)
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS locks (name TEXT PRIMARY KEY, token TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _acquire(self, name: str, token: str, ttl: float) -> bool:
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM locks WHERE name = ? AND expires_at <= ?", (name, now))
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO locks (name, token, expires_at) VALUES (?, ?, ?)",
+                (name, token, now + ttl),
+            ).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return inserted == 1
+
+    def _release(self, name: str, token: str):
+        self._conn().execute("DELETE FROM locks WHERE name = ? AND token = ?", (name, token))
+
+    def stats(self) -> dict:
+        return {**CacheBackend.stats(self), **ScheduleStore.stats(self)}
+
+
+class RedisBackend(CacheBackend):
+    """Backend for any Redis-protocol server; expiry is handled by the server."""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "hora:"):
+        super().__init__()
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("The 'redis' package is required for redis:// cache backends") from e
+        self._redis = redis
+        self._client = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+        self._prefix = prefix
+        self._counters.update({'hits': 0, 'misses': 0, 'writes': 0})
+
+    def _key(self, geoname_id: int, date_str: str) -> str:
+        return f"{self._prefix}schedule:{geoname_id}:{iso_day(date_str)}"
+
+    def get(self, geoname_id: int, date_str: str) -> Optional[DaySchedule]:
+        try:
+            payload = self._client.get(self._key(geoname_id, date_str))
+        except ValueError:
+            return None
+        self._count('hits' if payload else 'misses')
+        return schedule_from_dict(json.loads(payload)) if payload else None
+
+    def put(self, schedule: DaySchedule, ttl: Optional[float] = None):
+        payload = json.dumps(schedule_to_dict(schedule), ensure_ascii=False, separators=(',', ':'))
+        self._client.set(
+            self._key(schedule.geoname_id, schedule.date),
+            payload,
+            ex=max(1, int(ttl)) if ttl is not None else None,
+        )
+        self._count('writes')
+
+    def _acquire(self, name: str, token: str, ttl: float) -> bool:
+        return bool(self._client.set(f"{self._prefix}lock:{name}", token, nx=True, px=int(ttl * 1000)))
+
+    def _release(self, name: str, token: str):
+        # Delete the lock only if we still own it. WATCH/MULTI rather than a Lua
+        # script so servers without scripting support work too.
+        key = f"{self._prefix}lock:{name}"
+        with self._client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                if pipe.get(key) == token.encode():
+                    pipe.multi()
+                    pipe.delete(key)
+                    pipe.execute()
+                else:
+                    pipe.unwatch()
+            except self._redis.WatchError:
+                pass  # Expired and re-taken by someone else meanwhile
+
+    def close(self):
+        self._client.close()
+
+
+def from_url(url: str) -> CacheBackend:
+    """Create a backend from a memory://, sqlite:// or redis:// URL."""
+    scheme = url.split("://", 1)[0].lower()
+    if scheme == "memory":
+        return MemoryBackend()
+    if scheme == "sqlite":
+        return SQLiteBackend(url[len("sqlite://"):])
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported cache backend URL: {url}")
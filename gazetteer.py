@@ -0,0 +1,222 @@
+"""Offline geonames gazetteer: geoname_id → name, coordinates and timezone.
+
+Custom geoname IDs need a timezone (to know what "now" is) and coordinates
+(for the local engine and scrape validation). The gazetteer is a read-only
+SQLite file built from the geonames.org `cities15000.txt` dump (every city
+with more than 15,000 inhabitants, ~30k rows, a few MB). It is opened lazily
+and memory-mapped on first use. Lookups go through the integer primary key,
+and prefix search uses an index on the lower-cased ASCII name.
+
+The live dump changes daily, so the Docker build uses the versioned snapshot
+that the geonamescache package ships as `cities15000.json`; `build` reads
+either format.
+
+    python gazetteer.py build cities15000.txt [--admin1 admin1CodesASCII.txt] [--out data/gazetteer.db]
+    python gazetteer.py build cities15000.json [--out data/gazetteer.db]
+    python gazetteer.py search PREFIX [--db data/gazetteer.db]
+
+Places passed as `seed` (the preset locations) are always available, also
+when no gazetteer file has been built.
+"""
+from typing import NamedTuple, Optional
+import json
+import os
+import sqlite3
+import sys
+import threading
+import unicodedata
+
+SCHEMA = """
+CREATE TABLE places (
+    geoname_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    search_name TEXT NOT NULL,
+    admin1 TEXT NOT NULL,
+    country TEXT NOT NULL,
+    lat REAL NOT NULL,
+    lng REAL NOT NULL,
+    timezone TEXT NOT NULL,
+    population INTEGER NOT NULL
+);
+"""
+SEARCH_INDEX = "CREATE INDEX places_search ON places (search_name, population)"
+
+
+class Place(NamedTuple):
+    geoname_id: int
+    name: str
+    admin1: str
+    country: str
+    lat: float
+    lng: float
+    timezone: str
+    population: int = 0
+
+
+def search_key(name: str) -> str:
+    return name.strip().lower()
+
+
+class Gazetteer:
+    """Read-only geoname lookup backed by a SQLite file, plus in-memory seed places."""
+
+    def __init__(self, path: str, seed=()):
+        self.path = path
+        self._seed = {place.geoname_id: place for place in seed}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._stats = {'lookups': 0, 'found': 0, 'searches': 0}
+
+    @property
+    def available(self) -> bool:
+        """Whether the gazetteer file exists (otherwise only seed places resolve)."""
+        return os.path.exists(self.path)
+
+    def _conn(self) -> Optional[sqlite3.Connection]:
+        # Opened on first use, one connection per thread, read-only
+        conn = getattr(self._local, 'conn', None)
+        if conn is None and self.available:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+            conn.execute("PRAGMA mmap_size = 67108864")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def get(self, geoname_id: int) -> Optional[Place]:
+        """Return the place with this geoname ID, or None."""
+        place = self._seed.get(geoname_id)
+        if place is None:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT geoname_id, name, admin1, country, lat, lng, timezone, population FROM places WHERE geoname_id = ?",
+                (geoname_id,),
+            ).fetchone() if conn else None
+            place = Place(*row) if row else None
+        with self._lock:
+            self._stats['lookups'] += 1
+            self._stats['found'] += place is not None
+        return place
+
+    def search(self, prefix: str, limit: int = 10) -> list:
+        """Places whose name starts with prefix (case-insensitive), most populous first."""
+        key = search_key(prefix)
+        with self._lock:
+            self._stats['searches'] += 1
+        if not key:
+            return []
+        seeded = [place for place in self._seed.values() if search_key(place.name).startswith(key)]
+        conn = self._conn()
+        rows = conn.execute(
+            # A range on the indexed column instead of LIKE, which SQLite cannot always use an index for
+            "SELECT geoname_id, name, admin1, country, lat, lng, timezone, population FROM places "
+            "WHERE search_name >= ? AND search_name < ? ORDER BY population DESC LIMIT ?",
+            (key, key + "\U0010ffff", limit),
+        ).fetchall() if conn else []
+        places = [Place(*row) for row in rows]
+        found = {place.geoname_id for place in places}
+        places += [place for place in seeded if place.geoname_id not in found]
+        return places[:limit]
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        rows = conn.execute("SELECT COUNT(*) FROM places").fetchone()[0] if conn else 0
+        with self._lock:
+            return {'path': self.path, 'available': conn is not None, 'places': rows, 'seeded': len(self._seed), **self._stats}
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+def ascii_name(name: str) -> str:
+    """Strip accents the way geonames' asciiname column does, for dumps that lack it."""
+    return unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+
+
+def build(cities_path: str, out_path: str, admin1_path: str = None) -> int:
+    """Build a gazetteer file from a geonames cities dump (.txt) or geonamescache snapshot (.json).
+
+    Returns the number of places.
+    """
+    admin1_names = {}
+    if admin1_path:
+        with open(admin1_path, encoding='utf-8') as f:
+            for line in f:
+                code, name = line.rstrip('\n').split('\t')[:2]
+                admin1_names[code] = name
+
+    directory = os.path.dirname(os.path.abspath(out_path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = out_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.executescript(SCHEMA)
+
+    def json_rows():
+        with open(cities_path, encoding='utf-8') as f:
+            cities = json.load(f)
+        for city in cities.values():
+            if not city.get('timezone'):
+                continue
+            name, country, admin1 = city['name'], city['countrycode'], city['admin1code']
+            yield (
+                int(city['geonameid']), name, search_key(ascii_name(name) or name),
+                admin1_names.get(f"{country}.{admin1}", admin1), country,
+                float(city['latitude']), float(city['longitude']), city['timezone'], int(city['population'] or 0),
+            )
+
+    def rows():
+        with open(cities_path, encoding='utf-8') as f:
+            for line in f:
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) < 18 or not fields[17]:
+                    continue
+                geoname_id, name, ascii_name = int(fields[0]), fields[1], fields[2]
+                country, admin1 = fields[8], fields[10]
+                yield (
+                    geoname_id, name, search_key(ascii_name or name),
+                    admin1_names.get(f"{country}.{admin1}", admin1), country,
+                    float(fields[4]), float(fields[5]), fields[17], int(fields[14] or 0),
+                )
+
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         json_rows() if cities_path.endswith('.json') else rows())
+    conn.execute(SEARCH_INDEX)
+    count = conn.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+    conn.execute("VACUUM")
+    conn.close()
+    os.replace(tmp_path, out_path)
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or query the offline geonames gazetteer.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="build a gazetteer from a geonames cities dump")
+    build_parser.add_argument("cities", help="path to cities15000.txt (or any cities*.txt dump, or a geonamescache cities*.json)")
+    build_parser.add_argument("--admin1", help="path to admin1CodesASCII.txt, for state/province names")
+    build_parser.add_argument("--out", default="data/gazetteer.db", help="gazetteer file to write")
+    search_parser = commands.add_parser("search", help="prefix-search a gazetteer")
+    search_parser.add_argument("prefix")
+    search_parser.add_argument("--db", default="data/gazetteer.db")
+    search_parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        print(f"Wrote {build(args.cities, args.out, args.admin1)} places to {args.out}")
+    else:
+        gazetteer = Gazetteer(args.db)
+        if not gazetteer.available:
+            sys.exit(f"No gazetteer at {args.db}; run 'python gazetteer.py build' first")
+        for place in gazetteer.search(args.prefix, args.limit):
+            print(f"{place.geoname_id:>9}  {place.name}, {place.admin1}, {place.country}  "
+                  f"({place.lat:.4f}, {place.lng:.4f}) {place.timezone}  pop {place.population:,}")
@@ -0,0 +1,136 @@
+"""Bounded in-process cache with LRU eviction and per-entry TTL."""
+from collections import OrderedDict
+import sys
+import threading
+import time
+
+
+def estimate_size(value) -> int:
+    """Approximate the memory held by a value built from tuples, lists, dicts and scalars."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (tuple, list)):
+        size += sum(estimate_size(v) for v in value)
+    return size
+
+
+class TTLCache:
+    """Thread-safe LRU cache bounded by entry count and approximate bytes.
+
+    Each entry carries its own TTL (None for no expiry) and an optional
+    stale window after it: a stale entry is a miss for get() but can still be
+    read with get_stale() until the window closes, when it is dropped. The
+    least recently used entries are evicted whenever a write pushes the cache
+    past `max_entries` or `max_bytes`.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = None, default_ttl: float = None, sizeof=estimate_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._sizeof = sizeof
+        self._entries = OrderedDict()  # key -> (value, expires_at, stale_until, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stale_hits': 0, 'evictions': 0, 'expirations': 0}
+
+    def _remove(self, key):
+        _, _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key, default=None):
+        """Return the live value for key, refreshing its LRU position."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return default
+            value, expires_at, stale_until, _ = entry
+            now = time.monotonic()
+            if expires_at is not None and now >= expires_at:
+                if now >= stale_until:
+                    self._remove(key)
+                    self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def get_stale(self, key):
+        """Return (value, seconds past expiry) for a fresh or stale entry, or None.
+
+        Fresh entries report 0 seconds; does not touch hit/miss counters.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, stale_until, _ = entry
+            now = time.monotonic()
+            if expires_at is None or now < expires_at:
+                return value, 0.0
+            if now < stale_until:
+                self._stats['stale_hits'] += 1
+                return value, now - expires_at
+            return None
+
+    def set(self, key, value, ttl: float = None, stale_ttl: float = 0):
+        """Store value under key for ttl seconds (default_ttl if omitted, None for no expiry).
+
+        After expiring, the value stays readable through get_stale() for stale_ttl seconds.
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        stale_until = expires_at + stale_ttl if expires_at is not None else None
+        size = self._sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, stale_until, size)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            value = self._entries[key][0]
+            self._remove(key)
+            return value
+
+    def purge_expired(self) -> int:
+        """Drop every entry past its stale window; returns how many were removed."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, (_, expires_at, stale_until, _) in self._entries.items()
+                       if expires_at is not None and now >= stale_until]
+            for key in expired:
+                self._remove(key)
+            self._stats['expirations'] += len(expired)
+        return len(expired)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Return a snapshot of size and hit/miss counters."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                **self._stats,
+            }
@@ -0,0 +1,91 @@
+"""iCalendar (RFC 5545) rendering of hora events.
+
+Event times are written in UTC, so no VTIMEZONE block is needed. The output
+depends only on the events, with no generation timestamp (DTSTAMP is the
+event's start), so equal inputs render to byte-identical feeds. That keeps
+the feed's strong ETag stable across renders and replicas.
+"""
+from datetime import datetime, timezone
+from typing import NamedTuple
+import hashlib
+
+PRODID = "-//HoraDetails//Hora Calendar//EN"
+MAX_LINE_OCTETS = 75
+
+
+class Event(NamedTuple):
+    uid: str
+    start_epoch: int
+    end_epoch: int
+    summary: str
+    description: str = ""
+    categories: str = ""
+
+
+def escape(text: str) -> str:
+    """Escape a TEXT property value."""
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def fold(line: str) -> str:
+    """Fold a content line into chunks of at most 75 octets, without splitting UTF-8 sequences."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= MAX_LINE_OCTETS:
+        return line
+    parts, start, limit = [], 0, MAX_LINE_OCTETS
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1  # Back off to the start of a multi-byte character
+        parts.append(encoded[start:end].decode('utf-8'))
+        start, limit = end, MAX_LINE_OCTETS - 1  # Continuation lines start with a space
+    return "\r\n ".join(parts)
+
+
+def _utc(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def render(name: str, events, refresh_seconds: int = 3600) -> bytes:
+    """Return a VCALENDAR with one VEVENT per event, as UTF-8 bytes with CRLF line endings."""
+    refresh = f"PT{max(1, refresh_seconds // 60)}M"
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape(name)}",
+        f"REFRESH-INTERVAL;VALUE=DURATION:{refresh}",
+        f"X-PUBLISHED-TTL:{refresh}",
+    ]
+    for event in events:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{event.uid}",
+            f"DTSTAMP:{_utc(event.start_epoch)}",
+            f"DTSTART:{_utc(event.start_epoch)}",
+            f"DTEND:{_utc(event.end_epoch)}",
+            f"SUMMARY:{escape(event.summary)}",
+        ]
+        if event.description:
+            lines.append(f"DESCRIPTION:{escape(event.description)}")
+        if event.categories:
+            lines.append(f"CATEGORIES:{escape(event.categories)}")
+        lines += ["TRANSP:TRANSPARENT", "END:VEVENT"]
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(fold(line) for line in lines) + "\r\n").encode('utf-8')
+
+
+def etag(body: bytes) -> str:
+    """Strong entity tag for a rendered feed."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str, current: str) -> bool:
+    """Whether an If-None-Match header value matches `current` (weak comparison, as RFC 9110 requires)."""
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == current for tag in tags)
@@ -0,0 +1,107 @@
+"""Local hora engine - computes planetary hours from sunrise/sunset.
+
+The hora schedule for a day follows directly from three sun events and the
+weekday lord: the 12 day horas split sunrise → sunset evenly, the 12 night
+horas split sunset → next sunrise, and the lords advance in Chaldean order
+starting from the lord of the weekday. Sun positions use the NOAA solar
+calculator formulas (accurate to about a minute for non-polar latitudes).
+"""
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import math
+
+# Sun's upper limb on the horizon, corrected for atmospheric refraction
+SUNRISE_ZENITH = 90.833
+
+# Successive horas follow the Chaldean order (Saturn → Jupiter → Mars → Sun →
+# Venus → Mercury → Moon), so starting from the Sun the sequence is:
+CHALDEAN_ORDER = ["Sun", "Venus", "Mercury", "Moon", "Saturn", "Jupiter", "Mars"]
+
+# Lord of the first hora of each weekday (Monday == 0, as in date.weekday())
+WEEKDAY_LORDS = ["Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Sun"]
+
+
+def _julian_century(jd: float) -> float:
+    return (jd - 2451545.0) / 36525.0
+
+
+def _sun_params(t: float) -> tuple:
+    """Return (declination in degrees, equation of time in minutes) at julian century t."""
+    l0 = (280.46646 + t * (36000.76983 + t * 0.0003032)) % 360
+    m = 357.52911 + t * (35999.05029 - 0.0001537 * t)
+    e = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+    m_rad = math.radians(m)
+    center = (math.sin(m_rad) * (1.914602 - t * (0.004817 + 0.000014 * t))
+              + math.sin(2 * m_rad) * (0.019993 - 0.000101 * t)
+              + math.sin(3 * m_rad) * 0.000289)
+    omega = math.radians(125.04 - 1934.136 * t)
+    apparent_long = math.radians(l0 + center - 0.00569 - 0.00478 * math.sin(omega))
+    seconds = 21.448 - t * (46.8150 + t * (0.00059 - t * 0.001813))
+    obliquity = math.radians(23.0 + (26.0 + seconds / 60.0) / 60.0 + 0.00256 * math.cos(omega))
+
+    declination = math.degrees(math.asin(math.sin(obliquity) * math.sin(apparent_long)))
+
+    y = math.tan(obliquity / 2) ** 2
+    l0_rad = math.radians(l0)
+    eq_time = (y * math.sin(2 * l0_rad)
+               - 2 * e * math.sin(m_rad)
+               + 4 * e * y * math.sin(m_rad) * math.cos(2 * l0_rad)
+               - 0.5 * y * y * math.sin(4 * l0_rad)
+               - 1.25 * e * e * math.sin(2 * m_rad))
+    return declination, math.degrees(eq_time) * 4
+
+
+def _sun_event_utc_minutes(jd: float, lat: float, lng: float, rising: bool) -> float:
+    """Minutes after 00:00 UTC of julian day `jd` at which the sun rises (or sets)."""
+    minutes = 720 - 4 * lng
+    # Two refinement passes: evaluate the sun's position at the estimated event time
+    for _ in range(2):
+        declination, eq_time = _sun_params(_julian_century(jd + minutes / 1440.0))
+        lat_rad = math.radians(lat)
+        dec_rad = math.radians(declination)
+        cos_ha = (math.cos(math.radians(SUNRISE_ZENITH)) / (math.cos(lat_rad) * math.cos(dec_rad))
+                  - math.tan(lat_rad) * math.tan(dec_rad))
+        if not -1.0 <= cos_ha <= 1.0:
+            raise ValueError(f"The sun does not rise or set at latitude {lat} on this date")
+        hour_angle = math.degrees(math.acos(cos_ha))
+        delta = lng + hour_angle if rising else lng - hour_angle
+        minutes = 720 - 4 * delta - eq_time
+    return minutes
+
+
+def sun_times(day: date, lat: float, lng: float, timezone_str: str) -> tuple:
+    """Return (sunrise, sunset) for a local date as timezone-aware datetimes."""
+    jd = day.toordinal() + 1721424.5  # julian day at 00:00 UTC
+    midnight_utc = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    tz = ZoneInfo(timezone_str)
+    sunrise = midnight_utc + timedelta(minutes=_sun_event_utc_minutes(jd, lat, lng, True))
+    sunset = midnight_utc + timedelta(minutes=_sun_event_utc_minutes(jd, lat, lng, False))
+    return sunrise.astimezone(tz), sunset.astimezone(tz)
+
+
+def compute_horas(day: date, lat: float, lng: float, timezone_str: str) -> list:
+    """Compute the 24 horas of a Vedic day (sunrise → next sunrise).
+
+    Returns a list of (planet, start, end) tuples with timezone-aware datetimes;
+    the first 12 are day horas, the last 12 night horas.
+    """
+    # Arithmetic on aware datetimes sharing a tzinfo is wall-clock arithmetic, which
+    # is an hour off across a DST change, so the boundaries are computed in UTC
+    sunrise, sunset = (t.astimezone(timezone.utc) for t in sun_times(day, lat, lng, timezone_str))
+    next_sunrise = sun_times(day + timedelta(days=1), lat, lng, timezone_str)[0].astimezone(timezone.utc)
+    tz = ZoneInfo(timezone_str)
+
+    day_length = (sunset - sunrise) / 12
+    night_length = (next_sunrise - sunset) / 12
+    first = CHALDEAN_ORDER.index(WEEKDAY_LORDS[day.weekday()])
+
+    horas = []
+    for i in range(24):
+        if i < 12:
+            start = sunrise + day_length * i
+            end = sunrise + day_length * (i + 1) if i < 11 else sunset
+        else:
+            start = sunset + night_length * (i - 12)
+            end = sunset + night_length * (i - 11) if i < 23 else next_sunrise
+        horas.append((CHALDEAN_ORDER[(first + i) % 7], start.astimezone(tz), end.astimezone(tz)))
+    return horas
@@ -0,0 +1,218 @@
+"""Columnar export of stored schedules for analytics (Parquet or CSV).
+
+Every hora becomes one row: geoname_id, location, date, slot (0-23),
+planet code (an index into schedule.PLANETS) and start/end as UTC epoch
+seconds. Schedules are read from a ScheduleStore in (geoname_id, day) order
+and handled one location-month at a time, so memory does not grow with the
+range. Exports to a directory are partitioned Hive-style by location and month:
+
+    out/geoname_id=4671654/month=2026-01/part.parquet
+
+Parquet needs the optional pyarrow package; CSV needs nothing extra.
+
+    python hora_export.py data/hora.db exports/ --start 01/01/2026 --end 31/12/2026 [--format csv]
+"""
+from datetime import datetime, timedelta
+from itertools import groupby
+from zoneinfo import ZoneInfo
+import csv
+import io
+import os
+
+from schedule import DaySchedule
+
+FORMATS = ("parquet", "csv")
+COLUMNS = ("geoname_id", "location", "date", "slot", "planet", "start_epoch", "end_epoch")
+MEDIA_TYPES = {"parquet": "application/vnd.apache.parquet", "csv": "text/csv"}
+
+
+def require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("The 'pyarrow' package is required for Parquet exports") from e
+    return pyarrow
+
+
+def slot_epochs(schedule: DaySchedule, timezone_str: str) -> list:
+    """Return (start, end) UTC epoch seconds for each slot.
+
+    Slots store minutes since local midnight; a slot starting earlier in the
+    clock than the one before it has crossed into the next day.
+    """
+    tz = ZoneInfo(timezone_str)
+    midnight = datetime.strptime(schedule.date, "%d/%m/%Y").replace(tzinfo=tz)
+    epochs = []
+    day_offset, previous = 0, -1
+    for start, end in zip(schedule.starts, schedule.ends):
+        if start < previous:
+            day_offset += 1
+        previous = start
+        end_offset = day_offset + (end < start)
+        epochs.append((
+            int((midnight + timedelta(days=day_offset, minutes=start)).timestamp()),
+            int((midnight + timedelta(days=end_offset, minutes=end)).timestamp()),
+        ))
+    return epochs
+
+
+def partitions(schedules, timezone_for):
+    """Group (geoname_id, day)-ordered schedules into ((geoname_id, 'YYYY-MM'), columns) partitions.
+
+    `timezone_for(geoname_id)` returns the location's timezone, or None to skip it.
+    Columns are a dict of lists keyed by COLUMNS.
+    """
+    def key(schedule):
+        _, month, year = schedule.date.split("/")
+        return schedule.geoname_id, f"{year}-{month}"
+
+    for (geoname_id, month), group in groupby(schedules, key=key):
+        timezone_str = timezone_for(geoname_id)
+        if timezone_str is None:
+            continue
+        columns = {name: [] for name in COLUMNS}
+        for schedule in group:
+            iso = datetime.strptime(schedule.date, "%d/%m/%Y").date()
+            for slot, ((start, end), planet) in enumerate(zip(slot_epochs(schedule, timezone_str), schedule.planets)):
+                columns['geoname_id'].append(geoname_id)
+                columns['location'].append(schedule.location)
+                columns['date'].append(iso)
+                columns['slot'].append(slot)
+                columns['planet'].append(planet)
+                columns['start_epoch'].append(start)
+                columns['end_epoch'].append(end)
+        yield (geoname_id, month), columns
+
+
+def _arrow_table(columns: dict):
+    pa = require_pyarrow()
+    return pa.table({
+        'geoname_id': pa.array(columns['geoname_id'], pa.int32()),
+        'location': pa.array(columns['location'], pa.string()).dictionary_encode(),
+        'date': pa.array(columns['date'], pa.date32()),
+        'slot': pa.array(columns['slot'], pa.uint8()),
+        'planet': pa.array(columns['planet'], pa.uint8()),
+        'start_epoch': pa.array(columns['start_epoch'], pa.int64()),
+        'end_epoch': pa.array(columns['end_epoch'], pa.int64()),
+    })
+
+
+def _csv_rows(columns: dict, header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(COLUMNS)
+    writer.writerows(zip(*(columns[name] for name in COLUMNS)))
+    return buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object collecting bytes until they are taken with drain()."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def stream(schedules, timezone_for, fmt: str = "csv"):
+    """Yield one Parquet or CSV file as byte chunks, one location-month at a time.
+
+    The Parquet file gets a row group per location-month.
+    """
+    if fmt == "csv":
+        header = True
+        for _, columns in partitions(schedules, timezone_for):
+            yield _csv_rows(columns, header).encode('utf-8')
+            header = False
+        if header:
+            yield _csv_rows({name: [] for name in COLUMNS}, True).encode('utf-8')
+        return
+
+    pa = require_pyarrow()
+    sink = _ChunkSink()
+    writer = None
+    for _, columns in partitions(schedules, timezone_for):
+        table = _arrow_table(columns)
+        if writer is None:
+            writer = pa.parquet.ParquetWriter(sink, table.schema, compression='zstd')
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is None:
+        writer = pa.parquet.ParquetWriter(sink, _arrow_table({name: [] for name in COLUMNS}).schema, compression='zstd')
+    writer.close()
+    yield sink.drain()
+
+
+def export_directory(schedules, timezone_for, out_dir: str, fmt: str = "parquet") -> dict:
+    """Write one file per location-month under out_dir; returns {'files': n, 'rows': n}."""
+    if fmt == "parquet":
+        pa = require_pyarrow()
+    written = {'files': 0, 'rows': 0}
+    for (geoname_id, month), columns in partitions(schedules, timezone_for):
+        directory = os.path.join(out_dir, f"geoname_id={geoname_id}", f"month={month}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part.{fmt}")
+        tmp_path = path + ".tmp"
+        if fmt == "parquet":
+            pa.parquet.write_table(_arrow_table(columns), tmp_path, compression='zstd')
+        else:
+            with open(tmp_path, "w", encoding='utf-8', newline="") as f:
+                f.write(_csv_rows(columns, True))
+        os.replace(tmp_path, path)
+        written['files'] += 1
+        written['rows'] += len(columns['slot'])
+    return written
+
+
+if __name__ == "__main__":
+    import argparse
+    import functools
+    import sys
+
+    import locations
+    from schedule_store import ScheduleStore
+
+    parser = argparse.ArgumentParser(description="Export stored hora schedules as partitioned Parquet or CSV files.")
+    parser.add_argument("store", help="SQLite schedule store (HORA_STORE_PATH)")
+    parser.add_argument("out", help="output directory")
+    parser.add_argument("--start", required=True, help="first day, DD/MM/YYYY")
+    parser.add_argument("--end", required=True, help="last day, DD/MM/YYYY")
+    parser.add_argument("--geoname-id", type=int, action="append", help="only these locations (repeatable)")
+    parser.add_argument("--format", choices=FORMATS, default="parquet")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.store):
+        sys.exit(f"No schedule store at {args.store}")
+
+    # Timezones come from the presets and the gazetteer, as for the API
+    @functools.lru_cache(maxsize=None)
+    def timezone_for(geoname_id):
+        place = locations.GAZETTEER.get(geoname_id)
+        if place is None:
+            print(f"Skipping geoname_id {geoname_id}: not in the gazetteer", file=sys.stderr)
+        return place.timezone if place else None
+
+    store = ScheduleStore(args.store)
+    try:
+        written = export_directory(store.iter_range(args.start, args.end, args.geoname_id), timezone_for, args.out, args.format)
+    except (RuntimeError, ValueError) as e:
+        sys.exit(str(e))
+    finally:
+        store.close()
+    print(f"Wrote {written['rows']:,} rows in {written['files']:,} files to {args.out}")
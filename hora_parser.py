@@ -0,0 +1,222 @@
+"""Single-pass parser for Drik Panchang hora pages.
+
+The page source is several hundred KB, of which the hora table is a few KB.
+Instead of running lazy `.*?` DOTALL patterns over the whole document (which
+rescan the remainder of the page for every row, and the entire page when a
+row is malformed), the parser walks the source once with str.find: it jumps
+from one `dpVerticalMiddleText` cell to the next and matches an anchored
+pattern against just that cell's content.
+
+    python hora_parser.py fixtures/*.html              # print what was parsed
+    python hora_parser.py --bench fixtures/*.html      # time against the legacy regexes
+"""
+from typing import NamedTuple, Optional
+import html
+import re
+
+from schedule import HoraSlot
+
+PLANETS = ("Jupiter", "Mars", "Sun", "Venus", "Mercury", "Moon", "Saturn")
+NATURES = ("Fruitful", "Aggressive", "Vigorous", "Beneficial", "Quick", "Gentle", "Sluggish")
+
+CELL_MARKER = 'class="dpVerticalMiddleText"'
+RUNNING_HORA_MARKER = "Running Hora"
+RUNNING_HORA_TITLE_MARKER = 'class="dpPHeaderLeftTitle"'
+
+# Upper bounds on how far past a marker the parser looks, so a page that is
+# missing the closing markup costs a fixed amount of work, not a page scan
+MAX_CELL_CHARS = 1024
+MAX_RUNNING_HORA_CHARS = 2048
+
+# Browser-side readiness check for execute_script(TABLE_READY_SCRIPT, expect_running_hora).
+# The page ships its layout with `--:--` placeholders before the times are filled in, so
+# counting cells is not enough: wait for 24 time cells, no placeholders, and for today a
+# non-empty "Running Hora" title.
+TABLE_READY_SCRIPT = r"""
+const cells = document.querySelectorAll('span.dpVerticalMiddleText');
+let times = 0;
+for (const cell of cells) {
+    if (/^\s*\d{1,2}:\d{2}/.test(cell.textContent)) times++;
+}
+if (times < 24 || document.querySelector('.dpPlaceholder')) return false;
+if (!arguments[0]) return true;
+const title = document.querySelector('.dpPHeaderLeftTitle');
+return !!title && title.textContent.trim() !== '';
+"""
+
+_TAG = re.compile(r'<[^>]*>')
+# Anchored at the start of a cell's content; `(?:<[^>]*>\s*)*` skips the inline <span>s between
+# tokens without ever matching past a '>'
+_TAGS = r'\s*(?:<[^>]*>\s*)*'
+_PLANET_CELL = re.compile(rf'\s*({"|".join(PLANETS)})\s*-\s*({"|".join(NATURES)})\b')
+_TIME_RANGE = re.compile(
+    rf'\s*(\d{{1,2}}):(\d{{2}}){_TAGS}([AP]M){_TAGS}to{_TAGS}(\d{{1,2}}):(\d{{2}}){_TAGS}([AP]M)'
+)
+
+
+class ParsedPage(NamedTuple):
+    """Everything the service reads from a hora page."""
+    title: str
+    slots: tuple
+    running_hora: Optional[HoraSlot]
+
+
+def _minutes(hour: str, minute: str, ampm: str) -> int:
+    hour = int(hour) % 12 + (12 if ampm == 'PM' else 0)
+    return hour * 60 + int(minute)
+
+
+def _text(fragment: str) -> str:
+    return html.unescape(_TAG.sub(' ', fragment))
+
+
+def _time_range(match) -> tuple:
+    h1, m1, ampm1, h2, m2, ampm2 = match.groups()
+    return _minutes(h1, m1, ampm1), _minutes(h2, m2, ampm2)
+
+
+def parse_title(page_source: str) -> str:
+    """Return the document <title>, or "" if there is none."""
+    start = page_source.find('<title')
+    if start == -1:
+        return ""
+    start = page_source.find('>', start) + 1
+    end = page_source.find('</title>', start)
+    if start == 0 or end == -1:
+        return ""
+    return html.unescape(page_source[start:end].strip())
+
+
+def parse_slots(page_source: str, start: int = 0) -> tuple:
+    """Return the hora table as HoraSlots, in page order."""
+    slots = []
+    pending = None  # (planet, nature) of a planet cell awaiting its time cell
+    pos = page_source.find(CELL_MARKER, start)
+    while pos != -1:
+        content_start = page_source.find('>', pos) + 1
+        next_pos = page_source.find(CELL_MARKER, content_start, content_start + MAX_CELL_CHARS)
+        content_end = next_pos if next_pos != -1 else min(len(page_source), content_start + MAX_CELL_CHARS)
+        planet_match = _PLANET_CELL.match(page_source, content_start, content_end)
+        if planet_match:
+            pending = planet_match.groups()
+        elif pending is not None:
+            times = _TIME_RANGE.match(page_source, content_start, content_end)
+            if times:
+                slots.append(HoraSlot(pending[0], pending[1], *_time_range(times)))
+            pending = None
+
+        pos = next_pos if next_pos != -1 else page_source.find(CELL_MARKER, content_end)
+    return tuple(slots)
+
+
+def parse_running_hora(page_source: str) -> Optional[HoraSlot]:
+    """Return the "Running Hora" block's slot, shown only on the location's current date."""
+    pos = page_source.find(RUNNING_HORA_MARKER)
+    if pos == -1:
+        return None
+    pos = page_source.find(RUNNING_HORA_TITLE_MARKER, pos, pos + MAX_RUNNING_HORA_CHARS)
+    if pos == -1:
+        return None
+    title_start = page_source.find('>', pos) + 1
+    title_end = page_source.find('</div>', title_start, title_start + MAX_RUNNING_HORA_CHARS)
+    if title_end == -1:
+        return None
+    planet_nature = _text(page_source[title_start:title_end]).strip()
+    planet, _, nature = planet_nature.partition(' - ')
+    times = _TIME_RANGE.search(page_source, title_end, title_end + MAX_RUNNING_HORA_CHARS)
+    if not times:
+        return None
+    return HoraSlot(planet.strip(), nature.strip(), *_time_range(times))
+
+
+def parse_page(page_source: str) -> ParsedPage:
+    """Extract the title, the 24 hora rows and the running hora from a hora page."""
+    return ParsedPage(
+        title=parse_title(page_source),
+        slots=parse_slots(page_source),
+        running_hora=parse_running_hora(page_source),
+    )
+
+
+# The patterns this module replaced, kept for the benchmark
+LEGACY_RUNNING_HORA_PATTERN = r'Running Hora.*?<div class="dpPHeaderLeftTitle">(.*?)</div>.*?(\d{1,2}:\d{2})\s*<span[^>]*>([AP]M)</span>\s*<span[^>]*>to\s*</span>.*?(\d{1,2}:\d{2})\s*<span[^>]*>([AP]M)</span>'
+LEGACY_HORA_PATTERN = r'<span class="dpVerticalMiddleText">(Jupiter|Mars|Sun|Venus|Mercury|Moon|Saturn)\s*-\s*(Fruitful|Aggressive|Vigorous|Beneficial|Quick|Gentle|Sluggish).*?</span>.*?<span class="dpVerticalMiddleText">(\d{1,2}:\d{2})\s*<span[^>]*>([AP]M)</span>\s*<span[^>]*>to\s*</span>.*?(\d{1,2}:\d{2})\s*<span[^>]*>([AP]M)</span>'
+
+
+def legacy_parse_page(page_source: str) -> ParsedPage:
+    """The original regex-over-everything parser."""
+    title_match = re.search(r'<title[^>]*>(.*?)</title>', page_source, re.DOTALL | re.IGNORECASE)
+    running = re.search(LEGACY_RUNNING_HORA_PATTERN, page_source, re.DOTALL)
+    slots = tuple(
+        HoraSlot(planet, nature, _minutes(*start.split(':'), start_ampm), _minutes(*end.split(':'), end_ampm))
+        for planet, nature, start, start_ampm, end, end_ampm in re.findall(LEGACY_HORA_PATTERN, page_source, re.DOTALL)
+    )
+    running_hora = None
+    if running:
+        planet, _, nature = running.group(1).partition(' - ')
+        running_hora = HoraSlot(
+            planet.strip(), nature.strip(),
+            _minutes(*running.group(2).split(':'), running.group(3)),
+            _minutes(*running.group(4).split(':'), running.group(5)),
+        )
+    return ParsedPage(html.unescape(title_match.group(1).strip()) if title_match else "", slots, running_hora)
+
+
+def _pad(page_source: str, kilobytes: int) -> str:
+    """Bulk a page up with script/markup noise before and after the table, like the real site."""
+    if kilobytes <= 0:
+        return page_source
+    noise = '<div class="dpAd"><script>window.dataLayer=window.dataLayer||[];dataLayer.push({"k":"v"});</script><span class="x">filler</span></div>\n'
+    half = noise * (kilobytes * 512 // len(noise) + 1)
+    body = page_source.find('<body')
+    end = page_source.rfind('</body>')
+    if body == -1 or end == -1:
+        return half + page_source + half
+    body = page_source.find('>', body) + 1
+    return page_source[:body] + half + page_source[body:end] + half + page_source[end:]
+
+
+def _bench(paths, repeat: int, pad_kb: int):
+    import time
+
+    print(f"{'page':<40} {'KB':>6} {'rows':>5} {'legacy ms':>10} {'linear ms':>10} {'speedup':>8}")
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            page_source = _pad(f.read(), pad_kb)
+        parsed, legacy = parse_page(page_source), legacy_parse_page(page_source)
+        if parsed.slots != legacy.slots or parsed.running_hora != legacy.running_hora:
+            print(f"  ! {path}: parsers disagree ({len(parsed.slots)} vs {len(legacy.slots)} rows)")
+        timings = []
+        for parse in (legacy_parse_page, parse_page):
+            best, spent = float('inf'), 0.0
+            for _ in range(repeat):
+                started = time.perf_counter()
+                parse(page_source)
+                elapsed = time.perf_counter() - started
+                best, spent = min(best, elapsed), spent + elapsed
+                if spent > 2:
+                    break  # The legacy parser is quadratic on unrendered pages
+            timings.append(best * 1000)
+        print(f"{path[-40:]:<40} {len(page_source) // 1024:>6} {len(parsed.slots):>5} "
+              f"{timings[0]:>10.3f} {timings[1]:>10.3f} {timings[0] / timings[1]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parse saved Drik Panchang hora pages.")
+    parser.add_argument("pages", nargs="+", help="HTML files to parse")
+    parser.add_argument("--bench", action="store_true", help="time against the legacy regex parser")
+    parser.add_argument("--repeat", type=int, default=20, help="benchmark iterations per page (best is reported)")
+    parser.add_argument("--pad-kb", type=int, default=100, help="inflate each page to roughly this size for the benchmark")
+    args = parser.parse_args()
+
+    if args.bench:
+        _bench(args.pages, args.repeat, args.pad_kb)
+    else:
+        for path in args.pages:
+            with open(path, encoding='utf-8') as f:
+                page = parse_page(f.read())
+            print(f"{path}: {page.title!r}, {len(page.slots)} horas, running: {page.running_hora}")
+            for slot in page.slots:
+                print(f"  {slot.planet:<8} {slot.nature:<11} {slot.start_minutes:>5} {slot.end_minutes:>5}")
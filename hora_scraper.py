@@ -1,8 +1,39 @@
+"""Hora scraper CLI: print one day's horas, or precompute schedules in bulk.
+
+    python hora_scraper.py report [--geoname-id 4671654] [--date DD/MM/YYYY]
+    python hora_scraper.py precompute --locations all --start 01/01/2026 --end 31/12/2026 --workers 8 --out data/hora-local.db
+
+`precompute` fans out over a process pool (engine `local`, vectorized with
+hora_vector.py) or over the service's browser pool (engine `scrape`, with the
+same fetch strategies and validation as the API). Schedules go to a schedule
+store, a CSV file (one row per hora) or a JSON Lines file (one schedule per
+line). Only scraped schedules may go to the store the service reads, since it
+serves whatever it finds there as scraped. Days already in the output are
+skipped, so an interrupted run resumes where it stopped when the same command
+is run again.
+"""
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta, timezone
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from datetime import datetime
-import time
-import re
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+import hora_parser
+import hora_vector
+import locations
+from schedule import schedule_from_dict, schedule_to_dict
+from schedule_store import ScheduleStore, iso_day
 
 # ============================================================================
 # LOCATION SETTINGS
@@ -36,198 +67,557 @@ import re
 # then copy the geoname-id from the URL
 # ============================================================================
 
-geoname_id = 4671654  # Change this to your city's geoname ID
+DEFAULT_GEONAME_ID = 4671654  # Change this to your city's geoname ID
 
-# Dynamic date - uses today's date
-today = datetime.now()
-date_str = today.strftime("%d/%m/%Y")  # Format: DD/MM/YYYY
+# Days per process-pool task of the local engine
+LOCAL_TASK_DAYS = 366
 
-# URL with geoname-id and dynamic date
-url = f"https://www.drikpanchang.com/muhurat/hora.html?geoname-id={geoname_id}&date={date_str}"
+# Store rows are kept this many days past the day they describe, as in main.py
+HORA_STORE_RETENTION_DAYS = int(os.environ.get("HORA_STORE_RETENTION_DAYS", 30))
 
-# Setup Chrome
-chrome_options = Options()
-chrome_options.add_argument("--headless=new")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
-chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36")
-chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
 
-driver = webdriver.Chrome(options=chrome_options)
-
-try:
-    driver.get(url)
-    time.sleep(6)
-    
-    print(f"\n🕉️  {driver.title}")
-    print("=" * 70)
-    
-    page_source = driver.page_source
-    
-    # Extract the "Running Hora" section
-    running_hora_match = re.search(
-        r'Running Hora.*?<div class="dpPHeaderLeftTitle">(.*?)</div>.*?(\d{1,2}:\d{2})\s*<span[^>]*>([AP]M)</span>\s*<span[^>]*>to\s*</span>.*?(\d{1,2}:\d{2})\s*<span[^>]*>([AP]M)</span>',
-        page_source, re.DOTALL
-    )
-    
-    # Extract all hora entries from the table
-    # Pattern: "Planet - Nature" followed by time range
-    hora_pattern = r'<span class="dpVerticalMiddleText">(Jupiter|Mars|Sun|Venus|Mercury|Moon|Saturn)\s*-\s*(Fruitful|Aggressive|Vigorous|Beneficial|Quick|Gentle|Sluggish).*?</span>.*?<span class="dpVerticalMiddleText">(\d{1,2}:\d{2})\s*<span[^>]*>([AP]M)</span>\s*<span[^>]*>to\s*</span>.*?(\d{1,2}:\d{2})\s*<span[^>]*>([AP]M)</span>'
-    
-    matches = re.findall(hora_pattern, page_source, re.DOTALL)
-    
-    # Planet emojis
-    emojis = {"Sun": "☀️", "Moon": "🌙", "Mars": "♂️", "Mercury": "☿", 
-              "Jupiter": "♃", "Venus": "♀️", "Saturn": "♄"}
-    
-    # Build hora schedule
-    hora_schedule = []
-    for planet, nature, start_time, start_ampm, end_time, end_ampm in matches:
-        hora_schedule.append({
-            'planet': planet,
-            'nature': nature,
-            'start': f"{start_time} {start_ampm}",
-            'end': f"{end_time} {end_ampm}",
-            'start_time': start_time,
-            'start_ampm': start_ampm,
-            'end_time': end_time,
-            'end_ampm': end_ampm
-        })
-    
-    # Current time
-    now = datetime.now()
-    current_time_str = now.strftime("%I:%M %p")
-    
-    def time_to_minutes(time_str, ampm):
-        """Convert time to minutes since midnight"""
-        parts = time_str.split(':')
-        hour, minute = int(parts[0]), int(parts[1])
-        if ampm == 'PM' and hour != 12:
-            hour += 12
-        elif ampm == 'AM' and hour == 12:
-            hour = 0
-        return hour * 60 + minute
+def report(geoname_id: int = DEFAULT_GEONAME_ID, date_str: str = None):
+    """Scrape one day's hora page with a fresh Chrome and print the current, Jupiter and full schedule."""
+    # "Today" is the location's date when its timezone is known, else this machine's
+    place = locations.GAZETTEER.get(geoname_id)
+    tz = ZoneInfo(place.timezone) if place else None
+    today = datetime.now(tz).strftime("%d/%m/%Y")
+    date_str = date_str or today  # Format: DD/MM/YYYY
+    # The page only shows a "Running Hora" block for the location's current day, which is
+    # only known when its timezone is
+    expect_running_hora = place is not None and date_str == today
     
-    current_minutes = now.hour * 60 + now.minute
-    
-    # Find current hora
-    current_hora = None
-    next_hora = None
-    
-    for i, hora in enumerate(hora_schedule):
-        start_mins = time_to_minutes(hora['start_time'], hora['start_ampm'])
-        end_mins = time_to_minutes(hora['end_time'], hora['end_ampm'])
-        
-        # Handle overnight
-        if end_mins < start_mins:
-            end_mins += 24 * 60
-            if current_minutes < 12 * 60:  # If current time is early morning
-                check_mins = current_minutes + 24 * 60
+    # URL with geoname-id and dynamic date
+    url = f"https://www.drikpanchang.com/muhurat/hora.html?geoname-id={geoname_id}&date={date_str}"
+
+    # Setup Chrome
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+
+    driver = webdriver.Chrome(options=chrome_options)
+
+    try:
+        driver.get(url)
+        
+        # Continue as soon as the 24 hora times (and for today the "Running Hora" block) are rendered
+        started = time.monotonic()
+        try:
+            WebDriverWait(driver, 14, poll_frequency=0.1).until(
+                lambda d: d.execute_script(hora_parser.TABLE_READY_SCRIPT, expect_running_hora)
+            )
+        except TimeoutException:
+            print("⚠️  Page did not finish rendering within 14s, parsing what is there")
+        print(f"(page ready after {time.monotonic() - started:.1f}s)")
+        
+        print(f"\n🕉️  {driver.title}")
+        print("=" * 70)
+        
+        page_source = driver.page_source
+        
+        # Title, hora table and "Running Hora" block in one linear pass (see hora_parser.py)
+        page = hora_parser.parse_page(page_source)
+        
+        # Planet emojis
+        emojis = {"Sun": "☀️", "Moon": "🌙", "Mars": "♂️", "Mercury": "☿", 
+                  "Jupiter": "♃", "Venus": "♀️", "Saturn": "♄"}
+        
+        def format_minutes(minutes):
+            """Convert minutes since midnight to 'H:MM AM'"""
+            hour, minute = divmod(minutes % (24 * 60), 60)
+            return f"{hour % 12 or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+        
+        # Build hora schedule
+        hora_schedule = []
+        for slot in page.slots:
+            hora_schedule.append({
+                'planet': slot.planet,
+                'nature': slot.nature,
+                'start': format_minutes(slot.start_minutes),
+                'end': format_minutes(slot.end_minutes),
+                'start_minutes': slot.start_minutes,
+                'end_minutes': slot.end_minutes
+            })
+        
+        # Current time
+        now = datetime.now(tz)
+        current_time_str = now.strftime("%I:%M %p")
+        
+        current_minutes = now.hour * 60 + now.minute
+        
+        # Find current hora
+        current_hora = None
+        next_hora = None
+        
+        for i, hora in enumerate(hora_schedule):
+            start_mins = hora['start_minutes']
+            end_mins = hora['end_minutes']
+            
+            # Handle overnight
+            if end_mins < start_mins:
+                end_mins += 24 * 60
+                if current_minutes < 12 * 60:  # If current time is early morning
+                    check_mins = current_minutes + 24 * 60
+                else:
+                    check_mins = current_minutes
             else:
                 check_mins = current_minutes
-        else:
-            check_mins = current_minutes
+            
+            if start_mins <= check_mins < end_mins:
+                current_hora = hora
+                if i + 1 < len(hora_schedule):
+                    next_hora = hora_schedule[i + 1]
+                break
         
-        if start_mins <= check_mins < end_mins:
-            current_hora = hora
-            if i + 1 < len(hora_schedule):
-                next_hora = hora_schedule[i + 1]
-            break
-    
-    # ============================================
-    # 1. CURRENT HORA
-    # ============================================
-    print(f"\n⏰ Current Time: {current_time_str}")
-    print("\n" + "🔮 " + "═" * 66)
-    print("   1. CURRENT RUNNING HORA")
-    print("═" * 70)
-    
-    if running_hora_match:
-        planet_nature = running_hora_match.group(1)
-        start_t = f"{running_hora_match.group(2)} {running_hora_match.group(3)}"
-        end_t = f"{running_hora_match.group(4)} {running_hora_match.group(5)}"
-        
-        planet = planet_nature.split(' - ')[0].strip()
-        nature = planet_nature.split(' - ')[1].strip() if ' - ' in planet_nature else ""
-        emoji = emojis.get(planet, "🌟")
-        
-        print(f"\n   ⏰ RIGHT NOW: {emoji} {planet.upper()} HORA")
-        print(f"   🕐 Time: {start_t} to {end_t}")
-        print(f"   ✨ Nature: {nature}")
-        
-        if planet in ['Jupiter', 'Venus', 'Mercury', 'Moon']:
-            print(f"\n   ✅ GOOD TIME for important activities!")
-        elif planet == 'Sun':
-            print(f"\n   🔸 NEUTRAL - Good for authority/govt matters")
+        # ============================================
+        # 1. CURRENT HORA
+        # ============================================
+        print(f"\n⏰ Current Time: {current_time_str}")
+        print("\n" + "🔮 " + "═" * 66)
+        print("   1. CURRENT RUNNING HORA")
+        print("═" * 70)
+        
+        if page.running_hora:
+            planet = page.running_hora.planet
+            nature = page.running_hora.nature
+            start_t = format_minutes(page.running_hora.start_minutes)
+            end_t = format_minutes(page.running_hora.end_minutes)
+            emoji = emojis.get(planet, "🌟")
+            
+            print(f"\n   ⏰ RIGHT NOW: {emoji} {planet.upper()} HORA")
+            print(f"   🕐 Time: {start_t} to {end_t}")
+            print(f"   ✨ Nature: {nature}")
+            
+            if planet in ['Jupiter', 'Venus', 'Mercury', 'Moon']:
+                print(f"\n   ✅ GOOD TIME for important activities!")
+            elif planet == 'Sun':
+                print(f"\n   🔸 NEUTRAL - Good for authority/govt matters")
+            else:
+                print(f"\n   ⚠️  CAUTION - Avoid starting new important tasks")
+        elif current_hora:
+            emoji = emojis.get(current_hora['planet'], "🌟")
+            print(f"\n   ⏰ RIGHT NOW: {emoji} {current_hora['planet'].upper()} HORA")
+            print(f"   🕐 Time: {current_hora['start']} to {current_hora['end']}")
+            print(f"   ✨ Nature: {current_hora['nature']}")
         else:
-            print(f"\n   ⚠️  CAUTION - Avoid starting new important tasks")
-    elif current_hora:
-        emoji = emojis.get(current_hora['planet'], "🌟")
-        print(f"\n   ⏰ RIGHT NOW: {emoji} {current_hora['planet'].upper()} HORA")
-        print(f"   🕐 Time: {current_hora['start']} to {current_hora['end']}")
-        print(f"   ✨ Nature: {current_hora['nature']}")
-    else:
-        print("\n   Could not determine current hora")
-    
-    if next_hora:
-        next_emoji = emojis.get(next_hora['planet'], "🌟")
-        print(f"\n   ⏭️  Next: {next_emoji} {next_hora['planet']} ({next_hora['start']} to {next_hora['end']})")
-    
-    # ============================================
-    # 2. JUPITER HORA TIMES
-    # ============================================
-    print("\n" + "♃ " + "═" * 67)
-    print("   2. JUPITER (GURU) HORA - Today's Schedule")
-    print("═" * 70)
-    
-    jupiter_horas = [h for h in hora_schedule if h['planet'] == 'Jupiter']
-    
-    print(f"\n   🌟 Jupiter Hora is the MOST AUSPICIOUS time for:")
-    print("      • Starting new ventures & businesses")
-    print("      • Education & learning")
-    print("      • Legal matters & signing contracts")
-    print("      • Spiritual activities & prayers")
-    
-    print(f"\n   📅 Today's Jupiter Hora Times:")
-    print("   " + "-" * 45)
-    
-    for jh in jupiter_horas:
-        print(f"   ♃ {jh['start']} to {jh['end']}")
-    
-    # ============================================
-    # FULL SCHEDULE
-    # ============================================
-    print("\n" + "📋 " + "═" * 66)
-    print("   FULL HORA SCHEDULE (Austin, TX)")
-    print("═" * 70)
-    
-    day_horas = hora_schedule[:12] if len(hora_schedule) >= 12 else hora_schedule
-    night_horas = hora_schedule[12:24] if len(hora_schedule) >= 24 else hora_schedule[12:]
-    
-    print("\n   ☀️ DAY HORA (Sunrise → Sunset):")
-    print("   " + "-" * 55)
-    for i, hora in enumerate(day_horas):
-        emoji = emojis.get(hora['planet'], "🌟")
-        good = "✓" if hora['planet'] in ['Jupiter', 'Venus', 'Mercury', 'Moon'] else ("~" if hora['planet'] == 'Sun' else "✗")
-        print(f"   {i+1:2}. {hora['start']:>8} - {hora['end']:>8}  {emoji} {hora['planet']:<8} [{good}]")
-    
-    if night_horas:
-        print("\n   🌙 NIGHT HORA (Sunset → Sunrise):")
+            print("\n   Could not determine current hora")
+        
+        if next_hora:
+            next_emoji = emojis.get(next_hora['planet'], "🌟")
+            print(f"\n   ⏭️  Next: {next_emoji} {next_hora['planet']} ({next_hora['start']} to {next_hora['end']})")
+        
+        # ============================================
+        # 2. JUPITER HORA TIMES
+        # ============================================
+        print("\n" + "♃ " + "═" * 67)
+        print("   2. JUPITER (GURU) HORA - Today's Schedule")
+        print("═" * 70)
+        
+        jupiter_horas = [h for h in hora_schedule if h['planet'] == 'Jupiter']
+        
+        print(f"\n   🌟 Jupiter Hora is the MOST AUSPICIOUS time for:")
+        print("      • Starting new ventures & businesses")
+        print("      • Education & learning")
+        print("      • Legal matters & signing contracts")
+        print("      • Spiritual activities & prayers")
+        
+        print(f"\n   📅 Today's Jupiter Hora Times:")
+        print("   " + "-" * 45)
+        
+        for jh in jupiter_horas:
+            print(f"   ♃ {jh['start']} to {jh['end']}")
+        
+        # ============================================
+        # FULL SCHEDULE
+        # ============================================
+        print("\n" + "📋 " + "═" * 66)
+        print(f"   FULL HORA SCHEDULE (geoname-id {geoname_id})")
+        print("═" * 70)
+        
+        day_horas = hora_schedule[:12] if len(hora_schedule) >= 12 else hora_schedule
+        night_horas = hora_schedule[12:24] if len(hora_schedule) >= 24 else hora_schedule[12:]
+        
+        print("\n   ☀️ DAY HORA (Sunrise → Sunset):")
         print("   " + "-" * 55)
-        for i, hora in enumerate(night_horas):
+        for i, hora in enumerate(day_horas):
             emoji = emojis.get(hora['planet'], "🌟")
             good = "✓" if hora['planet'] in ['Jupiter', 'Venus', 'Mercury', 'Moon'] else ("~" if hora['planet'] == 'Sun' else "✗")
             print(f"   {i+1:2}. {hora['start']:>8} - {hora['end']:>8}  {emoji} {hora['planet']:<8} [{good}]")
-    
-    print("\n" + "═" * 70)
-    print("   Legend: ✓ Good | ~ Neutral | ✗ Avoid")
-    print("═" * 70 + "\n")
-
-except Exception as e:
-    print(f"Error: {e}")
-    import traceback
-    traceback.print_exc()
-    
-finally:
-    driver.quit()
+        
+        if night_horas:
+            print("\n   🌙 NIGHT HORA (Sunset → Sunrise):")
+            print("   " + "-" * 55)
+            for i, hora in enumerate(night_horas):
+                emoji = emojis.get(hora['planet'], "🌟")
+                good = "✓" if hora['planet'] in ['Jupiter', 'Venus', 'Mercury', 'Moon'] else ("~" if hora['planet'] == 'Sun' else "✗")
+                print(f"   {i+1:2}. {hora['start']:>8} - {hora['end']:>8}  {emoji} {hora['planet']:<8} [{good}]")
+        
+        print("\n" + "═" * 70)
+        print("   Legend: ✓ Good | ~ Neutral | ✗ Avoid")
+        print("═" * 70 + "\n")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        
+    finally:
+        driver.quit()
+
+
+# ============================================================================
+# BULK PRECOMPUTE
+# ============================================================================
+
+class Location(NamedTuple):
+    geoname_id: int
+    name: str
+    timezone: str
+    lat: float
+    lng: float
+
+
+def resolve_locations(spec: str) -> list:
+    """Resolve a comma-separated list of preset keys, geoname IDs, `all` and `@file` entries.
+
+    A file lists one entry per line; blank lines and `#` comments are ignored.
+    Raises ValueError for unknown entries.
+    """
+    entries = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if entry.startswith("@"):
+            with open(entry[1:], encoding='utf-8') as f:
+                entries += [line.split("#", 1)[0].strip() for line in f]
+        else:
+            entries.append(entry)
+
+    resolved = {}
+    for entry in filter(None, entries):
+        key = entry.lower().replace(" ", "_")
+        if key == "all":
+            infos = list(locations.LOCATIONS.values())
+        elif key in locations.LOCATIONS:
+            infos = [locations.LOCATIONS[key]]
+        elif entry.isdigit():
+            place = locations.GAZETTEER.get(int(entry))
+            if place is None:
+                raise ValueError(f"Unknown geoname ID {entry} (not in the gazetteer at {locations.GAZETTEER_PATH})")
+            infos = [{"geoname_id": place.geoname_id, "timezone": place.timezone, "lat": place.lat, "lng": place.lng}]
+        else:
+            raise ValueError(f"Unknown location '{entry}': use a preset key, a geoname ID, 'all' or @file")
+        for info in infos:
+            geoname_id = info["geoname_id"]
+            resolved.setdefault(geoname_id, Location(
+                geoname_id, locations.location_name(geoname_id), info["timezone"], info["lat"], info["lng"],
+            ))
+    return list(resolved.values())
+
+
+def compute_local(location: Location, days: list) -> list:
+    """Process-pool task: one location's schedules for ISO `days`, as schedule dicts.
+
+    Days on which the sun does not rise or set are left out.
+    """
+    table = hora_vector.compute_table([location.lat], [location.lng], days)
+    return [
+        schedule_to_dict(schedule)
+        for schedule in table.schedules([location.geoname_id], [location.timezone], [location.name])
+    ]
+
+
+def scrape_days(location: Location, days: list) -> list:
+    """Thread-pool task: fetch days through the service's fetch strategies (HTTP, then Chrome)."""
+    import main
+
+    schedules = []
+    for day in days:
+        date_str = datetime.strptime(day, "%Y-%m-%d").strftime("%d/%m/%Y")
+        schedule = main.fetch_schedule(location.geoname_id, date_str, location.timezone, location.lat, location.lng)
+        if len(schedule) != 24:
+            raise ValueError(f"only {len(schedule)} of 24 horas on the page for {date_str}")
+        schedules.append(schedule_to_dict(schedule))
+    return schedules
+
+
+class StoreSink:
+    """Writes schedules to a ScheduleStore; rows already in the store count as done."""
+
+    def __init__(self, path: str):
+        self.store = ScheduleStore(path)
+
+    def done(self, location: Location, first_day: date, last_day: date) -> set:
+        return self.store.days(location.geoname_id, first_day.strftime("%d/%m/%Y"), last_day.strftime("%d/%m/%Y"))
+
+    def write(self, schedules: list):
+        if not schedules:
+            return
+        # Keep rows for the retention period after their (latest) day, so compaction can reclaim them
+        last_day = max(datetime.strptime(iso_day(data['date']), "%Y-%m-%d") for data in schedules)
+        day_end = last_day.replace(tzinfo=timezone.utc) + timedelta(days=1)
+        ttl = max(day_end.timestamp() - time.time(), 0) + HORA_STORE_RETENTION_DAYS * 24 * 3600
+        self.store.put_many([schedule_from_dict(data) for data in schedules], ttl=ttl)
+
+    def close(self):
+        self.store.close()
+
+
+class FileSink:
+    """Appends schedules to a CSV or JSON Lines file, with a progress journal next to it.
+
+    After each write, the journal gets a line with the file's size and the
+    days just written. A resumed run truncates the file to the last journaled
+    size (dropping a write that was cut off) and skips the journaled days.
+    """
+
+    CSV_FIELDS = ("geoname_id", "location", "date", "slot", "planet", "nature", "start_minutes", "end_minutes")
+
+    def __init__(self, path: str, fmt: str):
+        self.path = path
+        self.format = fmt
+        self.journal_path = path + ".progress"
+        self._done = set()
+        size = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, encoding='utf-8') as f:
+                journal = f.read()
+            complete = journal[:journal.rfind("\n") + 1]  # A cut-off last line is ignored
+            for line in complete.splitlines():
+                offset, geoname_id, days = line.split("\t")
+                size = int(offset)
+                self._done.update((int(geoname_id), day) for day in days.split(",") if day)
+            if not os.path.exists(path) or os.path.getsize(path) < size:
+                complete, size, self._done = "", 0, set()  # The output was removed; start over
+            if complete != journal:
+                with open(self.journal_path, "w", encoding='utf-8') as f:
+                    f.write(complete)
+        elif os.path.exists(path) and os.path.getsize(path):
+            raise ValueError(f"{path} exists but has no progress journal; remove it or choose another --out")
+
+        self._file = open(path, "a+b")
+        self._file.truncate(size)
+        self._file.seek(size)
+        self._journal = open(self.journal_path, "a", encoding='utf-8')
+        if size == 0 and fmt == "csv":
+            self._write_bytes(self._csv(self.CSV_FIELDS))
+
+    def _csv(self, *rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue().encode('utf-8')
+
+    def _write_bytes(self, data: bytes):
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def done(self, location: Location, first_day: date, last_day: date) -> set:
+        return {day for geoname_id, day in self._done if geoname_id == location.geoname_id}
+
+    def write(self, schedules: list):
+        if not schedules:
+            return
+        if self.format == "csv":
+            data = self._csv(*(
+                (s['geoname_id'], s['location'], iso_day(s['date']), i, *slot)
+                for s in schedules for i, slot in enumerate(s['slots'])
+            ))
+        else:
+            data = "".join(json.dumps(s, ensure_ascii=False, separators=(',', ':')) + "\n" for s in schedules).encode('utf-8')
+        self._write_bytes(data)
+        # One journal line per location, since each write holds a single location
+        days = ",".join(iso_day(s['date']) for s in schedules)
+        self._journal.write(f"{self._file.tell()}\t{schedules[0]['geoname_id']}\t{days}\n")
+        self._journal.flush()
+
+    def close(self):
+        self._file.close()
+        self._journal.close()
+
+
+def service_store_path():
+    """The SQLite file the API reads scraped schedules from, if it uses one."""
+    backend = os.environ.get("HORA_CACHE_BACKEND")
+    if backend:
+        return backend[len("sqlite://"):] if backend.lower().startswith("sqlite://") else None
+    return os.environ.get("HORA_STORE_PATH")
+
+
+def open_sink(path: str, engine: str):
+    """A sink for `path`: .csv, .jsonl/.ndjson, or anything else as a SQLite schedule store.
+
+    Raises ValueError if locally computed schedules would go to the service's
+    store, where they would be served as scraped ones.
+    """
+    suffix = os.path.splitext(path)[1].lower()
+    store = service_store_path()
+    if engine == "local" and store and os.path.realpath(path) == os.path.realpath(store):
+        raise ValueError(f"{path} is the service's schedule store of scraped pages; "
+                         "write --engine local output to another file")
+    if suffix == ".csv":
+        return FileSink(path, "csv")
+    if suffix in (".jsonl", ".ndjson"):
+        return FileSink(path, "jsonl")
+    return StoreSink(path)
+
+
+class Progress:
+    """Days done/failed so far, reported on stderr at most every `interval` seconds."""
+
+    def __init__(self, total: int, skipped: int, interval: float = 1.0):
+        self.total = total
+        self.skipped = skipped
+        self.interval = interval
+        self.written = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self._last_report = 0.0
+        self._tty = sys.stderr.isatty()
+
+    def update(self, written: int = 0, failed: int = 0):
+        self.written += written
+        self.failed += failed
+        now = time.monotonic()
+        if now - self._last_report >= self.interval or self.written + self.failed == self.total:
+            self._last_report = now
+            finished = self.written + self.failed
+            rate = self.written / max(now - self.started, 1e-9)
+            eta = (self.total - finished) / rate if rate else float('inf')
+            line = (f"{finished:,}/{self.total:,} days  {rate:,.0f} days/s  "
+                    f"failed {self.failed:,}  ETA {eta:,.0f}s")
+            print(f"\r{line}   " if self._tty else line, end="" if self._tty else "\n", file=sys.stderr, flush=True)
+
+    def summary(self, locations: int, workers: int, engine: str) -> str:
+        elapsed = time.monotonic() - self.started
+        rate = self.written / elapsed if elapsed else 0.0
+        return (f"{self.written:,} schedules written, {self.skipped:,} already done, {self.failed:,} failed "
+                f"for {locations:,} locations in {elapsed:,.1f}s: {rate:,.0f} days/s, {rate * 24:,.0f} horas/s "
+                f"({workers} workers, engine {engine})")
+
+
+def _run_bounded(executor, func, tasks, limit: int):
+    """Yield (task, future) as tasks complete, keeping at most `limit` submitted at once."""
+    tasks = iter(tasks)
+    pending = {}
+    while True:
+        for task in tasks:
+            pending[executor.submit(func, *task)] = task
+            if len(pending) >= limit:
+                break
+        if not pending:
+            return
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield pending.pop(future), future
+
+
+def plan_tasks(locations: list, first_day: date, last_day: date, engine: str, sink) -> tuple:
+    """Return ([(location, ISO days)], Progress) for every (location, day) in the range `sink` lacks."""
+    all_days = [(first_day + timedelta(days=i)).isoformat() for i in range((last_day - first_day).days + 1)]
+    tasks, skipped = [], 0
+    for location in locations:
+        done = sink.done(location, first_day, last_day)
+        days = [day for day in all_days if day not in done]
+        skipped += len(all_days) - len(days)
+        if engine == "local":
+            # A task per location and up to a year, so few-location runs still use every worker
+            tasks += [(location, days[i:i + LOCAL_TASK_DAYS]) for i in range(0, len(days), LOCAL_TASK_DAYS)]
+        else:
+            tasks += [(location, [day]) for day in days]
+    return tasks, Progress(len(locations) * len(all_days) - skipped, skipped)
+
+
+def run_tasks(tasks: list, progress: Progress, workers: int, engine: str, sink):
+    """Compute (process pool) or scrape (thread pool) tasks, writing results to `sink` as they finish."""
+    if engine == "local":
+        executor, func = ProcessPoolExecutor(max_workers=workers), compute_local
+    else:
+        executor, func = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scrape"), scrape_days
+    try:
+        for (location, days), future in _run_bounded(executor, func, tasks, workers * 4):
+            try:
+                schedules = future.result()
+            except Exception as e:
+                span = days[0] if len(days) == 1 else f"{days[0]}..{days[-1]}"
+                print(f"\nFailed {location.name} ({location.geoname_id}) {span}: {e}", file=sys.stderr)
+                progress.update(failed=len(days))
+                continue
+            sink.write(schedules)
+            progress.update(written=len(schedules), failed=len(days) - len(schedules))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if engine == "scrape":
+            # Importing main started its browser pool and HTTP client; quit Chrome before exiting
+            import main
+            main._browser_pool.close()
+            main._http_client.close()
+
+
+def parse_day(value: str) -> date:
+    try:
+        return datetime.strptime(value, "%d/%m/%Y").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value!r} is not a date in DD/MM/YYYY format")
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Print one day's horas, or precompute schedules in bulk.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    report_parser = commands.add_parser("report", help="scrape and print one day's horas")
+    report_parser.add_argument("--geoname-id", type=int, default=DEFAULT_GEONAME_ID)
+    report_parser.add_argument("--date", type=parse_day, help="DD/MM/YYYY (default: today)")
+
+    bulk = commands.add_parser("precompute", help="compute or scrape many locations and days")
+    bulk.add_argument("--locations", default="all",
+                      help="comma-separated preset keys, geoname IDs, 'all' (every preset) or @file (default: all)")
+    bulk.add_argument("--start", type=parse_day, help="first day, DD/MM/YYYY (default: today)")
+    bulk.add_argument("--end", type=parse_day, help="last day, DD/MM/YYYY (default: --start)")
+    bulk.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                      help="worker processes (local) or concurrent scrapes (scrape); default: CPU count")
+    bulk.add_argument("--engine", choices=("local", "scrape"), default="local")
+    bulk.add_argument("--out",
+                      help="schedule store (.db), .csv or .jsonl file "
+                           "(default for --engine scrape: the service's store, $HORA_STORE_PATH)")
+    args = parser.parse_args(argv)
+
+    if args.command == "report":
+        report(args.geoname_id, args.date.strftime("%d/%m/%Y") if args.date else None)
+        return
+
+    if args.engine == "scrape":
+        args.out = args.out or service_store_path()
+    if not args.out:
+        parser.error("--out is required for --engine local, or when HORA_STORE_PATH is not set")
+    first_day = args.start or date.today()
+    last_day = args.end or first_day
+    if last_day < first_day:
+        parser.error("--end is before --start")
+    if args.engine == "scrape":
+        # main.py sizes its browser pool from the environment when imported
+        os.environ.setdefault("BROWSER_POOL_SIZE", str(args.workers))
+        os.environ.setdefault("SCRAPE_CONCURRENCY", str(args.workers))
+    try:
+        locations = resolve_locations(args.locations)
+        sink = open_sink(args.out, args.engine)
+    except (OSError, ValueError) as e:
+        sys.exit(str(e))
+
+    tasks, progress = plan_tasks(locations, first_day, last_day, args.engine, sink)
+    try:
+        run_tasks(tasks, progress, args.workers, args.engine, sink)
+    except KeyboardInterrupt:
+        print("\nInterrupted; run the same command again to resume.", file=sys.stderr)
+        sys.exit(130)
+    finally:
+        sink.close()
+        print(file=sys.stderr)
+        print(progress.summary(len(locations), args.workers, args.engine))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,261 @@
+"""Vectorized hora computation for many locations × many dates at once.
+
+hora_engine.py computes one day at a time in pure Python, which is fine per
+request but takes minutes for a nightly table of hundreds of cities × 365
+days. This module runs the same NOAA formulas over whole NumPy arrays: every
+sun event of every (location, date) cell is computed in one pass per
+refinement step, and the 24 hora boundaries of every cell follow from a
+single broadcast.
+
+Results are columnar (one row per location × date, locations major): UTC
+epoch seconds for the 24 starts and ends, and planet codes as in
+schedule.PLANETS. Timezones are only needed to turn epochs into the minutes
+since local midnight that DaySchedule stores.
+
+    python hora_vector.py --bench --cities 500 --days 365
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from hora_engine import CHALDEAN_ORDER, SUNRISE_ZENITH, WEEKDAY_LORDS
+from schedule import NATURES, PLANET_CODES, PLANETS, DaySchedule, HoraSlot
+
+UNIX_EPOCH_JD = 2440587.5  # julian day at 1970-01-01 00:00 UTC
+
+# Planet code of the i-th planet in Chaldean order, and the Chaldean index
+# of each weekday's lord (Monday == 0)
+CHALDEAN_CODES = np.array([PLANET_CODES[planet] for planet in CHALDEAN_ORDER], dtype=np.uint8)
+WEEKDAY_FIRST = np.array([CHALDEAN_ORDER.index(lord) for lord in WEEKDAY_LORDS], dtype=np.int64)
+
+
+class HoraTable(NamedTuple):
+    """Horas of len(lats) locations × len(days) dates; row r is location r // n_days, date r % n_days.
+
+    `starts`, `ends` and `planets` have shape (rows, 24). `valid` is False
+    where the sun does not rise or set (polar day or night); the boundaries
+    of those rows are meaningless.
+    """
+    days: np.ndarray        # (n_days,) datetime64[D]
+    n_locations: int
+    sunrise: np.ndarray     # (rows,) int64 epoch seconds
+    sunset: np.ndarray      # (rows,) int64 epoch seconds
+    starts: np.ndarray      # (rows, 24) int64 epoch seconds
+    ends: np.ndarray        # (rows, 24) int64 epoch seconds
+    planets: np.ndarray     # (rows, 24) uint8 codes into schedule.PLANETS
+    valid: np.ndarray       # (rows,) bool
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    @property
+    def location_index(self) -> np.ndarray:
+        return np.repeat(np.arange(self.n_locations), len(self.days))
+
+    @property
+    def day_index(self) -> np.ndarray:
+        return np.tile(np.arange(len(self.days)), self.n_locations)
+
+    def local_minutes(self, timezones) -> tuple:
+        """Return (starts, ends) as minutes since local midnight, uint16 arrays of shape (rows, 24)."""
+        rows_per_location = len(self.days)
+        zones = np.asarray(timezones, dtype=object)
+        first_day = self.days[0].astype(date) if len(self.days) else None
+        last_day = self.days[-1].astype(date) if len(self.days) else None
+        starts, ends = np.empty(self.starts.shape, np.uint16), np.empty(self.ends.shape, np.uint16)
+        for timezone_str in set(zones.tolist()):
+            locations = np.flatnonzero(zones == timezone_str)
+            rows = (locations[:, None] * rows_per_location + np.arange(rows_per_location)).ravel()
+            transitions, offsets = utc_offset_transitions(timezone_str, first_day, last_day)
+            for source, target in ((self.starts, starts), (self.ends, ends)):
+                epochs = source[rows]
+                local = epochs + offsets[np.searchsorted(transitions, epochs, side='right') - 1]
+                target[rows] = (local // 60) % 1440
+        return starts, ends
+
+    def schedules(self, geoname_ids, timezones, locations):
+        """Yield a DaySchedule for every valid row, in row order."""
+        start_minutes, end_minutes = self.local_minutes(timezones)
+        for row in np.flatnonzero(self.valid):
+            location_i, day_i = divmod(int(row), len(self.days))
+            date_str = self.days[day_i].astype(date).strftime("%d/%m/%Y")
+            location = locations[location_i]
+            codes = self.planets[row].tolist()
+            yield DaySchedule(
+                geoname_id=int(geoname_ids[location_i]),
+                date=date_str,
+                title=f"Hora for {location} on {date_str} (computed locally)",
+                location=location,
+                slots=[
+                    HoraSlot(PLANETS[code], NATURES[code], start, end)
+                    for code, start, end in zip(codes, start_minutes[row].tolist(), end_minutes[row].tolist())
+                ],
+            )
+
+
+def utc_offset_transitions(timezone_str: str, first_day: date, last_day: date) -> tuple:
+    """Return (transition epochs, UTC offsets in seconds) covering first_day - 1 … last_day + 2.
+
+    Offset k applies from transitions[k] on; the first transition is -inf.
+    DST changes are located to the minute by bisection between daily samples.
+    """
+    tz = ZoneInfo(timezone_str)
+
+    def offset_at(epoch: int) -> int:
+        return int(datetime.fromtimestamp(epoch, tz).utcoffset().total_seconds())
+
+    start = int(datetime.combine(first_day - timedelta(days=1), datetime.min.time(), timezone.utc).timestamp())
+    samples = [start + day * 86400 for day in range((last_day - first_day).days + 4)]
+    transitions, offsets = [np.iinfo(np.int64).min], [offset_at(samples[0])]
+    for before, after in zip(samples, samples[1:]):
+        offset = offset_at(after)
+        if offset == offsets[-1]:
+            continue
+        low, high = before, after  # offset_at(low) is the old offset, offset_at(high) the new one
+        while high - low > 60:
+            middle = (low + high) // 120 * 60
+            if offset_at(middle) == offsets[-1]:
+                low = middle
+            else:
+                high = middle
+        transitions.append(high)
+        offsets.append(offset)
+    return np.array(transitions, dtype=np.int64), np.array(offsets, dtype=np.int64)
+
+
+def _sun_params(t: np.ndarray) -> tuple:
+    """Vectorized hora_engine._sun_params: (declination in degrees, equation of time in minutes)."""
+    l0 = (280.46646 + t * (36000.76983 + t * 0.0003032)) % 360
+    m = 357.52911 + t * (35999.05029 - 0.0001537 * t)
+    e = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+    m_rad = np.radians(m)
+    center = (np.sin(m_rad) * (1.914602 - t * (0.004817 + 0.000014 * t))
+              + np.sin(2 * m_rad) * (0.019993 - 0.000101 * t)
+              + np.sin(3 * m_rad) * 0.000289)
+    omega = np.radians(125.04 - 1934.136 * t)
+    apparent_long = np.radians(l0 + center - 0.00569 - 0.00478 * np.sin(omega))
+    seconds = 21.448 - t * (46.8150 + t * (0.00059 - t * 0.001813))
+    obliquity = np.radians(23.0 + (26.0 + seconds / 60.0) / 60.0 + 0.00256 * np.cos(omega))
+
+    declination = np.degrees(np.arcsin(np.sin(obliquity) * np.sin(apparent_long)))
+
+    y = np.tan(obliquity / 2) ** 2
+    l0_rad = np.radians(l0)
+    eq_time = (y * np.sin(2 * l0_rad)
+               - 2 * e * np.sin(m_rad)
+               + 4 * e * y * np.sin(m_rad) * np.cos(2 * l0_rad)
+               - 0.5 * y * y * np.sin(4 * l0_rad)
+               - 1.25 * e * e * np.sin(2 * m_rad))
+    return declination, np.degrees(eq_time) * 4
+
+
+def _sun_event_utc_minutes(jd: np.ndarray, lat: np.ndarray, lng: np.ndarray, rising: bool) -> np.ndarray:
+    """Vectorized hora_engine._sun_event_utc_minutes; NaN where the sun does not rise or set."""
+    lat_rad = np.radians(lat)
+    cos_zenith = np.cos(np.radians(SUNRISE_ZENITH))
+    minutes = 720 - 4 * lng + 0 * jd
+    for _ in range(2):
+        declination, eq_time = _sun_params((jd + minutes / 1440.0 - 2451545.0) / 36525.0)
+        dec_rad = np.radians(declination)
+        cos_ha = cos_zenith / (np.cos(lat_rad) * np.cos(dec_rad)) - np.tan(lat_rad) * np.tan(dec_rad)
+        cos_ha = np.where(np.abs(cos_ha) <= 1.0, cos_ha, np.nan)
+        hour_angle = np.degrees(np.arccos(cos_ha))
+        delta = lng + hour_angle if rising else lng - hour_angle
+        minutes = 720 - 4 * delta - eq_time
+    return minutes
+
+
+def compute_table(lats, lngs, days) -> HoraTable:
+    """Compute the horas of every location (lats[i], lngs[i]) on every date in days.
+
+    `days` is anything np.asarray can turn into datetime64[D] (dates, ISO
+    strings). Like hora_engine, sun events are computed for the UTC day
+    matching the local date.
+    """
+    lats = np.asarray(lats, dtype=np.float64)[:, None]
+    lngs = np.asarray(lngs, dtype=np.float64)[:, None]
+    days = np.asarray(days, dtype='datetime64[D]')
+    day_numbers = days.astype(np.int64)
+    # One extra day for the next sunrise that closes the last night
+    event_days = np.append(day_numbers, day_numbers[-1] + 1 if len(day_numbers) else 0)
+    jd = event_days + UNIX_EPOCH_JD
+
+    with np.errstate(invalid='ignore'):
+        sunrise = event_days * 86400.0 + _sun_event_utc_minutes(jd, lats, lngs, True) * 60
+        sunset = day_numbers * 86400.0 + _sun_event_utc_minutes(jd[:-1], lats, lngs, False) * 60
+    next_sunrise, sunrise = sunrise[:, 1:], sunrise[:, :-1]
+
+    steps = np.arange(13) / 12
+    bounds = np.concatenate([
+        sunrise[..., None] + (sunset - sunrise)[..., None] * steps,
+        sunset[..., None] + (next_sunrise - sunset)[..., None] * steps[1:],
+    ], axis=-1).reshape(-1, 25)
+    valid = ~np.isnan(bounds).any(axis=1)
+    bounds = np.floor(np.nan_to_num(bounds)).astype(np.int64)
+
+    weekdays = (day_numbers + 3) % 7  # 1970-01-01 was a Thursday
+    order = (WEEKDAY_FIRST[weekdays][:, None] + np.arange(24)) % 7
+    planets = np.tile(CHALDEAN_CODES[order], (lats.shape[0], 1))
+
+    return HoraTable(
+        days=days,
+        n_locations=lats.shape[0],
+        sunrise=bounds[:, 0],
+        sunset=bounds[:, 12],
+        starts=bounds[:, :24],
+        ends=bounds[:, 1:],
+        planets=planets,
+        valid=valid,
+    )
+
+
+def _bench(cities: int, days: int, loop_cells: int):
+    import time
+
+    import hora_engine
+
+    rng = np.random.default_rng(0)
+    lats, lngs = rng.uniform(-60, 60, cities), rng.uniform(-180, 180, cities)
+    first_day = date.today()
+    day_list = [first_day + timedelta(days=i) for i in range(days)]
+    cells = cities * days
+
+    started = time.perf_counter()
+    table = compute_table(lats, lngs, day_list)
+    vector_seconds = time.perf_counter() - started
+
+    # The per-day engine is timed on a sample of cells and extrapolated
+    sample = min(loop_cells, cells)
+    started = time.perf_counter()
+    worst = 0.0
+    for row in range(sample):
+        location_i, day_i = divmod(row, days)
+        horas = hora_engine.compute_horas(day_list[day_i], lats[location_i], lngs[location_i], "UTC")
+        for i, (planet, start, end) in enumerate(horas):
+            worst = max(worst, abs(start.timestamp() - table.starts[row, i]), abs(end.timestamp() - table.ends[row, i]))
+            if PLANETS[table.planets[row, i]] != planet:
+                worst = float('inf')
+    loop_seconds = (time.perf_counter() - started) * cells / sample
+
+    print(f"{cities} cities x {days} days = {cells:,} cells, {int(table.valid.sum()):,} valid")
+    print(f"  hora_vector  {vector_seconds:8.3f} s  {cells / vector_seconds:12,.0f} cells/s")
+    print(f"  hora_engine  {loop_seconds:8.3f} s  {cells / loop_seconds:12,.0f} cells/s  (extrapolated from {sample:,} cells)")
+    print(f"  speedup {loop_seconds / vector_seconds:.0f}x, largest boundary difference {worst:.3f} s (epochs are whole seconds)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Vectorized hora tables for many locations and dates.")
+    parser.add_argument("--bench", action="store_true", help="time against a hora_engine loop")
+    parser.add_argument("--cities", type=int, default=500)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--loop-cells", type=int, default=2000, help="cells timed with hora_engine (extrapolated)")
+    args = parser.parse_args()
+
+    if args.bench:
+        _bench(args.cities, args.days, args.loop_cells)
+    else:
+        parser.print_help()
@@ -0,0 +1,41 @@
+"""Preset locations and the gazetteer that resolves custom geoname IDs.
+
+Kept apart from main.py so command-line tools can resolve locations without
+starting the API's HTTP client, browser pool and caches.
+"""
+import os
+
+import gazetteer
+
+# Common geoname IDs with timezone and coordinates
+LOCATIONS = {
+    "austin": {"geoname_id": 4671654, "timezone": "America/Chicago", "lat": 30.2672, "lng": -97.7431},
+    "san_diego": {"geoname_id": 5391811, "timezone": "America/Los_Angeles", "lat": 32.7157, "lng": -117.1611},
+    "los_angeles": {"geoname_id": 5368361, "timezone": "America/Los_Angeles", "lat": 34.0522, "lng": -118.2437},
+    "new_york": {"geoname_id": 5128581, "timezone": "America/New_York", "lat": 40.7128, "lng": -74.0060},
+    "chicago": {"geoname_id": 4887398, "timezone": "America/Chicago", "lat": 41.8781, "lng": -87.6298},
+    "houston": {"geoname_id": 4699066, "timezone": "America/Chicago", "lat": 29.7604, "lng": -95.3698},
+    "san_francisco": {"geoname_id": 5391959, "timezone": "America/Los_Angeles", "lat": 37.7749, "lng": -122.4194},
+    "chennai": {"geoname_id": 1264527, "timezone": "Asia/Kolkata", "lat": 13.0827, "lng": 80.2707},
+    "hyderabad": {"geoname_id": 1269843, "timezone": "Asia/Kolkata", "lat": 17.3850, "lng": 78.4867},
+    "mumbai": {"geoname_id": 1275339, "timezone": "Asia/Kolkata", "lat": 19.0760, "lng": 72.8777},
+    "bangalore": {"geoname_id": 1277333, "timezone": "Asia/Kolkata", "lat": 12.9716, "lng": 77.5946},
+    "delhi": {"geoname_id": 1273294, "timezone": "Asia/Kolkata", "lat": 28.6139, "lng": 77.2090},
+    "kolkata": {"geoname_id": 1275004, "timezone": "Asia/Kolkata", "lat": 22.5726, "lng": 88.3639},
+    "london": {"geoname_id": 2643743, "timezone": "Europe/London", "lat": 51.5074, "lng": -0.1278},
+    "sydney": {"geoname_id": 2147714, "timezone": "Australia/Sydney", "lat": -33.8688, "lng": 151.2093},
+    "singapore": {"geoname_id": 1880252, "timezone": "Asia/Singapore", "lat": 1.3521, "lng": 103.8198},
+}
+
+# Offline geonames gazetteer for custom geoname IDs (see gazetteer.py); presets always resolve
+GAZETTEER_PATH = os.environ.get("GAZETTEER_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.db"))
+GAZETTEER = gazetteer.Gazetteer(GAZETTEER_PATH, seed=[
+    gazetteer.Place(info["geoname_id"], key.replace("_", " ").title(), "", "", info["lat"], info["lng"], info["timezone"])
+    for key, info in LOCATIONS.items()
+])
+
+
+def location_name(geoname_id: int) -> str:
+    """Return the display name of a preset or gazetteer location, or 'Unknown'."""
+    place = GAZETTEER.get(geoname_id)
+    return place.name if place else "Unknown"
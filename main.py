@@ -1,24 +1,234 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, StreamingResponse
+from pydantic import BaseModel
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from datetime import datetime, timedelta
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
-from typing import Optional
+from typing import List, Optional
+import asyncio
+import email.utils
+import json
+import threading
 import time
 import re
 import os
 
-# Simple cache for scraped data (cache for 5 minutes)
-_hora_cache = {}
-CACHE_DURATION_MINUTES = 5
+import httpx
+
+import browser_pool
+import cache_backends
+import hora_cache
+import hora_calendar
+import hora_engine
+import hora_export
+import hora_parser
+import locations
+import prewarm
+from schedule import DayIndex, DaySchedule, HoraSlot
+
+# Bounded LRU cache of scraped day schedules. A schedule never changes for its
+# (geoname_id, date), so it is kept until the date is well in the past; the
+# clock-dependent fields are recomputed from it on every hit (see schedule_ttl).
+HORA_CACHE_MAX_ENTRIES = int(os.environ.get("HORA_CACHE_MAX_ENTRIES", 2048))
+HORA_CACHE_MAX_BYTES = int(os.environ.get("HORA_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+SCHEDULE_RETENTION_DAYS = int(os.environ.get("SCHEDULE_RETENTION_DAYS", 2))
+HISTORICAL_SCHEDULE_TTL_SECONDS = int(os.environ.get("HISTORICAL_SCHEDULE_TTL_SECONDS", 24 * 3600))
+INCOMPLETE_SCHEDULE_TTL_SECONDS = int(os.environ.get("INCOMPLETE_SCHEDULE_TTL_SECONDS", 5 * 60))
+# Expired schedules are served immediately while a background scrape refreshes them for up to
+# STALE_WHILE_REVALIDATE_SECONDS past expiry, and as a fallback when scraping fails for up to
+# STALE_IF_ERROR_SECONDS past expiry
+STALE_WHILE_REVALIDATE_SECONDS = int(os.environ.get("STALE_WHILE_REVALIDATE_SECONDS", 24 * 3600))
+STALE_IF_ERROR_SECONDS = int(os.environ.get("STALE_IF_ERROR_SECONDS", 7 * 24 * 3600))
+_hora_cache = hora_cache.TTLCache(
+    max_entries=HORA_CACHE_MAX_ENTRIES,
+    max_bytes=HORA_CACHE_MAX_BYTES,
+)
+
+# Per-day lookup indexes for /hora/current, rebuilt whenever the cached schedule object changes
+_day_indexes = hora_cache.TTLCache(max_entries=HORA_CACHE_MAX_ENTRIES)
+
+# Optional shared (L2) schedule cache behind the in-memory one: memory://, sqlite:///path or
+# redis://host:port/db. HORA_STORE_PATH is shorthand for a SQLite file on a persistent volume.
+HORA_STORE_PATH = os.environ.get("HORA_STORE_PATH")
+HORA_CACHE_BACKEND = os.environ.get("HORA_CACHE_BACKEND") or (f"sqlite://{HORA_STORE_PATH}" if HORA_STORE_PATH else None)
+HORA_STORE_RETENTION_DAYS = int(os.environ.get("HORA_STORE_RETENTION_DAYS", 30))
+HORA_STORE_COMPACT_INTERVAL_SECONDS = int(os.environ.get("HORA_STORE_COMPACT_INTERVAL_SECONDS", 3600))
+_cache_backend = cache_backends.from_url(HORA_CACHE_BACKEND) if HORA_CACHE_BACKEND else None
+
+# Cross-replica scrape lock: how long a holder may keep it, and how long others wait for it
+SCRAPE_LOCK_TTL_SECONDS = float(os.environ.get("SCRAPE_LOCK_TTL_SECONDS", 90))
+SCRAPE_LOCK_WAIT_SECONDS = float(os.environ.get("SCRAPE_LOCK_WAIT_SECONDS", 60))
+
+# Hora engines: 'scrape' reads drikpanchang.com, 'local' computes from sunrise/sunset,
+# 'compare' scrapes and diffs the result against the local computation
+HORA_ENGINES = ("scrape", "local", "compare")
+DEFAULT_ENGINE = os.environ.get("HORA_ENGINE", "scrape")
+
+# Long-lived Chrome sessions shared by all scrapes (see browser_pool.py)
+BROWSER_POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", 2))
+BROWSER_MAX_PAGES = int(os.environ.get("BROWSER_MAX_PAGES", 50))
+BROWSER_LEASE_TIMEOUT = float(os.environ.get("BROWSER_LEASE_TIMEOUT", 60))
+
+# Requests Chrome refuses during scrapes (CDP wildcard patterns): images, fonts, stylesheets,
+# ads, analytics and social widgets. The parser only needs the HTML and drikpanchang's own
+# scripts. BROWSER_BLOCKED_URL_PATTERNS replaces the default list; BROWSER_ALLOWED_URL_PATTERNS
+# removes individual entries from it. BROWSER_BLOCK_RESOURCES=0 disables blocking (for comparison).
+DEFAULT_BLOCKED_URL_PATTERNS = (
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.css",
+    "*googlesyndication.com*", "*doubleclick.net*", "*googletagservices.com*",
+    "*googletagmanager.com*", "*google-analytics.com*", "*adservice.google.*",
+    "*amazon-adsystem.com*", "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+    "*facebook.net*", "*facebook.com/tr*", "*scorecardresearch.com*", "*quantserve.com*",
+)
+BROWSER_BLOCK_RESOURCES = os.environ.get("BROWSER_BLOCK_RESOURCES", "1") == "1"
+_allowed_url_patterns = {p.strip() for p in os.environ.get("BROWSER_ALLOWED_URL_PATTERNS", "").split(",") if p.strip()}
+BLOCKED_URL_PATTERNS = [
+    pattern
+    for pattern in (p.strip() for p in os.environ.get("BROWSER_BLOCKED_URL_PATTERNS", ",".join(DEFAULT_BLOCKED_URL_PATTERNS)).split(","))
+    if pattern and pattern not in _allowed_url_patterns
+] if BROWSER_BLOCK_RESOURCES else []
+_page_load_lock = threading.Lock()
+_page_load_stats = {'pages': 0, 'bytes': 0, 'third_party_bytes': 0, 'resources': 0, 'total_ms': 0.0, 'last': None}
+
+# Scraped schedules are checked against the location: the first hora must start within
+# SUNRISE_TOLERANCE_MINUTES of the locally computed sunrise and belong to the weekday's lord.
+# The browser reloads the page up to SCRAPE_VALIDATION_ATTEMPTS times before giving up.
+SUNRISE_TOLERANCE_MINUTES = float(os.environ.get("SUNRISE_TOLERANCE_MINUTES", 10))
+SCRAPE_VALIDATION_ATTEMPTS = int(os.environ.get("SCRAPE_VALIDATION_ATTEMPTS", 3))
+_validation_lock = threading.Lock()
+_validation_stats = {'passed': 0, 'mismatched': 0, 'incomplete': 0, 'unverifiable': 0, 'retries': 0, 'rejected': 0, 'max_offset_minutes': 0.0}
+
+# Fetch strategies, tried in order: 'http' reads the server-rendered page over a pooled
+# keep-alive client; 'browser' loads it in headless Chrome. A strategy "wins" only with 24 horas.
+FETCH_STRATEGIES = [name.strip() for name in os.environ.get("FETCH_STRATEGIES", "http,browser").split(",") if name.strip()]
+HTTP_FETCH_TIMEOUT_SECONDS = float(os.environ.get("HTTP_FETCH_TIMEOUT_SECONDS", 10))
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+_http_client = httpx.Client(
+    headers={"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
+    timeout=HTTP_FETCH_TIMEOUT_SECONDS,
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    follow_redirects=True,
+)
+_strategy_lock = threading.Lock()
+_strategy_stats = {}
+
+# Scrapes proceed as soon as the hora table (and, for today, the "Running Hora" block) is in
+# the DOM, giving up after PAGE_READY_TIMEOUT_SECONDS
+PAGE_READY_TIMEOUT_SECONDS = float(os.environ.get("PAGE_READY_TIMEOUT_SECONDS", 14))
+PAGE_READY_POLL_SECONDS = float(os.environ.get("PAGE_READY_POLL_SECONDS", 0.1))
+_page_ready_lock = threading.Lock()
+_page_ready_stats = {'pages': 0, 'timeouts': 0, 'total_seconds': 0.0, 'max_seconds': 0.0, 'last_seconds': None}
+
+# Scrapes run on a dedicated thread pool so they never block the event loop.
+# Beyond SCRAPE_CONCURRENCY running + SCRAPE_QUEUE_LIMIT waiting, requests fail fast with 503.
+SCRAPE_CONCURRENCY = int(os.environ.get("SCRAPE_CONCURRENCY", BROWSER_POOL_SIZE))
+SCRAPE_QUEUE_LIMIT = int(os.environ.get("SCRAPE_QUEUE_LIMIT", 8))
+SCRAPE_RETRY_AFTER_SECONDS = int(os.environ.get("SCRAPE_RETRY_AFTER_SECONDS", 10))
+
+_scrape_executor = ThreadPoolExecutor(max_workers=SCRAPE_CONCURRENCY, thread_name_prefix="scrape")
+_scrape_pending = 0  # Accepted scrapes, running or queued (only touched on the event loop)
+_scrape_stats = {'submitted': 0, 'rejected': 0}
+
+# POST /hora/batch accepts at most BATCH_MAX_ITEMS items and fetches at most BATCH_CONCURRENCY
+# of its cache misses at a time (the scrape queue limits still apply on top)
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", 200))
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", SCRAPE_CONCURRENCY))
+
+# GET /hora/range covers at most HORA_RANGE_MAX_DAYS days per request
+HORA_RANGE_MAX_DAYS = int(os.environ.get("HORA_RANGE_MAX_DAYS", 62))
+
+# GET /export streams at most EXPORT_MAX_DAYS days of stored schedules per request
+EXPORT_MAX_DAYS = int(os.environ.get("EXPORT_MAX_DAYS", 366))
+
+# GET /calendar/{location}.ics covers CALENDAR_DAYS days from today unless asked otherwise (at
+# most CALENDAR_MAX_DAYS). Rendered feeds are kept until the location's next local midnight, so
+# clients re-polling get 304s (or the same bytes) without anything being recomputed.
+CALENDAR_DAYS = int(os.environ.get("CALENDAR_DAYS", 30))
+CALENDAR_MAX_DAYS = int(os.environ.get("CALENDAR_MAX_DAYS", 90))
+CALENDAR_MAX_AGE_SECONDS = int(os.environ.get("CALENDAR_MAX_AGE_SECONDS", 900))
+_calendar_feeds = hora_cache.TTLCache(max_entries=int(os.environ.get("CALENDAR_CACHE_MAX_ENTRIES", 512)))
+# When each feed body (by ETag) was first rendered: Last-Modified has to stay put when an evicted
+# feed is rendered again unchanged. The entries are tiny, so many more are kept than feeds.
+_calendar_first_rendered = hora_cache.TTLCache(max_entries=8 * _calendar_feeds.max_entries)
+_calendar_stats = {'renders': 0, 'served_cached': 0, 'not_modified': 0}
+
+# Pre-warm preset locations at startup and shortly before each local midnight
+PREWARM_ENABLED = os.environ.get("PREWARM_ENABLED", "1") == "1"
+PREWARM_LEAD_SECONDS = float(os.environ.get("PREWARM_LEAD_SECONDS", 600))
+PREWARM_JITTER_SECONDS = float(os.environ.get("PREWARM_JITTER_SECONDS", 300))
+PREWARM_CONCURRENCY = int(os.environ.get("PREWARM_CONCURRENCY", 1))
+_prewarm_scheduler = None
+
+# Single-flight: concurrent misses for the same cache key share one scrape task
+_inflight_scrapes = {}
+_coalesce_stats = {'leaders': 0, 'waiters': 0}
+
+# Stale-while-revalidate bookkeeping
+_background_refreshes = set()
+_stale_stats = {'stale_served': 0, 'stale_if_error': 0, 'background_refreshes': 0}
+
+
+async def compact_store_periodically():
+    """Expire old entries from the shared cache backend every HORA_STORE_COMPACT_INTERVAL_SECONDS."""
+    while True:
+        try:
+            await asyncio.to_thread(_cache_backend.compact)
+        except Exception as e:
+            print(f"Cache backend compaction failed: {e}")
+        await asyncio.sleep(HORA_STORE_COMPACT_INTERVAL_SECONDS)
+
+
+async def prewarm_schedule(location_key: str, date_str: str) -> bool:
+    """Scrape a preset location's schedule unless it is already cached."""
+    loc_info = LOCATIONS[location_key]
+    if await lookup_cached_schedule(loc_info["geoname_id"], date_str, loc_info["timezone"]) is not None:
+        return False
+    result = await scrape_hora_once(loc_info["geoname_id"], date_str, loc_info["timezone"], loc_info["lat"], loc_info["lng"])
+    if not result['success']:
+        raise RuntimeError(result.get('error', 'Failed to fetch hora data'))
+    return True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background jobs and release long-lived resources when the server shuts down."""
+    global _prewarm_scheduler
+    tasks = []
+    if _cache_backend:
+        tasks.append(asyncio.create_task(compact_store_periodically()))
+    if PREWARM_ENABLED:
+        _prewarm_scheduler = prewarm.PrewarmScheduler(
+            LOCATIONS,
+            prewarm_schedule,
+            lead_seconds=PREWARM_LEAD_SECONDS,
+            jitter_seconds=PREWARM_JITTER_SECONDS,
+            concurrency=PREWARM_CONCURRENCY,
+        )
+        tasks.append(asyncio.create_task(_prewarm_scheduler.run()))
+    yield
+    for task in tasks:
+        task.cancel()
+    _scrape_executor.shutdown(wait=False, cancel_futures=True)
+    _browser_pool.close()
+    _http_client.close()
+    if _cache_backend:
+        _cache_backend.close()
+    _gazetteer.close()
+
 
 app = FastAPI(
     title="Hora API",
     description="🕉️ Vedic Planetary Hours (Hora) API - Get auspicious timings from Drik Panchang",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Enable CORS
@@ -41,39 +251,33 @@ PLANET_INFO = {
     "Saturn": {"emoji": "♄", "nature": "Sluggish", "quality": "avoid"},
 }
 
-# Common geoname IDs with timezone and coordinates
-LOCATIONS = {
-    "austin": {"geoname_id": 4671654, "timezone": "America/Chicago", "lat": 30.2672, "lng": -97.7431},
-    "san_diego": {"geoname_id": 5391811, "timezone": "America/Los_Angeles", "lat": 32.7157, "lng": -117.1611},
-    "los_angeles": {"geoname_id": 5368361, "timezone": "America/Los_Angeles", "lat": 34.0522, "lng": -118.2437},
-    "new_york": {"geoname_id": 5128581, "timezone": "America/New_York", "lat": 40.7128, "lng": -74.0060},
-    "chicago": {"geoname_id": 4887398, "timezone": "America/Chicago", "lat": 41.8781, "lng": -87.6298},
-    "houston": {"geoname_id": 4699066, "timezone": "America/Chicago", "lat": 29.7604, "lng": -95.3698},
-    "san_francisco": {"geoname_id": 5391959, "timezone": "America/Los_Angeles", "lat": 37.7749, "lng": -122.4194},
-    "chennai": {"geoname_id": 1264527, "timezone": "Asia/Kolkata", "lat": 13.0827, "lng": 80.2707},
-    "hyderabad": {"geoname_id": 1269843, "timezone": "Asia/Kolkata", "lat": 17.3850, "lng": 78.4867},
-    "mumbai": {"geoname_id": 1275339, "timezone": "Asia/Kolkata", "lat": 19.0760, "lng": 72.8777},
-    "bangalore": {"geoname_id": 1277333, "timezone": "Asia/Kolkata", "lat": 12.9716, "lng": 77.5946},
-    "delhi": {"geoname_id": 1273294, "timezone": "Asia/Kolkata", "lat": 28.6139, "lng": 77.2090},
-    "kolkata": {"geoname_id": 1275004, "timezone": "Asia/Kolkata", "lat": 22.5726, "lng": 88.3639},
-    "london": {"geoname_id": 2643743, "timezone": "Europe/London", "lat": 51.5074, "lng": -0.1278},
-    "sydney": {"geoname_id": 2147714, "timezone": "Australia/Sydney", "lat": -33.8688, "lng": 151.2093},
-    "singapore": {"geoname_id": 1880252, "timezone": "Asia/Singapore", "lat": 1.3521, "lng": 103.8198},
-}
+# Preset locations and the gazetteer live in locations.py so CLIs can use them without the app
+LOCATIONS = locations.LOCATIONS
+GAZETTEER_PATH = locations.GAZETTEER_PATH
+_gazetteer = locations.GAZETTEER
+location_name = locations.location_name
+# Custom geoname IDs missing from the gazetteer (towns under 15,000 people, or no gazetteer file built)
+# are rejected with 404. With GAZETTEER_STRICT=0 engine=scrape still serves them, marked
+# `timezone_assumed`: "today" is taken in ASSUMED_TIMEZONE, the current-hora fields are left out
+# and sunrise validation is skipped.
+GAZETTEER_STRICT = os.environ.get("GAZETTEER_STRICT", "1").lower() not in ("0", "false", "no")
+ASSUMED_TIMEZONE = LOCATIONS["austin"]["timezone"]
 
 
-def get_chrome_driver(timezone: str = "America/Chicago", latitude: float = 30.2672, longitude: float = -97.7431):
-    """Configure and return Chrome WebDriver for headless operation with location emulation."""
-    # Set timezone environment variable to match target location
-    os.environ['TZ'] = timezone
+def get_chrome_driver():
+    """Configure and return Chrome WebDriver for headless operation.
     
+    The browser pool emulates each scrape's location inside the session when it is leased;
+    nothing process-wide such as os.environ['TZ'] is touched, so sessions for different
+    timezones can scrape concurrently.
+    """
     chrome_options = Options()
     chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+    chrome_options.add_argument(f"--user-agent={USER_AGENT}")
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     
     # Allow geolocation so we can spoof it
@@ -81,6 +285,8 @@ def get_chrome_driver(timezone: str = "America/Chicago", latitude: float = 30.26
         "profile.default_content_setting_values.geolocation": 1,  # Allow geolocation
         "profile.default_content_setting_values.notifications": 2,  # Block notifications
     }
+    if BROWSER_BLOCK_RESOURCES:
+        prefs["profile.managed_default_content_settings.images"] = 2  # Never decode images
     chrome_options.add_experimental_option("prefs", prefs)
     
     # For Cloud Run, Chrome is installed at a specific path
@@ -93,210 +299,617 @@ def get_chrome_driver(timezone: str = "America/Chicago", latitude: float = 30.26
     
     driver = webdriver.Chrome(options=chrome_options)
     
-    # Emulate Austin, TX location using Chrome DevTools Protocol
-    try:
-        # Set timezone
-        driver.execute_cdp_cmd('Emulation.setTimezoneOverride', {'timezoneId': timezone})
-        
-        # Set geolocation to Austin, TX coordinates
-        driver.execute_cdp_cmd('Emulation.setGeolocationOverride', {
-            'latitude': latitude,
-            'longitude': longitude,
-            'accuracy': 100
-        })
-    except Exception:
-        pass  # CDP commands may not be supported in all Chrome versions
+    # Skip everything the parser does not need
+    browser_pool.block_urls(driver, BLOCKED_URL_PATTERNS)
     
     return driver
 
 
-def time_to_minutes(time_str: str, ampm: str) -> int:
-    """Convert time string to minutes since midnight."""
-    parts = time_str.split(':')
-    hour, minute = int(parts[0]), int(parts[1])
-    if ampm == 'PM' and hour != 12:
-        hour += 12
-    elif ampm == 'AM' and hour == 12:
-        hour = 0
-    return hour * 60 + minute
+_browser_pool = browser_pool.BrowserPool(
+    get_chrome_driver,
+    size=BROWSER_POOL_SIZE,
+    max_pages=BROWSER_MAX_PAGES,
+    lease_timeout=BROWSER_LEASE_TIMEOUT,
+    session_errors=(WebDriverException,),
+)
+
+
+def format_minutes(minutes: int) -> str:
+    """Convert minutes since midnight to the 'HH:MM AM' format used by Drik Panchang."""
+    hour, minute = divmod(minutes % (24 * 60), 60)
+    ampm = 'AM' if hour < 12 else 'PM'
+    return f"{hour % 12 or 12:02d}:{minute:02d} {ampm}"
+
+
+def build_hora_entry(slot: HoraSlot) -> dict:
+    """Materialize a hora slot in the API's response shape."""
+    info = PLANET_INFO.get(slot.planet, {})
+    return {
+        'planet': slot.planet,
+        'nature': slot.nature,
+        'emoji': info.get('emoji', '🌟'),
+        'quality': info.get('quality', 'neutral'),
+        'start': format_minutes(slot.start_minutes),
+        'end': format_minutes(slot.end_minutes),
+        'start_minutes': slot.start_minutes,
+        'end_minutes': slot.end_minutes,
+    }
+
+
+def find_current_slot(slots: tuple, now: datetime) -> Optional[int]:
+    """Return the index of the slot containing a local time, or None."""
+    current_minutes = now.hour * 60 + now.minute
+    
+    for i, slot in enumerate(slots):
+        start_mins = slot.start_minutes
+        end_mins = slot.end_minutes
+        
+        # Handle overnight
+        if end_mins < start_mins:
+            end_mins += 24 * 60
+            check_mins = current_minutes + 24 * 60 if current_minutes < 12 * 60 else current_minutes
+        else:
+            check_mins = current_minutes
+        
+        if start_mins <= check_mins < end_mins:
+            return i
+    
+    return None
+
+
+def build_hora_response(schedule: DaySchedule, timezone_str: str, engine: str = "scrape") -> dict:
+    """Build a fresh /hora response from an immutable schedule and the location's current time."""
+    slots = schedule.slots  # Materialized only here, when building the response
+    hora_schedule = [build_hora_entry(slot) for slot in slots]
+    
+    # Current time analysis - USE LOCATION'S TIMEZONE
+    now = datetime.now(ZoneInfo(timezone_str))
+    current_hora = None
+    next_hora = None
+    
+    i = find_current_slot(slots, now)
+    if i is not None:
+        current_hora = hora_schedule[i]
+        if i + 1 < len(hora_schedule):
+            next_hora = hora_schedule[i + 1]
+    elif schedule.running_hora:
+        # Fall back to the "Running Hora" block captured from the page
+        current_hora = build_hora_entry(schedule.running_hora)
+    
+    return {
+        'success': True,
+        'engine': engine,
+        'title': schedule.title,
+        'location': schedule.location,
+        'date': schedule.date,
+        'geoname_id': schedule.geoname_id,
+        'current_time': now.strftime("%I:%M %p"),
+        'current_hora': current_hora,
+        'next_hora': next_hora,
+        'jupiter_horas': [h for h in hora_schedule if h['planet'] == 'Jupiter'],
+        'day_horas': hora_schedule[:12],
+        'night_horas': hora_schedule[12:24],
+        'full_schedule': hora_schedule,
+    }
+
+
+def compute_schedule_local(geoname_id: int, date_str: str, timezone_str: str, lat: float, lng: float) -> DaySchedule:
+    """Compute a day's hora schedule from sunrise/sunset. Raises ValueError for bad dates or polar days."""
+    day = datetime.strptime(date_str, "%d/%m/%Y").date()
+    slots = tuple(
+        HoraSlot(planet, PLANET_INFO[planet]['nature'], start.hour * 60 + start.minute, end.hour * 60 + end.minute)
+        for planet, start, end in hora_engine.compute_horas(day, lat, lng, timezone_str)
+    )
+    location = location_name(geoname_id)
+    return DaySchedule(
+        geoname_id=geoname_id,
+        date=date_str,
+        title=f"Hora for {location} on {date_str} (computed locally)",
+        location=location,
+        slots=slots,
+    )
+
+
+def compute_hora_local(geoname_id: int, date_str: str, timezone_str: str = "America/Chicago", lat: float = 30.2672, lng: float = -97.7431) -> dict:
+    """Compute the hora schedule locally from sunrise/sunset, without scraping."""
+    try:
+        schedule = compute_schedule_local(geoname_id, date_str, timezone_str, lat, lng)
+    except ValueError as e:
+        return {
+            'success': False,
+            'error': str(e),
+        }
+    return build_hora_response(schedule, timezone_str, engine="local")
+
+
+def compare_hora_results(scraped: dict, local: dict) -> dict:
+    """Diff a scraped hora schedule against the locally computed one."""
+    scraped_schedule = scraped.get('full_schedule', [])
+    local_schedule = local.get('full_schedule', [])
+    
+    def delta(a: int, b: int) -> int:
+        # Signed difference in minutes, wrapped to the nearest side of midnight
+        return (a - b + 12 * 60) % (24 * 60) - 12 * 60
+    
+    mismatches = []
+    max_delta = 0
+    for i, (s, l) in enumerate(zip(scraped_schedule, local_schedule)):
+        start_delta = delta(s['start_minutes'], l['start_minutes'])
+        end_delta = delta(s['end_minutes'], l['end_minutes'])
+        max_delta = max(max_delta, abs(start_delta), abs(end_delta))
+        if s['planet'] != l['planet'] or start_delta or end_delta:
+            mismatches.append({
+                'index': i,
+                'scraped': {'planet': s['planet'], 'start': s['start'], 'end': s['end']},
+                'local': {'planet': l['planet'], 'start': l['start'], 'end': l['end']},
+                'start_delta_minutes': start_delta,
+                'end_delta_minutes': end_delta,
+            })
+    
+    return {
+        'scraped_count': len(scraped_schedule),
+        'local_count': len(local_schedule),
+        'planets_match': len(scraped_schedule) == len(local_schedule)
+                         and all(s['planet'] == l['planet'] for s, l in zip(scraped_schedule, local_schedule)),
+        'max_delta_minutes': max_delta,
+        'mismatches': mismatches,
+    }
+
+
+def parse_hora_page(geoname_id: int, date_str: str, page_title: str, page_source: str) -> DaySchedule:
+    """Extract the hora table, running hora and location from a Drik Panchang page."""
+    # Extract location from page title
+    location_match = re.search(r'for\s+([^,]+,\s*[^,]+,\s*[^"<]+)', page_title)
+    detected_location = location_match.group(1).strip() if location_match else "Unknown"
+    
+    # Single linear pass over the page (see hora_parser.py)
+    return DaySchedule(
+        geoname_id=geoname_id,
+        date=date_str,
+        title=page_title,
+        location=detected_location,
+        slots=hora_parser.parse_slots(page_source),
+        running_hora=hora_parser.parse_running_hora(page_source),
+    )
+
+
+def schedule_ttl(schedule: DaySchedule, timezone_str: str) -> float:
+    """Seconds to cache a day schedule.
+
+    Today's and future schedules live until SCHEDULE_RETENTION_DAYS after their
+    date has ended locally; historical ones get a fixed day-long TTL. Partial
+    scrapes (anything but 24 horas) are only kept briefly so they get retried.
+    """
+    try:
+        day = datetime.strptime(schedule.date, "%d/%m/%Y").date()
+    except ValueError:
+        day = None
+    if day is None or len(schedule) != 24:
+        return INCOMPLETE_SCHEDULE_TTL_SECONDS
+    
+    tz = ZoneInfo(timezone_str)
+    expires = datetime.combine(day + timedelta(days=1 + SCHEDULE_RETENTION_DAYS), datetime.min.time(), tz)
+    remaining = (expires - datetime.now(tz)).total_seconds()
+    return max(remaining, HISTORICAL_SCHEDULE_TTL_SECONDS)
+
+
+def _cache_in_memory(schedule: DaySchedule, ttl: float):
+    # Keep complete schedules around past expiry for stale-while-revalidate / stale-if-error
+    stale_ttl = max(STALE_WHILE_REVALIDATE_SECONDS, STALE_IF_ERROR_SECONDS) if len(schedule) == 24 else 0
+    _hora_cache.set(f"{schedule.geoname_id}_{schedule.date}", schedule, ttl=ttl, stale_ttl=stale_ttl)
+
+
+def cache_schedule(schedule: DaySchedule, timezone_str: str):
+    """Put a freshly fetched schedule in the in-memory cache and the shared backend.
+    
+    An incomplete schedule never replaces a complete one, fresh or stale, so the
+    stale-if-error fallback survives a bad refresh.
+    """
+    if len(schedule) != 24:
+        previous = _hora_cache.get_stale(f"{schedule.geoname_id}_{schedule.date}")
+        if previous is not None and len(previous[0]) == 24:
+            print(f"Keeping cached schedule {schedule.geoname_id} {schedule.date}: refresh had only {len(schedule)} of 24 horas")
+            return
+    ttl = schedule_ttl(schedule, timezone_str)
+    _cache_in_memory(schedule, ttl)
+    # Only complete schedules are worth sharing and keeping across restarts
+    if _cache_backend and len(schedule) == 24:
+        try:
+            _cache_backend.put(schedule, ttl=max(ttl, HORA_STORE_RETENTION_DAYS * 24 * 3600))
+        except Exception as e:
+            print(f"Failed to persist schedule {schedule.geoname_id} {schedule.date}: {e}")
+
+
+def _get_backend_schedule(geoname_id: int, date_str: str, timezone_str: str) -> Optional[DaySchedule]:
+    # Blocking (network I/O for Redis); copies hits into the in-memory cache
+    try:
+        schedule = _cache_backend.get(geoname_id, date_str)
+    except Exception as e:
+        print(f"Cache backend lookup failed: {e}")
+        return None
+    if schedule is not None:
+        _cache_in_memory(schedule, schedule_ttl(schedule, timezone_str))
+    return schedule
+
+
+def get_cached_schedule(geoname_id: int, date_str: str, timezone_str: str = "America/Chicago") -> Optional[DaySchedule]:
+    """Look a schedule up in the in-memory L1 cache, then in the shared backend.
+    
+    Blocks on the backend; code on the event loop uses lookup_cached_schedule().
+    """
+    schedule = _hora_cache.get(f"{geoname_id}_{date_str}")
+    if schedule is None and _cache_backend:
+        schedule = _get_backend_schedule(geoname_id, date_str, timezone_str)
+    return schedule
+
+
+async def lookup_cached_schedule(geoname_id: int, date_str: str, timezone_str: str = "America/Chicago") -> Optional[DaySchedule]:
+    """get_cached_schedule() for the event loop: L1 inline, the shared backend on a worker thread."""
+    schedule = _hora_cache.get(f"{geoname_id}_{date_str}")
+    if schedule is None and _cache_backend:
+        schedule = await asyncio.to_thread(_get_backend_schedule, geoname_id, date_str, timezone_str)
+    return schedule
+
+
+def get_cached_hora(geoname_id: int, date_str: str, timezone_str: str = "America/Chicago") -> Optional[dict]:
+    """Return a response built from the cached schedule, or None on a cache miss."""
+    schedule = get_cached_schedule(geoname_id, date_str, timezone_str)
+    if schedule is None:
+        return None
+    return build_hora_response(schedule, timezone_str)
 
 
 def scrape_hora(geoname_id: int, date_str: str, timezone_str: str = "America/Chicago", lat: float = 30.2672, lng: float = -97.7431) -> dict:
     """Scrape hora data from Drik Panchang using explicit geoname-id with location emulation."""
-    global _hora_cache
+    cached = get_cached_hora(geoname_id, date_str, timezone_str)
+    if cached is not None:
+        return cached
     
-    # Create cache key
-    cache_key = f"{geoname_id}_{date_str}"
+    if not _cache_backend:
+        return _scrape_and_cache(geoname_id, date_str, timezone_str, lat, lng)
     
-    # Check if we have valid cached data
-    if cache_key in _hora_cache:
-        cached_data, cached_time = _hora_cache[cache_key]
-        if datetime.now() - cached_time < timedelta(minutes=CACHE_DURATION_MINUTES):
-            # Update current_time in cached data to reflect actual current time
-            tz = ZoneInfo(timezone_str)
-            now = datetime.now(tz)
-            cached_data['current_time'] = now.strftime("%I:%M %p")
-            
-            # Re-calculate current hora based on actual current time
-            current_minutes = now.hour * 60 + now.minute
-            for i, hora in enumerate(cached_data.get('full_schedule', [])):
-                start_mins = hora['start_minutes']
-                end_mins = hora['end_minutes']
-                if end_mins < start_mins:
-                    end_mins += 24 * 60
-                    check_mins = current_minutes + 24 * 60 if current_minutes < 12 * 60 else current_minutes
-                else:
-                    check_mins = current_minutes
-                if start_mins <= check_mins < end_mins:
-                    cached_data['current_hora'] = hora
-                    if i + 1 < len(cached_data['full_schedule']):
-                        cached_data['next_hora'] = cached_data['full_schedule'][i + 1]
-                    break
-            
-            return cached_data
+    # Only one replica scrapes a key at a time; the others wait for its result in the shared cache.
+    # A lock timeout or an unreachable backend yields False and we scrape without the lock.
+    lock = _cache_backend.lock(f"scrape:{geoname_id}_{date_str}", ttl=SCRAPE_LOCK_TTL_SECONDS, wait=SCRAPE_LOCK_WAIT_SECONDS)
+    with lock:
+        cached = get_cached_hora(geoname_id, date_str, timezone_str)
+        if cached is not None:
+            return cached
+        return _scrape_and_cache(geoname_id, date_str, timezone_str, lat, lng)
+
+
+def wait_for_hora_table(driver, expect_running_hora: bool, timeout: float = None) -> float:
+    """Wait until the hora table is rendered; returns the seconds waited.
+    
+    Returns after `timeout` even if the page is incomplete, leaving validation to the caller.
+    """
+    timeout = PAGE_READY_TIMEOUT_SECONDS if timeout is None else timeout
+    started = time.monotonic()
+    timed_out = False
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=PAGE_READY_POLL_SECONDS).until(
+            lambda d: d.execute_script(hora_parser.TABLE_READY_SCRIPT, expect_running_hora)
+        )
+    except TimeoutException:
+        timed_out = True
+    waited = time.monotonic() - started
+    
+    with _page_ready_lock:
+        _page_ready_stats['pages'] += 1
+        _page_ready_stats['timeouts'] += timed_out
+        _page_ready_stats['total_seconds'] += waited
+        _page_ready_stats['max_seconds'] = max(_page_ready_stats['max_seconds'], waited)
+        _page_ready_stats['last_seconds'] = round(waited, 3)
+    return waited
+
+
+# Bytes transferred for the document and every subresource so far, and time since navigation
+# start. Third-party sizes are 0 unless the host sends Timing-Allow-Origin, so they are a floor.
+PAGE_LOAD_METRICS_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let bytes = nav ? nav.transferSize : 0, thirdParty = 0;
+for (const r of resources) {
+    bytes += r.transferSize;
+    if (new URL(r.name).hostname !== location.hostname) thirdParty += r.transferSize;
+}
+return {bytes: bytes, third_party_bytes: thirdParty, resources: resources.length, elapsed_ms: performance.now()};
+"""
+
+
+def record_page_load(driver) -> Optional[dict]:
+    """Add the current page's transfer size and load time to the page_load stats."""
+    try:
+        metrics = driver.execute_script(PAGE_LOAD_METRICS_SCRIPT)
+    except Exception:
+        return None  # Metrics are best-effort; never fail a scrape over them
+    with _page_load_lock:
+        _page_load_stats['pages'] += 1
+        _page_load_stats['bytes'] += metrics['bytes']
+        _page_load_stats['third_party_bytes'] += metrics['third_party_bytes']
+        _page_load_stats['resources'] += metrics['resources']
+        _page_load_stats['total_ms'] += metrics['elapsed_ms']
+        _page_load_stats['last'] = {**metrics, 'elapsed_ms': round(metrics['elapsed_ms'])}
+    return metrics
+
+
+def _count_validation(counter: str, offset: float = None):
+    with _validation_lock:
+        _validation_stats[counter] += 1
+        if offset is not None:
+            _validation_stats['max_offset_minutes'] = max(_validation_stats['max_offset_minutes'], abs(offset))
+
+
+def sunrise_offset(schedule: DaySchedule, timezone_str: str, lat: float, lng: float) -> Optional[float]:
+    """Minutes between the schedule's first hora and the computed sunrise, or None if unknown."""
+    if not len(schedule):
+        return None
+    try:
+        day = datetime.strptime(schedule.date, "%d/%m/%Y").date()
+        sunrise, _ = hora_engine.sun_times(day, lat, lng, timezone_str)
+    except ValueError:
+        return None  # Unparseable date, or no sunrise (polar day/night)
+    expected = sunrise.hour * 60 + sunrise.minute + sunrise.second / 60
+    return (schedule.starts[0] - expected + 720) % 1440 - 720
+
+
+def validate_schedule(schedule: DaySchedule, timezone_str: str, lat: float, lng: float) -> bool:
+    """Check that a complete schedule's sunrise and first hora fit the location and date it was fetched for.
     
+    Schedules that cannot be checked (polar days, locations without coordinates) are let through.
+    Callers handle pages with fewer than 24 rows themselves.
+    """
+    offset = sunrise_offset(schedule, timezone_str, lat, lng) if lat is not None else None
+    if offset is None:
+        _count_validation('unverifiable')
+        return True
+    weekday_lord = hora_engine.WEEKDAY_LORDS[datetime.strptime(schedule.date, "%d/%m/%Y").weekday()]
+    if abs(offset) <= SUNRISE_TOLERANCE_MINUTES and schedule.slot(0).planet == weekday_lord:
+        _count_validation('passed', offset)
+        return True
+    _count_validation('mismatched')
+    print(f"Schedule for {schedule.geoname_id} {schedule.date} starts {offset:+.0f} min from sunrise "
+          f"with {schedule.slot(0).planet} (expected ±{SUNRISE_TOLERANCE_MINUTES:.0f} min, {weekday_lord})")
+    return False
+
+
+def hora_page_url(geoname_id: int, date_str: str) -> str:
     # Use geoname-id parameter - this determines the location's hora schedule
     # geoname-id=4671654 for Austin, TX
-    url = f"https://www.drikpanchang.com/muhurat/hora.html?geoname-id={geoname_id}&date={date_str}"
+    return f"https://www.drikpanchang.com/muhurat/hora.html?geoname-id={geoname_id}&date={date_str}"
+
+
+def fetch_schedule_http(geoname_id: int, date_str: str, timezone_str: str, lat: float, lng: float) -> DaySchedule:
+    """Fetch the hora page's server-rendered HTML over the pooled HTTP client and parse it."""
+    response = _http_client.get(hora_page_url(geoname_id, date_str))
+    response.raise_for_status()
+    page_source = response.text
+    schedule = parse_hora_page(geoname_id, date_str, hora_parser.parse_title(page_source), page_source)
+    # Unrendered pages are common here; fetch_schedule moves on to the next strategy
+    if len(schedule) == 24 and not validate_schedule(schedule, timezone_str, lat, lng):
+        _count_validation('rejected')
+        raise ValueError("Page did not match the location's sunrise")
+    return schedule
+
+
+def fetch_schedule_browser(geoname_id: int, date_str: str, timezone_str: str, lat: float, lng: float) -> DaySchedule:
+    """Load the hora page in a pooled headless Chrome emulating the location and parse it."""
+    url = hora_page_url(geoname_id, date_str)
     
-    driver = get_chrome_driver(timezone_str, lat, lng)
+    # The "Running Hora" block is only shown for the location's current date, which is
+    # unknown when the timezone is assumed (no coordinates)
+    expect_running_hora = lat is not None and date_str == datetime.now(ZoneInfo(timezone_str)).strftime("%d/%m/%Y")
     
-    try:
-        # Try up to 3 times to get valid Austin data
-        valid_data = False
-        for attempt in range(3):
+    problem = "was not loaded"
+    with _browser_pool.lease(timezone_str, lat, lng) as driver:
+        for attempt in range(SCRAPE_VALIDATION_ATTEMPTS):
+            if attempt:
+                # Wrong data usually comes from state the site kept for a previous location
+                _count_validation('retries')
+                browser_pool.reset_session(driver)
             driver.get(url)
-            time.sleep(6 + attempt * 2)  # Wait longer on retries
+            wait_for_hora_table(driver, expect_running_hora)
+            record_page_load(driver)
             
-            page_source = driver.page_source
-            
-            # For Austin, validate first hora starts around 7:20-7:30 AM
-            if geoname_id == 4671654:
-                first_match = re.search(r'(\d{1,2}):(\d{2})\s*<span[^>]*>AM</span>', page_source)
-                if first_match:
-                    hour = int(first_match.group(1))
-                    minute = int(first_match.group(2))
-                    first_minutes = hour * 60 + minute
-                    # Austin sunrise in Dec is ~7:20-7:30 AM (440-450 minutes)
-                    if 435 <= first_minutes <= 455:
-                        valid_data = True
-                        break
-                    # Wrong data, clear cookies and retry
-                    driver.delete_all_cookies()
-            else:
-                valid_data = True
-                break
-        
-        if not valid_data and geoname_id == 4671654:
-            # Last attempt, just accept whatever we get
-            driver.get(url)
-            time.sleep(8)
-            page_source = driver.page_source
-        
-        page_title = driver.title
-        page_source = driver.page_source
-        
-        # Extract location from page title
-        location_match = re.search(r'for\s+([^,]+,\s*[^,]+,\s*[^"<]+)', page_title)
-        detected_location = location_match.group(1).strip() if location_match else "Unknown"
-        
-        # Extract running hora
-        running_hora_match = re.search(
-            r'Running Hora.*?<div class="dpPHeaderLeftTitle">(.*?)</div>.*?(\d{1,2}:\d{2})\s*<span[^>]*>([AP]M)</span>\s*<span[^>]*>to\s*</span>.*?(\d{1,2}:\d{2})\s*<span[^>]*>([AP]M)</span>',
-            page_source, re.DOTALL
-        )
-        
-        # Extract all hora entries from the table
-        hora_pattern = r'<span class="dpVerticalMiddleText">(Jupiter|Mars|Sun|Venus|Mercury|Moon|Saturn)\s*-\s*(Fruitful|Aggressive|Vigorous|Beneficial|Quick|Gentle|Sluggish).*?</span>.*?<span class="dpVerticalMiddleText">(\d{1,2}:\d{2})\s*<span[^>]*>([AP]M)</span>\s*<span[^>]*>to\s*</span>.*?(\d{1,2}:\d{2})\s*<span[^>]*>([AP]M)</span>'
-        matches = re.findall(hora_pattern, page_source, re.DOTALL)
-        
-        # Build hora schedule
-        hora_schedule = []
-        for planet, nature, start_time, start_ampm, end_time, end_ampm in matches:
-            hora_schedule.append({
-                'planet': planet,
-                'nature': nature,
-                'emoji': PLANET_INFO.get(planet, {}).get('emoji', '🌟'),
-                'quality': PLANET_INFO.get(planet, {}).get('quality', 'neutral'),
-                'start': f"{start_time} {start_ampm}",
-                'end': f"{end_time} {end_ampm}",
-                'start_minutes': time_to_minutes(start_time, start_ampm),
-                'end_minutes': time_to_minutes(end_time, end_ampm),
-            })
-        
-        # Current time analysis - USE LOCATION'S TIMEZONE
-        tz = ZoneInfo(timezone_str)
-        now = datetime.now(tz)
-        current_minutes = now.hour * 60 + now.minute
-        
-        current_hora = None
-        next_hora = None
-        
-        for i, hora in enumerate(hora_schedule):
-            start_mins = hora['start_minutes']
-            end_mins = hora['end_minutes']
-            
-            # Handle overnight
-            if end_mins < start_mins:
-                end_mins += 24 * 60
-                check_mins = current_minutes + 24 * 60 if current_minutes < 12 * 60 else current_minutes
-            else:
-                check_mins = current_minutes
-            
-            if start_mins <= check_mins < end_mins:
-                current_hora = hora
-                if i + 1 < len(hora_schedule):
-                    next_hora = hora_schedule[i + 1]
-                break
-        
-        # Extract from running hora if available
-        if running_hora_match and not current_hora:
-            planet_nature = running_hora_match.group(1)
-            planet = planet_nature.split(' - ')[0].strip()
-            nature = planet_nature.split(' - ')[1].strip() if ' - ' in planet_nature else ""
-            current_hora = {
-                'planet': planet,
-                'nature': nature,
-                'emoji': PLANET_INFO.get(planet, {}).get('emoji', '🌟'),
-                'quality': PLANET_INFO.get(planet, {}).get('quality', 'neutral'),
-                'start': f"{running_hora_match.group(2)} {running_hora_match.group(3)}",
-                'end': f"{running_hora_match.group(4)} {running_hora_match.group(5)}",
-            }
-        
-        # Separate day and night horas
-        day_horas = hora_schedule[:12] if len(hora_schedule) >= 12 else hora_schedule
-        night_horas = hora_schedule[12:24] if len(hora_schedule) >= 24 else hora_schedule[12:]
-        
-        # Get Jupiter horas
-        jupiter_horas = [h for h in hora_schedule if h['planet'] == 'Jupiter']
-        
-        result = {
-            'success': True,
-            'title': page_title,
-            'location': detected_location,
-            'date': date_str,
-            'geoname_id': geoname_id,
-            'current_time': now.strftime("%I:%M %p"),
-            'current_hora': current_hora,
-            'next_hora': next_hora,
-            'jupiter_horas': jupiter_horas,
-            'day_horas': day_horas,
-            'night_horas': night_horas,
-            'full_schedule': hora_schedule,
-        }
-        
-        # Cache the result
-        _hora_cache[cache_key] = (result.copy(), datetime.now())
-        
-        return result
+            schedule = parse_hora_page(geoname_id, date_str, driver.title, driver.page_source)
+            if len(schedule) < 24:
+                _count_validation('incomplete')
+                problem = f"had only {len(schedule)} of 24 horas"
+                continue
+            if validate_schedule(schedule, timezone_str, lat, lng):
+                return schedule
+            problem = "did not match the location's sunrise"
         
+        _count_validation('rejected')
+        raise ValueError(f"Page {problem} after {SCRAPE_VALIDATION_ATTEMPTS} attempts")
+
+
+FETCH_STRATEGY_FUNCTIONS = {
+    "http": fetch_schedule_http,
+    "browser": fetch_schedule_browser,
+}
+_unknown_strategies = set(FETCH_STRATEGIES) - set(FETCH_STRATEGY_FUNCTIONS)
+if _unknown_strategies:
+    raise ValueError(f"Unknown FETCH_STRATEGIES: {', '.join(sorted(_unknown_strategies))}")
+
+
+def _record_strategy(name: str, outcome: str, seconds: float):
+    with _strategy_lock:
+        stats = _strategy_stats.setdefault(name, {'attempts': 0, 'successes': 0, 'invalid': 0, 'errors': 0, 'total_seconds': 0.0})
+        stats['attempts'] += 1
+        stats[outcome] += 1
+        stats['total_seconds'] += seconds
+
+
+def fetch_schedule(geoname_id: int, date_str: str, timezone_str: str, lat: float, lng: float) -> DaySchedule:
+    """Try each of FETCH_STRATEGIES in order until one yields a full 24-hora schedule.
+    
+    If none does and a strategy raised (including for failing validate_schedule),
+    the last error is re-raised. Otherwise the most complete partial schedule is
+    returned, and ValueError is raised if no strategy found any rows.
+    """
+    best = None
+    last_error = None
+    for name in FETCH_STRATEGIES:
+        started = time.perf_counter()
+        try:
+            schedule = FETCH_STRATEGY_FUNCTIONS[name](geoname_id, date_str, timezone_str, lat, lng)
+        except Exception as e:
+            _record_strategy(name, 'errors', time.perf_counter() - started)
+            last_error = e
+            continue
+        if len(schedule) == 24:
+            _record_strategy(name, 'successes', time.perf_counter() - started)
+            return schedule
+        _record_strategy(name, 'invalid', time.perf_counter() - started)
+        if len(schedule) and (best is None or len(schedule) > len(best)):
+            best = schedule
+    
+    # An unrendered page from an earlier strategy must not mask a later strategy's error
+    if last_error is not None:
+        raise last_error
+    if best is not None:
+        return best
+    if not FETCH_STRATEGIES:
+        raise RuntimeError("No fetch strategy configured")
+    raise ValueError(f"No hora rows found on the page for {geoname_id} {date_str}")
+
+
+def _scrape_and_cache(geoname_id: int, date_str: str, timezone_str: str, lat: float, lng: float) -> dict:
+    try:
+        schedule = fetch_schedule(geoname_id, date_str, timezone_str, lat, lng)
     except Exception as e:
         return {
             'success': False,
             'error': str(e),
         }
+    
+    # Cache only the immutable schedule; per-request fields are rebuilt on every hit
+    cache_schedule(schedule, timezone_str)
+    
+    return build_hora_response(schedule, timezone_str)
+
+
+async def run_scrape(func, *args):
+    """Run a blocking scrape on the scrape executor, or fail fast with 503 when saturated."""
+    global _scrape_pending
+    if _scrape_pending >= SCRAPE_CONCURRENCY + SCRAPE_QUEUE_LIMIT:
+        _scrape_stats['rejected'] += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Too many hora lookups in progress, please retry shortly.",
+            headers={"Retry-After": str(SCRAPE_RETRY_AFTER_SECONDS)},
+        )
+    
+    _scrape_pending += 1
+    _scrape_stats['submitted'] += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_scrape_executor, func, *args)
     finally:
-        driver.quit()
+        _scrape_pending -= 1
+
+
+async def scrape_hora_once(geoname_id: int, date_str: str, timezone_str: str, lat: float, lng: float) -> dict:
+    """Scrape a (geoname_id, date) at most once at a time; concurrent callers await the same result."""
+    cache_key = f"{geoname_id}_{date_str}"
+    task = _inflight_scrapes.get(cache_key)
+    if task is not None:
+        _coalesce_stats['waiters'] += 1
+    else:
+        _coalesce_stats['leaders'] += 1
+        task = asyncio.ensure_future(run_scrape(scrape_hora, geoname_id, date_str, timezone_str, lat, lng))
+        _inflight_scrapes[cache_key] = task
+        
+        def _done(t):
+            _inflight_scrapes.pop(cache_key, None)
+            if not t.cancelled():
+                t.exception()  # Mark as retrieved even if every caller has gone away
+        task.add_done_callback(_done)
+    
+    # Shield so one disconnecting client does not cancel the scrape for everyone else
+    return await asyncio.shield(task)
+
+
+async def _refresh_schedule(geoname_id: int, date_str: str, timezone_str: str, lat: float, lng: float):
+    try:
+        result = await scrape_hora_once(geoname_id, date_str, timezone_str, lat, lng)
+        if not result['success']:
+            print(f"Background refresh of {geoname_id} {date_str} failed: {result.get('error')}")
+    except Exception as e:
+        print(f"Background refresh of {geoname_id} {date_str} failed: {e}")
+
+
+def refresh_in_background(geoname_id: int, date_str: str, timezone_str: str, lat: float, lng: float):
+    """Start a background re-scrape of a stale schedule unless one is already running."""
+    if f"{geoname_id}_{date_str}" in _inflight_scrapes:
+        return
+    _stale_stats['background_refreshes'] += 1
+    task = asyncio.ensure_future(_refresh_schedule(geoname_id, date_str, timezone_str, lat, lng))
+    _background_refreshes.add(task)
+    task.add_done_callback(_background_refreshes.discard)
+
+
+def build_stale_response(schedule: DaySchedule, timezone_str: str, stale_seconds: float, error: str = None) -> dict:
+    """Build a response from an expired schedule, flagged as stale."""
+    result = build_hora_response(schedule, timezone_str)
+    result['stale'] = True
+    result['stale_seconds'] = int(stale_seconds)
+    if error:
+        result['revalidation_error'] = error
+    return result
+
+
+async def fetch_hora(geoname_id: int, date_str: str, timezone_str: str, lat: float, lng: float) -> tuple:
+    """Get scraped hora data, preferring cache. Returns (result, cache_status).
+
+    cache_status is HIT, MISS or STALE. Schedules expired for less than
+    STALE_WHILE_REVALIDATE_SECONDS are served stale while a background scrape
+    refreshes them; older ones are re-scraped, falling back to the stale copy
+    (stale-if-error) when the scrape fails.
+    """
+    # L1 hits are served on the event loop; the shared backend is read on a worker thread
+    schedule = await lookup_cached_schedule(geoname_id, date_str, timezone_str)
+    if schedule is not None:
+        return build_hora_response(schedule, timezone_str), "HIT"
+    
+    stale = _hora_cache.get_stale(f"{geoname_id}_{date_str}")
+    if stale is not None:
+        schedule, stale_seconds = stale
+        if stale_seconds <= STALE_WHILE_REVALIDATE_SECONDS:
+            refresh_in_background(geoname_id, date_str, timezone_str, lat, lng)
+            _stale_stats['stale_served'] += 1
+            return build_stale_response(schedule, timezone_str, stale_seconds), "STALE"
+    
+    try:
+        result = await scrape_hora_once(geoname_id, date_str, timezone_str, lat, lng)
+        error = None if result['success'] else result.get('error', 'Failed to fetch hora data')
+        if not error and stale is not None and len(result['full_schedule']) != 24:
+            # A partial page is worse than the complete stale copy
+            error = f"Incomplete schedule: {len(result['full_schedule'])} of 24 horas"
+    except HTTPException as e:
+        if stale is None:
+            raise
+        error = e.detail
+    
+    if error and stale is not None:
+        _stale_stats['stale_if_error'] += 1
+        return build_stale_response(schedule, timezone_str, stale_seconds, error), "STALE"
+    return result, "MISS"
+
+
+def set_cache_headers(response: Response, result: dict, cache_status: Optional[str]):
+    """Describe how a hora response was served in X-Cache / Warning headers."""
+    if cache_status:
+        response.headers["X-Cache"] = cache_status
+    if result.get('stale'):
+        response.headers["X-Stale-Seconds"] = str(result['stale_seconds'])
+        if result.get('revalidation_error'):
+            response.headers["Warning"] = '111 - "Revalidation Failed"'
+        else:
+            response.headers["Warning"] = '110 - "Response is Stale"'
+    if result.get('timezone_assumed'):
+        response.headers["X-Timezone-Assumed"] = ASSUMED_TIMEZONE
 
 
 @app.get("/")
@@ -307,7 +920,13 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "/hora": "Get hora schedule for a location",
+            "/hora/batch": "POST many (location, date) pairs at once",
+            "/hora/range": "Stream a location's horas for a date range",
+            "/export": "Stream stored schedules as a columnar CSV or Parquet file",
+            "/calendar/{location}.ics": "iCalendar feed of Jupiter (or other chosen) horas",
             "/locations": "List available preset locations",
+            "/locations/search": "Find a city's geoname ID by name prefix",
+            "/stats": "Operational counters (browser pool, caches)",
             "/health": "Health check endpoint",
             "/docs": "Interactive API documentation",
         }
@@ -340,6 +959,86 @@ async def get_server_ip():
         return {"error": str(e)}
 
 
+def fetch_strategy_stats() -> dict:
+    """Per-strategy attempt counts and mean latency."""
+    with _strategy_lock:
+        snapshot = {name: dict(stats) for name, stats in _strategy_stats.items()}
+    for stats in snapshot.values():
+        total = stats.pop('total_seconds')
+        stats['avg_seconds'] = round(total / stats['attempts'], 3) if stats['attempts'] else None
+    return {'order': FETCH_STRATEGIES, 'strategies': snapshot}
+
+
+def validation_stats() -> dict:
+    """Sunrise-validation outcomes and browser retries."""
+    with _validation_lock:
+        stats = dict(_validation_stats)
+    stats['max_offset_minutes'] = round(stats['max_offset_minutes'], 1)
+    return {'tolerance_minutes': SUNRISE_TOLERANCE_MINUTES, 'max_attempts': SCRAPE_VALIDATION_ATTEMPTS, **stats}
+
+
+def page_ready_stats() -> dict:
+    """Summarize how long scrapes waited for the hora table to render."""
+    with _page_ready_lock:
+        stats = dict(_page_ready_stats)
+    pages = stats.pop('pages')
+    total = stats.pop('total_seconds')
+    return {
+        'pages': pages,
+        'timeout_seconds': PAGE_READY_TIMEOUT_SECONDS,
+        'avg_seconds': round(total / pages, 3) if pages else None,
+        **{k: round(v, 3) if isinstance(v, float) else v for k, v in stats.items()},
+    }
+
+
+def page_load_stats() -> dict:
+    """Summarize bytes and time spent loading hora pages in Chrome."""
+    with _page_load_lock:
+        stats = dict(_page_load_stats)
+    pages = stats['pages']
+    return {
+        'blocking': BROWSER_BLOCK_RESOURCES,
+        'blocked_patterns': len(BLOCKED_URL_PATTERNS),
+        'pages': pages,
+        'avg_bytes': round(stats['bytes'] / pages) if pages else None,
+        'avg_third_party_bytes': round(stats['third_party_bytes'] / pages) if pages else None,
+        'avg_resources': round(stats['resources'] / pages, 1) if pages else None,
+        'avg_ms': round(stats['total_ms'] / pages) if pages else None,
+        'last': stats['last'],
+    }
+
+
+@app.get("/stats")
+async def get_stats():
+    """Operational counters for the scrape path."""
+    return {
+        "hora_cache": _hora_cache.stats(),
+        "cache_backend": _cache_backend.stats() if _cache_backend else None,
+        "gazetteer": _gazetteer.stats(),
+        "browser_pool": _browser_pool.stats(),
+        "page_ready": page_ready_stats(),
+        "page_load": page_load_stats(),
+        "fetch_strategies": fetch_strategy_stats(),
+        "validation": validation_stats(),
+        "scrape_queue": {
+            "concurrency": SCRAPE_CONCURRENCY,
+            "queue_limit": SCRAPE_QUEUE_LIMIT,
+            "pending": _scrape_pending,
+            **_scrape_stats,
+        },
+        "coalescing": {
+            "inflight": len(_inflight_scrapes),
+            **_coalesce_stats,
+        },
+        "stale": _stale_stats,
+        "calendar": {
+            "feeds": len(_calendar_feeds),
+            **_calendar_stats,
+        },
+        "prewarm": _prewarm_scheduler.stats() if _prewarm_scheduler else None,
+    }
+
+
 @app.get("/locations")
 async def get_locations():
     """Get list of available preset locations with their geoname IDs."""
@@ -349,11 +1048,106 @@ async def get_locations():
     }
 
 
+@app.get("/locations/search")
+async def search_locations(
+    q: str = Query(..., min_length=1, description="Start of a city name, e.g. 'san'"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of results")
+):
+    """Find geoname IDs by city-name prefix in the offline gazetteer, most populous first."""
+    return {
+        "query": q,
+        "results": [place._asdict() for place in _gazetteer.search(q, limit)],
+    }
+
+
+def resolve_location(location: Optional[str], geoname_id: Optional[int], engine: str) -> tuple:
+    """Resolve request parameters to (geoname_id, timezone, lat, lng); raises HTTPException on bad input."""
+    if engine not in HORA_ENGINES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown engine '{engine}'. Use one of: {', '.join(HORA_ENGINES)}."
+        )
+    
+    # Determine geoname_id, timezone, and coordinates
+    if location:
+        location_key = location.lower().replace(" ", "_")
+        if location_key not in LOCATIONS:
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Unknown location '{location}'. Use /locations to see available options."
+            )
+        loc_info = LOCATIONS[location_key]
+        return loc_info["geoname_id"], loc_info["timezone"], loc_info["lat"], loc_info["lng"]
+    if geoname_id:
+        # Custom geoname_id: timezone and coordinates come from the offline gazetteer
+        place = _gazetteer.get(geoname_id)
+        if place is not None:
+            return geoname_id, place.timezone, place.lat, place.lng
+        if engine != "scrape" or GAZETTEER_STRICT:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Unknown geoname_id {geoname_id}: it is not in the gazetteer, so its coordinates are unknown"
+                       f"{'' if GAZETTEER_STRICT else ' (engine=scrape still works)'}. "
+                       "Use /locations/search?q=... to find a city's ID."
+            )
+        # Scrape without coordinates: the page is trusted as is (see validate_schedule), and
+        # lat None marks the timezone as assumed (see mark_timezone_assumed)
+        return geoname_id, ASSUMED_TIMEZONE, None, None
+    # Default to Austin, TX
+    loc_info = LOCATIONS["austin"]
+    return loc_info["geoname_id"], loc_info["timezone"], loc_info["lat"], loc_info["lng"]
+
+
+def resolve_date(date: Optional[str], timezone_str: str) -> str:
+    """The requested date, or today in the location's timezone; raises HTTPException 400 if malformed."""
+    if date:
+        return parse_date_param("date", date).strftime("%d/%m/%Y")
+    return datetime.now(ZoneInfo(timezone_str)).strftime("%d/%m/%Y")
+
+
+async def load_resolved_hora(geo_id: int, date_str: str, timezone_str: str, lat: float, lng: float, engine: str) -> tuple:
+    """Run the requested engine for a resolved location and date; returns (result, cache_status)."""
+    cache_status = None
+    if engine == "local":
+        result = compute_hora_local(geo_id, date_str, timezone_str, lat, lng)
+    else:
+        result, cache_status = await fetch_hora(geo_id, date_str, timezone_str, lat, lng)
+    
+    if not result['success']:
+        raise HTTPException(status_code=500, detail=result.get('error', 'Failed to fetch hora data'))
+    
+    if engine == "compare":
+        local = compute_hora_local(geo_id, date_str, timezone_str, lat, lng)
+        if local['success']:
+            result = {**result, 'engine_diff': compare_hora_results(result, local)}
+        else:
+            result = {**result, 'engine_diff': {'error': local.get('error')}}
+    
+    if lat is None:
+        result = mark_timezone_assumed(result)
+    return result, cache_status
+
+
+def mark_timezone_assumed(result: dict) -> dict:
+    """Flag a response for a location whose timezone is unknown, dropping the clock-dependent fields."""
+    return {**result, 'timezone_assumed': True, 'current_time': None, 'current_hora': None, 'next_hora': None}
+
+
+async def load_hora(location: Optional[str], geoname_id: Optional[int], date: Optional[str], engine: str) -> tuple:
+    """Resolve a /hora request to (result, cache_status); raises HTTPException on bad input or failure."""
+    geo_id, timezone_str, lat, lng = resolve_location(location, geoname_id, engine)
+    # Determine date - USE LOCATION'S TIMEZONE for today's date
+    date_str = resolve_date(date, timezone_str)
+    return await load_resolved_hora(geo_id, date_str, timezone_str, lat, lng, engine)
+
+
 @app.get("/hora")
 async def get_hora(
+    response: Response,
     location: Optional[str] = Query(None, description="Preset location name (e.g., 'austin', 'chennai')"),
     geoname_id: Optional[int] = Query(None, description="Custom geoname ID from drikpanchang.com"),
-    date: Optional[str] = Query(None, description="Date in DD/MM/YYYY format (defaults to today)")
+    date: Optional[str] = Query(None, description="Date in DD/MM/YYYY format (defaults to today)"),
+    engine: Optional[str] = Query(DEFAULT_ENGINE, description="Hora engine: 'scrape', 'local' or 'compare'")
 ):
     """
     Get Hora (planetary hour) schedule for a location.
@@ -365,80 +1159,470 @@ async def get_hora(
     - `/hora?location=chennai` - Chennai, India
     - `/hora?geoname_id=1264527` - Custom location
     - `/hora?location=austin&date=25/12/2025` - Specific date
+    - `/hora?location=austin&engine=local` - Compute locally from sunrise/sunset
+    - `/hora?location=austin&engine=compare` - Scrape and diff against the local engine
+    
+    An expired schedule may be served with `"stale": true` (and `X-Cache: STALE`)
+    while it is refreshed in the background, or when Drik Panchang is unavailable.
     """
-    # Determine geoname_id, timezone, and coordinates
-    if location:
-        location_key = location.lower().replace(" ", "_")
-        if location_key not in LOCATIONS:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Unknown location '{location}'. Use /locations to see available options."
-            )
-        loc_info = LOCATIONS[location_key]
-        geo_id = loc_info["geoname_id"]
-        timezone_str = loc_info["timezone"]
-        lat = loc_info["lat"]
-        lng = loc_info["lng"]
-    elif geoname_id:
-        geo_id = geoname_id
-        # Default to Austin for custom geoname_id
-        timezone_str = "America/Chicago"
-        lat = 30.2672
-        lng = -97.7431
+    result, cache_status = await load_hora(location, geoname_id, date, engine)
+    set_cache_headers(response, result, cache_status)
+    return result
+
+
+async def bounded_as_completed(coros, limit: int):
+    """Yield the results of an iterable of coroutines as they finish, running at most `limit` at once.
+    
+    Coroutines are pulled from the iterable only when a slot frees up, so a lazy
+    generator keeps memory proportional to `limit`. Unfinished ones are cancelled
+    if the consumer stops early (shared scrapes are shielded and keep running).
+    """
+    coros = iter(coros)
+    pending = set()
+    try:
+        while True:
+            while len(pending) < limit:
+                coro = next(coros, None)
+                if coro is None:
+                    break
+                pending.add(asyncio.ensure_future(coro))
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class BatchItem(BaseModel):
+    """One (location or geoname_id, date) pair of a batch request."""
+    location: Optional[str] = None
+    geoname_id: Optional[int] = None
+    date: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+    engine: str = DEFAULT_ENGINE
+
+
+async def batch_outcome(geo_id: int, date_str: str, timezone_str: str, lat: float, lng: float, engine: str) -> dict:
+    """Load one batch key, turning failures into a per-item error instead of failing the batch."""
+    try:
+        result, cache_status = await load_resolved_hora(geo_id, date_str, timezone_str, lat, lng, engine)
+    except HTTPException as e:
+        return {'success': False, 'status': e.status_code, 'error': e.detail}
+    except Exception as e:
+        return {'success': False, 'status': 500, 'error': str(e)}
+    return {'success': True, 'cache': cache_status, 'result': result}
+
+
+async def run_batch(items: list, engine: str):
+    """Yield (indexes, outcome) for each distinct (geoname_id, date) in items.
+    
+    Invalid items and cached keys come out immediately; misses follow as they
+    complete, at most BATCH_CONCURRENCY at a time. Duplicate items share one
+    outcome, listed under all their indexes.
+    """
+    keys = {}  # (geoname_id, date) -> (load arguments, item indexes)
+    for index, item in enumerate(items):
+        try:
+            geo_id, timezone_str, lat, lng = resolve_location(item.location, item.geoname_id, engine)
+            date_str = resolve_date(item.date, timezone_str)
+        except HTTPException as e:
+            yield [index], {'success': False, 'status': e.status_code, 'error': e.detail}
+            continue
+        keys.setdefault((geo_id, date_str), ((geo_id, date_str, timezone_str, lat, lng), []))[1].append(index)
+    
+    misses = []
+    for args, indexes in keys.values():
+        if engine == "local" or await lookup_cached_schedule(*args[:3]) is not None:
+            yield indexes, await batch_outcome(*args, engine)
+        else:
+            misses.append((args, indexes))
+    
+    async def load_miss(args, indexes):
+        return indexes, await batch_outcome(*args, engine)
+    
+    async for completed in bounded_as_completed((load_miss(args, indexes) for args, indexes in misses), BATCH_CONCURRENCY):
+        yield completed
+
+
+@app.post("/hora/batch")
+async def post_hora_batch(
+    batch: BatchRequest,
+    format: str = Query("json", description="'json' for one response, 'ndjson' to stream items as they complete")
+):
+    """
+    Get hora schedules for many (location or geoname_id, date) pairs in one request.
+    
+    Duplicate pairs are fetched once and cached ones are served immediately; the
+    rest are fetched in parallel. Each item gets its own result or error, so one
+    bad item does not fail the batch. With `format=ndjson` one JSON line is
+    streamed per item as soon as it is ready (cached items first); otherwise the
+    items are returned together in request order.
+    """
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
+    if len(batch.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"A batch may contain at most {BATCH_MAX_ITEMS} items")
+    
+    if format == "ndjson":
+        async def lines():
+            async for indexes, outcome in run_batch(batch.items, batch.engine):
+                for index in indexes:
+                    yield json.dumps({'index': index, **outcome}, ensure_ascii=False) + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    
+    results = [None] * len(batch.items)
+    async for indexes, outcome in run_batch(batch.items, batch.engine):
+        for index in indexes:
+            results[index] = {'index': index, **outcome}
+    succeeded = sum(1 for item in results if item['success'])
+    return {
+        "count": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "items": results,
+    }
+
+
+def parse_date_param(name: str, value: str):
+    try:
+        return datetime.strptime(value, "%d/%m/%Y").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be a date in DD/MM/YYYY format")
+
+
+async def run_range(geo_id: int, timezone_str: str, lat: float, lng: float, start, days: int, engine: str):
+    """Yield (date, outcome) for each day of a range: cached days first, then the rest as they complete.
+    
+    Days are generated on the fly and each outcome is handed to the caller as
+    soon as it is ready, so memory does not grow with the length of the range.
+    """
+    served = bytearray(days)  # 1 per day already yielded from cache
+    for offset in range(days):
+        date_str = (start + timedelta(days=offset)).strftime("%d/%m/%Y")
+        if engine == "local" or await lookup_cached_schedule(geo_id, date_str, timezone_str) is not None:
+            served[offset] = 1
+            yield date_str, await batch_outcome(geo_id, date_str, timezone_str, lat, lng, engine)
+    
+    async def load_day(date_str):
+        return date_str, await batch_outcome(geo_id, date_str, timezone_str, lat, lng, engine)
+    
+    misses = (
+        load_day((start + timedelta(days=offset)).strftime("%d/%m/%Y"))
+        for offset in range(days) if not served[offset]
+    )
+    async for completed in bounded_as_completed(misses, BATCH_CONCURRENCY):
+        yield completed
+
+
+@app.get("/hora/range")
+async def get_hora_range(
+    start: str = Query(..., description="First date in DD/MM/YYYY format"),
+    end: str = Query(..., description="Last date in DD/MM/YYYY format (inclusive)"),
+    location: Optional[str] = Query(None, description="Preset location name"),
+    geoname_id: Optional[int] = Query(None, description="Custom geoname ID"),
+    engine: Optional[str] = Query(DEFAULT_ENGINE, description="Hora engine: 'scrape', 'local' or 'compare'"),
+    format: str = Query("ndjson", description="'ndjson' for one line per day, 'json' for a streamed JSON array")
+):
+    """
+    Stream day-by-day hora schedules for one location over a date range.
+    
+    Cached days are sent first, the rest as they are fetched, so days may arrive
+    out of order; each carries its `date`. A day that fails gets its own error
+    entry instead of aborting the stream.
+    """
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
+    first, last = parse_date_param("start", start), parse_date_param("end", end)
+    days = (last - first).days + 1
+    if days < 1:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if days > HORA_RANGE_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"A range may cover at most {HORA_RANGE_MAX_DAYS} days")
+    geo_id, timezone_str, lat, lng = resolve_location(location, geoname_id, engine)
+    
+    async def chunks():
+        separator = "[\n" if format == "json" else ""
+        async for date_str, outcome in run_range(geo_id, timezone_str, lat, lng, first, days, engine):
+            line = json.dumps({'date': date_str, **outcome}, ensure_ascii=False)
+            if format == "json":
+                yield separator + line
+                separator = ",\n"
+            else:
+                yield line + "\n"
+        if format == "json":
+            yield "\n]\n"  # Every day yields an entry, so the array was opened
+    
+    return StreamingResponse(chunks(), media_type="application/x-ndjson" if format == "ndjson" else "application/json")
+
+
+@app.get("/export")
+async def export_schedules(
+    start: str = Query(..., description="First date in DD/MM/YYYY format"),
+    end: str = Query(..., description="Last date in DD/MM/YYYY format (inclusive)"),
+    location: Optional[str] = Query(None, description="Preset location name (default: every stored location)"),
+    geoname_id: Optional[int] = Query(None, description="Custom geoname ID"),
+    format: str = Query("csv", description="'csv' or 'parquet' (needs pyarrow)")
+):
+    """
+    Stream stored schedules as one columnar file with a row per hora.
+    
+    Columns: geoname_id, location, date, slot, planet (code into PLANETS), start_epoch, end_epoch.
+    Only the schedule store is read, never the site, so nothing is scraped; days
+    missing from the store are missing from the file. Rows are read and written
+    one location-month at a time.
+    """
+    if format not in hora_export.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(hora_export.FORMATS)}")
+    if not isinstance(_cache_backend, cache_backends.SQLiteBackend):
+        raise HTTPException(status_code=501, detail="Exports need a SQLite schedule store; set HORA_STORE_PATH")
+    first, last = parse_date_param("start", start), parse_date_param("end", end)
+    days = (last - first).days + 1
+    if days < 1:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if days > EXPORT_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"An export may cover at most {EXPORT_MAX_DAYS} days")
+    geoname_ids = None
+    if location or geoname_id:
+        geoname_ids = [resolve_location(location, geoname_id, "local")[0]]
+    if format == "parquet":
+        try:
+            hora_export.require_pyarrow()
+        except RuntimeError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+    
+    def timezone_for(geo_id: int) -> Optional[str]:
+        place = _gazetteer.get(geo_id)
+        return place.timezone if place else None
+    
+    schedules = _cache_backend.iter_range(start, end, geoname_ids)
+    filename = f"hora_{first:%Y%m%d}_{last:%Y%m%d}.{format}"
+    return StreamingResponse(
+        hora_export.stream(schedules, timezone_for, format),
+        media_type=hora_export.MEDIA_TYPES[format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+    )
+
+
+def calendar_planets(planets: Optional[str], quality: Optional[str]) -> tuple:
+    """Resolve the planets/quality filters to a sorted tuple of planet names (Jupiter if neither is given)."""
+    if not planets and not quality:
+        return ("Jupiter",)
+    selected = set(PLANET_INFO)
+    if planets:
+        names = {name.strip().title() for name in planets.split(",") if name.strip()}
+        unknown = names - selected
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown planet(s): {', '.join(sorted(unknown))}")
+        selected = names
+    if quality:
+        qualities = {q.strip().lower() for q in quality.split(",") if q.strip()}
+        known = {info['quality'] for info in PLANET_INFO.values()}
+        if qualities - known:
+            raise HTTPException(status_code=400, detail=f"quality must be among: {', '.join(sorted(known))}")
+        selected = {planet for planet in selected if PLANET_INFO[planet]['quality'] in qualities}
+    return tuple(sorted(selected))
+
+
+def build_calendar_events(geo_id: int, timezone_str: str, lat: float, lng: float, first_day, days: int, planets: tuple) -> list:
+    """Events for the chosen planets' horas over the horizon.
+    
+    Uses cached schedules where there are complete ones and computes the rest
+    locally; never scrapes.
+    """
+    name = location_name(geo_id)
+    events = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        date_str = day.strftime("%d/%m/%Y")
+        schedule = get_cached_schedule(geo_id, date_str, timezone_str)
+        if schedule is None or len(schedule) != 24:
+            try:
+                schedule = compute_schedule_local(geo_id, date_str, timezone_str, lat, lng)
+            except ValueError:
+                continue  # The sun does not rise or set that day
+        for i, (start, end) in enumerate(hora_export.slot_epochs(schedule, timezone_str)):
+            slot = schedule.slot(i)
+            if slot.planet not in planets:
+                continue
+            info = PLANET_INFO[slot.planet]
+            events.append(hora_calendar.Event(
+                uid=f"{geo_id}-{day:%Y%m%d}-{i}@horadetails",
+                start_epoch=start,
+                end_epoch=end,
+                summary=f"{info['emoji']} {slot.planet} hora",
+                description=(f"{slot.planet} hora ({slot.nature}, {info['quality']}) in {name}, "
+                             f"{'day' if i < 12 else 'night'} hora {i % 12 + 1} of 12"),
+                categories=info['quality'],
+            ))
+    return events
+
+
+@app.get("/calendar/{location}.ics")
+async def get_calendar(
+    request: Request,
+    location: str,
+    planets: Optional[str] = Query(None, description="Comma-separated planets, e.g. 'Jupiter,Venus'"),
+    quality: Optional[str] = Query(None, description="Comma-separated qualities: good, neutral, avoid"),
+    days: int = Query(CALENDAR_DAYS, description="Days from today to cover")
+):
+    """
+    iCalendar feed of a location's horas, Jupiter only by default.
+    
+    `location` is a preset name or a geoname ID. Events come from cached
+    schedules or the local engine, never from a scrape. Feeds carry a strong
+    ETag and Last-Modified (when that exact body was first rendered); a
+    matching If-None-Match (or If-Modified-Since) gets a 304 served from the
+    cached render.
+    """
+    if not 1 <= days <= CALENDAR_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"days must be between 1 and {CALENDAR_MAX_DAYS}")
+    if location.isdigit():
+        geo_id, timezone_str, lat, lng = resolve_location(None, int(location), "local")
     else:
-        # Default to Austin, TX
-        loc_info = LOCATIONS["austin"]
-        geo_id = loc_info["geoname_id"]
-        timezone_str = loc_info["timezone"]
-        lat = loc_info["lat"]
-        lng = loc_info["lng"]
+        geo_id, timezone_str, lat, lng = resolve_location(location, None, "local")
+    selected = calendar_planets(planets, quality)
     
-    # Determine date - USE LOCATION'S TIMEZONE for today's date
-    if date:
-        date_str = date
+    tz = ZoneInfo(timezone_str)
+    now = datetime.now(tz)
+    today = now.date()
+    key = (geo_id, selected, days, today.isoformat())
+    feed = _calendar_feeds.get(key)
+    if feed is None:
+        # Off the event loop: it reads the shared cache and computes missing days
+        events = await asyncio.to_thread(build_calendar_events, geo_id, timezone_str, lat, lng, today, days, selected)
+        body = hora_calendar.render(
+            f"{' & '.join(selected)} hora - {location_name(geo_id)}", events, refresh_seconds=CALENDAR_MAX_AGE_SECONDS
+        )
+        etag = hora_calendar.etag(body)
+        # A new local day starts a new horizon (and a new key)
+        midnight = datetime.combine(today + timedelta(days=1), datetime.min.time(), tz)
+        ttl = max(1.0, (midnight - now).total_seconds())
+        last_modified = _calendar_first_rendered.get(etag) or now.replace(microsecond=0)
+        _calendar_first_rendered.set(etag, last_modified, ttl=ttl)
+        feed = (body, etag, last_modified)
+        _calendar_feeds.set(key, feed, ttl=ttl)
+        _calendar_stats['renders'] += 1
     else:
-        tz = ZoneInfo(timezone_str)
-        local_now = datetime.now(tz)
-        date_str = local_now.strftime("%d/%m/%Y")
+        _calendar_stats['served_cached'] += 1
+    body, etag, last_modified = feed
     
-    # Scrape hora data with location emulation
-    result = scrape_hora(geo_id, date_str, timezone_str, lat, lng)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": email.utils.format_datetime(last_modified.astimezone(timezone.utc), usegmt=True),
+        "Cache-Control": f"public, max-age={CALENDAR_MAX_AGE_SECONDS}",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    not_modified = False
+    if if_none_match is not None:
+        not_modified = hora_calendar.etag_matches(if_none_match, etag)
+    elif if_modified_since:
+        try:
+            not_modified = last_modified <= email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            pass
+    if not_modified:
+        _calendar_stats['not_modified'] += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="text/calendar", headers=headers)
+
+
+async def load_day_index(geo_id: int, date_str: str, timezone_str: str, lat: float, lng: float, engine: str) -> tuple:
+    """Return (DayIndex, result, cache_status) for a day without building the full response.
     
-    if not result['success']:
-        raise HTTPException(status_code=500, detail=result.get('error', 'Failed to fetch hora data'))
+    Cache hits never touch the response dict (result is None); misses and stale
+    schedules go through load_resolved_hora() and are then indexed from the cache.
+    """
+    if engine == "local":
+        key = f"local_{geo_id}_{date_str}"
+        index = _day_indexes.get(key)
+        if index is None:
+            try:
+                index = DayIndex(compute_schedule_local(geo_id, date_str, timezone_str, lat, lng))
+            except ValueError as e:
+                raise HTTPException(status_code=500, detail=str(e))
+            _day_indexes.set(key, index)
+        return index, None, None
     
-    return result
+    result, cache_status = None, "HIT"
+    key = f"{geo_id}_{date_str}"
+    schedule = await lookup_cached_schedule(geo_id, date_str, timezone_str)
+    if schedule is None:
+        result, cache_status = await load_resolved_hora(geo_id, date_str, timezone_str, lat, lng, "scrape")
+        schedule = await lookup_cached_schedule(geo_id, date_str, timezone_str) or (_hora_cache.get_stale(key) or (None,))[0]
+        if schedule is None:
+            raise HTTPException(status_code=500, detail="Failed to fetch hora data")
+    
+    index = _day_indexes.get(key)
+    if index is None or index.schedule is not schedule:
+        index = DayIndex(schedule)
+        _day_indexes.set(key, index)
+    return index, result, cache_status
 
 
 @app.get("/hora/current")
 async def get_current_hora(
-    location: Optional[str] = Query("austin", description="Preset location name"),
-    geoname_id: Optional[int] = Query(None, description="Custom geoname ID")
+    response: Response,
+    location: Optional[str] = Query(None, description="Preset location name (defaults to austin)"),
+    geoname_id: Optional[int] = Query(None, description="Custom geoname ID"),
+    engine: Optional[str] = Query(DEFAULT_ENGINE, description="Hora engine: 'scrape' or 'local'")
 ):
-    """Get only the current running hora (lightweight response)."""
-    result = await get_hora(location=location, geoname_id=geoname_id)
+    """Get only the current running hora (lightweight response).
     
-    # Find next Jupiter hora
-    next_jupiter = find_next_jupiter_hora(result.get("full_schedule", []), result.get("current_hora"))
+    Served from a per-day index: the current slot is a binary search and the
+    next Jupiter hora is precomputed, so the full schedule is never built.
+    """
+    geo_id, timezone_str, lat, lng = resolve_location(location, geoname_id, engine)
+    if lat is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown geoname_id {geo_id}: it is not in the gazetteer, so its current hora is unknown. "
+                   "Use /locations/search?q=... to find a city's ID."
+        )
+    now = datetime.now(ZoneInfo(timezone_str))
+    index, result, cache_status = await load_day_index(geo_id, now.strftime("%d/%m/%Y"), timezone_str, lat, lng, engine)
+    set_cache_headers(response, result or {}, cache_status)
+    
+    schedule = index.schedule
+    current_hora = next_hora = next_jupiter = None
+    i = index.find(now.hour * 60 + now.minute)
+    if i is not None:
+        current_hora = build_hora_entry(schedule.slot(i))
+        if i + 1 < len(schedule):
+            next_hora = build_hora_entry(schedule.slot(i + 1))
+        if index.next_jupiter[i] is not None:
+            next_jupiter = build_hora_entry(schedule.slot(index.next_jupiter[i]))
+    elif schedule.running_hora:
+        # Fall back to the "Running Hora" block captured from the page
+        current_hora = build_hora_entry(schedule.running_hora)
     
     return {
-        "location": result.get("location", "Unknown"),
-        "current_time": result["current_time"],
-        "current_hora": result["current_hora"],
-        "next_hora": result["next_hora"],
+        "location": schedule.location,
+        "current_time": now.strftime("%I:%M %p"),
+        "current_hora": current_hora,
+        "next_hora": next_hora,
         "next_jupiter_hora": next_jupiter,
-        "recommendation": get_recommendation(result["current_hora"], next_jupiter),
+        "recommendation": get_recommendation(current_hora, next_jupiter),
     }
 
 
 @app.get("/hora/jupiter")
 async def get_jupiter_horas(
-    location: Optional[str] = Query("austin", description="Preset location name"),
+    response: Response,
+    location: Optional[str] = Query(None, description="Preset location name (defaults to austin)"),
     geoname_id: Optional[int] = Query(None, description="Custom geoname ID"),
-    date: Optional[str] = Query(None, description="Date in DD/MM/YYYY format")
+    date: Optional[str] = Query(None, description="Date in DD/MM/YYYY format"),
+    engine: Optional[str] = Query(DEFAULT_ENGINE, description="Hora engine: 'scrape' or 'local'")
 ):
     """Get only Jupiter (most auspicious) hora times for the day."""
-    result = await get_hora(location=location, geoname_id=geoname_id, date=date)
+    result, cache_status = await load_hora(location, geoname_id, date, engine)
+    set_cache_headers(response, result, cache_status)
     
     return {
         "date": result["date"],
@@ -452,29 +1636,6 @@ async def get_jupiter_horas(
     }
 
 
-def find_next_jupiter_hora(full_schedule: list, current_hora: dict) -> dict:
-    """Find the next upcoming Jupiter hora after the current hora."""
-    if not full_schedule or not current_hora:
-        return None
-    
-    current_start = current_hora.get('start_minutes', 0)
-    
-    # Find Jupiter horas that start after current hora
-    for hora in full_schedule:
-        if hora['planet'] == 'Jupiter':
-            hora_start = hora.get('start_minutes', 0)
-            # Handle overnight (if Jupiter hora is early morning and current is evening)
-            if hora_start > current_start or (current_start > 1200 and hora_start < 400):
-                return hora
-    
-    # If no future Jupiter hora found, return the first one (next day)
-    for hora in full_schedule:
-        if hora['planet'] == 'Jupiter':
-            return hora
-    
-    return None
-
-
 def get_recommendation(hora: dict, next_jupiter: dict = None) -> str:
     """Get recommendation text based on current hora."""
     if not hora:
@@ -719,10 +1880,11 @@ def generate_hora_html(data: dict) -> str:
 async def view_hora(
     location: Optional[str] = Query("austin", description="Preset location name"),
     geoname_id: Optional[int] = Query(None, description="Custom geoname ID"),
-    date: Optional[str] = Query(None, description="Date in DD/MM/YYYY format")
+    date: Optional[str] = Query(None, description="Date in DD/MM/YYYY format"),
+    engine: Optional[str] = Query(DEFAULT_ENGINE, description="Hora engine: 'scrape' or 'local'")
 ):
     """View Hora schedule as a beautiful HTML page."""
-    result = await get_hora(location=location, geoname_id=geoname_id, date=date)
+    result, _ = await load_hora(location, geoname_id, date, engine)
     return HTMLResponse(content=generate_hora_html(result))
 
 
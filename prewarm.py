@@ -0,0 +1,85 @@
+"""Background pre-warming of preset locations around each local midnight.
+
+The first request after a city's local midnight would otherwise pay the full
+scrape cost. The scheduler warms today's and tomorrow's schedule for every
+location at startup, then again shortly before each location's local day
+rolls over (with random jitter so cities sharing a timezone do not all fire
+at once), never running more than `concurrency` fetches at a time.
+"""
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+import asyncio
+import random
+
+
+class PrewarmScheduler:
+    """Periodically calls `fetch(location_key, date_str)` for each location.
+
+    `fetch` is an async callable returning True if it fetched the schedule
+    and False if it was already cached; exceptions are counted, not raised.
+    """
+
+    def __init__(self, locations: dict, fetch, lead_seconds: float = 600, jitter_seconds: float = 300, concurrency: int = 1):
+        self.locations = locations
+        self.fetch = fetch
+        self.lead_seconds = lead_seconds
+        self.jitter_seconds = jitter_seconds
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._next_runs = {}
+        self._stats = {'runs': 0, 'fetched': 0, 'already_cached': 0, 'failed': 0}
+
+    def next_run(self, timezone_str: str, after: datetime) -> datetime:
+        """First pre-warm time after `after`: shortly before a local midnight in timezone_str."""
+        tz = ZoneInfo(timezone_str)
+        local = after.astimezone(tz)
+        day = local.date()
+        while True:
+            midnight = datetime.combine(day + timedelta(days=1), time.min, tzinfo=tz)
+            run_at = midnight - timedelta(seconds=self.lead_seconds + random.uniform(0, self.jitter_seconds))
+            if run_at > local:
+                return run_at
+            day += timedelta(days=1)
+
+    async def _fetch_one(self, location_key: str, date_str: str):
+        async with self._semaphore:
+            try:
+                fetched = await self.fetch(location_key, date_str)
+                self._stats['fetched' if fetched else 'already_cached'] += 1
+            except Exception as e:
+                self._stats['failed'] += 1
+                print(f"Pre-warm failed for {location_key} {date_str}: {e}")
+
+    async def warm(self, location_key: str):
+        """Fetch today's and tomorrow's schedule for one location."""
+        self._stats['runs'] += 1
+        today = datetime.now(ZoneInfo(self.locations[location_key]['timezone'])).date()
+        await asyncio.gather(*(
+            self._fetch_one(location_key, (today + timedelta(days=offset)).strftime("%d/%m/%Y"))
+            for offset in (0, 1)
+        ))
+
+    async def run(self):
+        """Warm everything once, then keep warming each location before its local midnight."""
+        await asyncio.gather(*(self.warm(key) for key in self.locations))
+
+        now = datetime.now(timezone.utc)
+        self._next_runs = {key: self.next_run(info['timezone'], now) for key, info in self.locations.items()}
+        pending = set()
+        while True:
+            key, run_at = min(self._next_runs.items(), key=lambda item: item[1])
+            delay = (run_at - datetime.now(timezone.utc)).total_seconds()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            task = asyncio.create_task(self.warm(key))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            # Schedule the next run before the following midnight
+            past_midnight = run_at + timedelta(seconds=self.lead_seconds + self.jitter_seconds + 1)
+            self._next_runs[key] = self.next_run(self.locations[key]['timezone'], past_midnight)
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            'next_runs': {key: run_at.isoformat() for key, run_at in sorted(self._next_runs.items(), key=lambda item: item[1])},
+        }
@@ -0,0 +1,228 @@
+"""Immutable per-day hora schedule model.
+
+A DaySchedule holds only what never changes for a (geoname_id, date): the
+24 hora slots and page metadata. Clock-dependent fields such as the current
+hora are computed per request from it and never written back.
+
+Thousands of schedules sit in the caches, so they are stored compactly: one
+byte per slot for the planet and two arrays of unsigned 16-bit minutes. Slot
+objects and response dicts are only materialized when a request needs them.
+
+    python schedule.py --bench      # bytes per cached schedule, before and after
+"""
+from array import array
+from bisect import bisect_right
+from typing import NamedTuple, Optional
+import sys
+
+# Planet codes are indexes into PLANETS; each planet's nature is fixed
+PLANETS = ("Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn")
+NATURES = ("Vigorous", "Gentle", "Aggressive", "Quick", "Fruitful", "Beneficial", "Sluggish")
+PLANET_CODES = {planet: code for code, planet in enumerate(PLANETS)}
+JUPITER = PLANET_CODES["Jupiter"]
+
+
+class HoraSlot(NamedTuple):
+    """One planetary hour, as minutes since local midnight."""
+    planet: str
+    nature: str
+    start_minutes: int
+    end_minutes: int
+
+
+class DaySchedule:
+    """The hora schedule of one location for one date (sunrise → next sunrise).
+
+    Built from any iterable of HoraSlots; `slots` re-creates them on demand.
+    Treat instances as read-only.
+    """
+
+    __slots__ = ('geoname_id', 'date', 'title', 'location', 'planets', 'starts', 'ends', 'running_hora')
+
+    def __init__(self, geoname_id: int, date: str, title: str, location: str, slots=(), running_hora: Optional[HoraSlot] = None):
+        slots = tuple(slots)
+        self.geoname_id = geoname_id
+        self.date = sys.intern(date)
+        self.title = title
+        self.location = sys.intern(location)
+        self.planets = bytes(PLANET_CODES[slot.planet] for slot in slots)
+        self.starts = array('H', (slot.start_minutes for slot in slots))
+        self.ends = array('H', (slot.end_minutes for slot in slots))
+        self.running_hora = running_hora
+
+    def __len__(self) -> int:
+        """Number of hora slots (24 for a complete day)."""
+        return len(self.planets)
+
+    def slot(self, i: int) -> HoraSlot:
+        code = self.planets[i]
+        return HoraSlot(PLANETS[code], NATURES[code], self.starts[i], self.ends[i])
+
+    @property
+    def slots(self) -> tuple:
+        return tuple(self.slot(i) for i in range(len(self.planets)))
+
+    @property
+    def day_slots(self) -> tuple:
+        return tuple(self.slot(i) for i in range(min(12, len(self))))
+
+    @property
+    def night_slots(self) -> tuple:
+        return tuple(self.slot(i) for i in range(12, min(24, len(self))))
+
+    @property
+    def jupiter_indexes(self) -> list:
+        return [i for i, code in enumerate(self.planets) if code == JUPITER]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, DaySchedule):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"DaySchedule(geoname_id={self.geoname_id}, date={self.date!r}, location={self.location!r}, slots={len(self)})"
+
+    def __sizeof__(self) -> int:
+        # Include the owned containers so cache byte limits see the real footprint
+        # (the interned date/location strings are shared and not counted)
+        size = object.__sizeof__(self) + sys.getsizeof(self.title)
+        size += sys.getsizeof(self.planets) + sys.getsizeof(self.starts) + sys.getsizeof(self.ends)
+        if self.running_hora is not None:
+            size += sys.getsizeof(self.running_hora)
+        return size
+
+
+def schedule_to_dict(schedule: DaySchedule) -> dict:
+    """Convert a schedule to plain JSON-serializable data."""
+    return {
+        'geoname_id': schedule.geoname_id,
+        'date': schedule.date,
+        'title': schedule.title,
+        'location': schedule.location,
+        'slots': [list(slot) for slot in schedule.slots],
+        'running_hora': list(schedule.running_hora) if schedule.running_hora else None,
+    }
+
+
+def schedule_from_dict(data: dict) -> DaySchedule:
+    """Rebuild a schedule from schedule_to_dict() output."""
+    running_hora = data.get('running_hora')
+    return DaySchedule(
+        geoname_id=data['geoname_id'],
+        date=data['date'],
+        title=data['title'],
+        location=data['location'],
+        slots=tuple(HoraSlot(*slot) for slot in data['slots']),
+        running_hora=HoraSlot(*running_hora) if running_hora else None,
+    )
+
+
+class DayIndex:
+    """Lookup tables over one schedule for "which hora is it now" queries.
+
+    Slot boundaries are stored as minutes since the schedule's first sunrise,
+    which makes them strictly increasing even across midnight, so the current
+    slot is a binary search. The next Jupiter slot after each slot is
+    precomputed.
+    """
+
+    __slots__ = ('schedule', 'base', 'starts', 'ends', 'next_jupiter')
+
+    def __init__(self, schedule: DaySchedule):
+        self.schedule = schedule
+        starts, ends = schedule.starts, schedule.ends
+        self.base = starts[0] if starts else 0
+        self.starts = [(start - self.base) % 1440 for start in starts]
+        self.ends = [offset + (end - start) % 1440 for offset, start, end in zip(self.starts, starts, ends)]
+
+        # Walk backwards so each slot knows the nearest Jupiter slot after it (wrapping to the first)
+        jupiters = schedule.jupiter_indexes
+        following = jupiters[0] if jupiters else None
+        self.next_jupiter = [None] * len(starts)
+        for i in range(len(starts) - 1, -1, -1):
+            self.next_jupiter[i] = following
+            if schedule.planets[i] == JUPITER:
+                following = i
+
+    def find(self, minutes: int) -> Optional[int]:
+        """Index of the slot containing a local time (minutes since midnight), or None."""
+        offset = (minutes - self.base) % 1440
+        i = bisect_right(self.starts, offset) - 1
+        if i >= 0 and offset < self.ends[i]:
+            return i
+        return None
+
+
+def _bench(count: int):
+    """Compare tracemalloc'd bytes per cached schedule across representations."""
+    import tracemalloc
+
+    class LegacySchedule(NamedTuple):
+        geoname_id: int
+        date: str
+        title: str
+        location: str
+        slots: tuple
+        running_hora: Optional[HoraSlot] = None
+
+    def fresh(text):
+        return "".join(list(text))  # New string object, like a regex group from a parsed page
+
+    def sample_slots(n):
+        start = 445 + n % 30
+        slots = []
+        for i in range(24):
+            length = 51 if i < 12 else 69
+            code = (4 + i * 5) % 7
+            slots.append(HoraSlot(fresh(PLANETS[code]), fresh(NATURES[code]), start % 1440, (start + length) % 1440))
+            start += length
+        return slots
+
+    def response_dict(n):
+        # The per-entry response dict cached before schedules were split out of responses
+        entries = [{
+            'planet': slot.planet, 'nature': slot.nature, 'emoji': fresh('♃'), 'quality': fresh('good'),
+            'start': fresh(f"{slot.start_minutes // 60:02d}:{slot.start_minutes % 60:02d} AM"),
+            'end': fresh(f"{slot.end_minutes // 60:02d}:{slot.end_minutes % 60:02d} AM"),
+            'start_minutes': slot.start_minutes, 'end_minutes': slot.end_minutes,
+        } for slot in sample_slots(n)]
+        return {
+            'success': True, 'title': fresh("Hora Timings for Austin, Texas, United States"),
+            'location': fresh("Austin, Texas, United States"), 'date': fresh("25/12/2025"), 'geoname_id': 4671654,
+            'current_time': fresh("04:03 PM"), 'current_hora': entries[5], 'next_hora': entries[6],
+            'jupiter_horas': [h for h in entries if h['planet'] == 'Jupiter'],
+            'day_horas': entries[:12], 'night_horas': entries[12:], 'full_schedule': entries,
+        }
+
+    def legacy(n):
+        return LegacySchedule(4671654, fresh("25/12/2025"), fresh("Hora Timings for Austin, Texas, United States"),
+                              fresh("Austin, Texas, United States"), tuple(sample_slots(n)))
+
+    def compact(n):
+        return DaySchedule(4671654, fresh("25/12/2025"), fresh("Hora Timings for Austin, Texas, United States"),
+                           fresh("Austin, Texas, United States"), sample_slots(n))
+
+    print(f"{'representation':<34} {'bytes/schedule':>15}")
+    for name, build in (("response dict (24 entry dicts)", response_dict),
+                        ("NamedTuple of HoraSlots", legacy),
+                        ("compact DaySchedule", compact)):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [build(n) for n in range(count)]
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        print(f"{name:<34} {used / count:>15,.0f}")
+        del kept
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Schedule model utilities.")
+    parser.add_argument("--bench", action="store_true", help="measure memory per cached schedule")
+    parser.add_argument("--count", type=int, default=2000, help="schedules to build per representation")
+    args = parser.parse_args()
+    if args.bench:
+        _bench(args.count)
+    else:
+        parser.print_help()
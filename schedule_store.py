@@ -0,0 +1,187 @@
+"""SQLite-backed persistent store of day schedules.
+
+Survives process restarts (e.g. Cloud Run cold starts when the path is on a
+mounted volume) so new instances do not have to re-scrape known schedules.
+Rows carry an absolute expiry; `compact()` deletes expired rows and returns
+the freed pages to the filesystem.
+
+Run `python schedule_store.py PATH` to compact a store from cron.
+"""
+from datetime import datetime
+from typing import Optional
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from schedule import DaySchedule, schedule_from_dict, schedule_to_dict
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedules (
+    geoname_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (geoname_id, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS schedules_expires_at ON schedules (expires_at);
+"""
+
+
+def iso_day(date_str: str) -> str:
+    """Convert a DD/MM/YYYY date to the sortable YYYY-MM-DD form used as key."""
+    return datetime.strptime(date_str, "%d/%m/%Y").strftime("%Y-%m-%d")
+
+
+class ScheduleStore:
+    """Persistent (geoname_id, date) → DaySchedule map with per-row expiry."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0, 'compacted': 0}
+        conn = self._conn()
+        # Must be set before the first table is created to take effect
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads; keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def get(self, geoname_id: int, date_str: str) -> Optional[DaySchedule]:
+        """Return the stored schedule, or None if missing or expired."""
+        try:
+            day = iso_day(date_str)
+        except ValueError:
+            return None
+        row = self._conn().execute(
+            "SELECT payload FROM schedules WHERE geoname_id = ? AND day = ? "
+            "AND (expires_at IS NULL OR expires_at > ?)",
+            (geoname_id, day, time.time()),
+        ).fetchone()
+        with self._lock:
+            self._stats['hits' if row else 'misses'] += 1
+        return schedule_from_dict(json.loads(row[0])) if row else None
+
+    def put(self, schedule: DaySchedule, ttl: Optional[float] = None):
+        """Store a schedule for ttl seconds (None keeps it until deleted)."""
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO schedules (geoname_id, day, payload, created_at, expires_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                schedule.geoname_id,
+                iso_day(schedule.date),
+                json.dumps(schedule_to_dict(schedule), ensure_ascii=False, separators=(',', ':')),
+                now,
+                now + ttl if ttl is not None else None,
+            ),
+        )
+        with self._lock:
+            self._stats['writes'] += 1
+
+    def put_many(self, schedules, ttl: Optional[float] = None) -> int:
+        """Store several schedules in one transaction; returns how many were written."""
+        now = time.time()
+        rows = [
+            (
+                schedule.geoname_id,
+                iso_day(schedule.date),
+                json.dumps(schedule_to_dict(schedule), ensure_ascii=False, separators=(',', ':')),
+                now,
+                now + ttl if ttl is not None else None,
+            )
+            for schedule in schedules
+        ]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO schedules (geoname_id, day, payload, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self._stats['writes'] += len(rows)
+        return len(rows)
+
+    def days(self, geoname_id: int, first_date: str, last_date: str) -> set:
+        """YYYY-MM-DD days from first_date to last_date (DD/MM/YYYY, inclusive) with a live row."""
+        rows = self._conn().execute(
+            "SELECT day FROM schedules WHERE geoname_id = ? AND day BETWEEN ? AND ? "
+            "AND (expires_at IS NULL OR expires_at > ?)",
+            (geoname_id, iso_day(first_date), iso_day(last_date), time.time()),
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def iter_range(self, first_date: str, last_date: str, geoname_ids=None):
+        """Yield live schedules from first_date to last_date (DD/MM/YYYY, inclusive), by geoname_id then day.
+
+        Rows are read from a cursor on a private connection as they are
+        consumed, so a range of any length runs in constant memory.
+        """
+        query = ("SELECT payload FROM schedules WHERE day BETWEEN ? AND ? "
+                 "AND (expires_at IS NULL OR expires_at > ?)")
+        params = [iso_day(first_date), iso_day(last_date), time.time()]
+        if geoname_ids is not None:
+            geoname_ids = list(geoname_ids)
+            query += f" AND geoname_id IN ({','.join('?' * len(geoname_ids))})"
+            params += geoname_ids
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        try:
+            for (payload,) in conn.execute(query + " ORDER BY geoname_id, day", params):
+                yield schedule_from_dict(json.loads(payload))
+        finally:
+            conn.close()
+
+    def compact(self) -> int:
+        """Delete expired rows and release free pages; returns the number of rows removed."""
+        conn = self._conn()
+        removed = conn.execute(
+            "DELETE FROM schedules WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+        ).rowcount
+        conn.execute("PRAGMA incremental_vacuum")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        with self._lock:
+            self._stats['compacted'] += removed
+        return removed
+
+    def stats(self) -> dict:
+        rows = self._conn().execute("SELECT COUNT(*) FROM schedules").fetchone()[0]
+        with self._lock:
+            return {'path': self.path, 'rows': rows, **self._stats}
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python schedule_store.py PATH")
+    store = ScheduleStore(sys.argv[1])
+    print(f"Removed {store.compact()} expired schedules from {store.path}")
+    store.close()
@@ -0,0 +1,179 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import time
+
+import pytest
+
+import hora_parser
+from browser_pool import BrowserPool, EmulationError
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+
+# timezone -> (latitude, longitude, page the fake site renders for that location)
+LOCATIONS = {
+    "America/Chicago": (30.2672, -97.7431, "hora_austin_running.html"),
+    "Asia/Kolkata": (13.0827, 80.2707, "hora_chennai.html"),
+}
+
+
+def _fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+PAGES = {tz: _fixture(page) for tz, (_, _, page) in LOCATIONS.items()}
+
+
+class FakeDriver:
+    """Stands in for a Chrome session; the page it renders depends on the emulated timezone."""
+
+    def __init__(self, honour_timezone: bool = True):
+        self.honour_timezone = honour_timezone
+        self.timezone = "UTC"
+        self.geolocation = None
+        self.page_source = ""
+        self.quit_called = False
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == 'Emulation.setTimezoneOverride' and self.honour_timezone:
+            self.timezone = params['timezoneId']
+        elif cmd == 'Emulation.setGeolocationOverride':
+            self.geolocation = (params['latitude'], params['longitude'])
+        elif cmd == 'Emulation.clearGeolocationOverride':
+            self.geolocation = None
+        return {}
+
+    def execute_script(self, script, *args):
+        if "resolvedOptions().timeZone" in script:
+            return self.timezone
+        return 1
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        time.sleep(0.002)  # Let other leases run between emulation and render
+        self.page_source = PAGES.get(self.timezone, "")
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_parallel_leases_keep_their_own_timezone_and_location():
+    pool = BrowserPool(FakeDriver, size=4)
+    active, peak = [0], [0]
+    counter_lock = threading.Lock()
+    tz_before = os.environ.get('TZ')
+
+    def scrape(timezone):
+        lat, lng, _ = LOCATIONS[timezone]
+        with pool.lease(timezone, lat, lng) as driver:
+            with counter_lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            driver.get("https://www.drikpanchang.com/muhurat/hora.html")
+            time.sleep(0.002)
+            seen = (driver.timezone, driver.geolocation, hora_parser.parse_page(driver.page_source))
+            with counter_lock:
+                active[0] -= 1
+        return timezone, seen
+
+    timezones = list(LOCATIONS) * 20
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(scrape, timezones))
+
+    assert peak[0] > 1, "leases never overlapped"
+    for timezone, (seen_tz, geolocation, page) in results:
+        lat, lng, _ = LOCATIONS[timezone]
+        assert seen_tz == timezone
+        assert geolocation == (lat, lng)
+        assert len(page.slots) == 24
+        assert page == hora_parser.parse_page(PAGES[timezone])
+    assert os.environ.get('TZ') == tz_before
+    stats = pool.stats()
+    assert stats['launched'] <= 4
+    assert stats['crashed'] == 0
+    pool.close()
+
+
+def test_lease_fails_and_discards_session_when_timezone_is_not_applied():
+    drivers = []
+
+    def factory():
+        drivers.append(FakeDriver(honour_timezone=False))
+        return drivers[-1]
+
+    pool = BrowserPool(factory, size=1)
+    with pytest.raises(EmulationError):
+        with pool.lease("Asia/Kolkata", 13.0827, 80.2707):
+            pytest.fail("scrape ran with the wrong timezone")
+    assert drivers[0].quit_called
+    assert pool.stats()['idle'] == 0
+
+
+def test_lease_without_coordinates_clears_previous_geolocation():
+    pool = BrowserPool(FakeDriver, size=1)
+    with pool.lease("Asia/Kolkata", 13.0827, 80.2707) as driver:
+        assert driver.geolocation == (13.0827, 80.2707)
+    with pool.lease("America/Chicago", None, None) as driver:
+        assert driver.timezone == "America/Chicago"
+        assert driver.geolocation is None
+    pool.close()
+
+
+class FakeWebDriverError(Exception):
+    pass
+
+
+def test_only_browser_errors_discard_the_session():
+    drivers = []
+
+    def factory():
+        drivers.append(FakeDriver())
+        return drivers[-1]
+
+    pool = BrowserPool(factory, size=1, session_errors=(FakeWebDriverError,))
+    # A page failing validation is the scrape's problem, not the browser's
+    with pytest.raises(ValueError):
+        with pool.lease("Asia/Kolkata", 13.0827, 80.2707):
+            raise ValueError("Page did not match the location's sunrise")
+    assert not drivers[0].quit_called
+    assert pool.stats()['crashed'] == 0
+    assert pool.stats()['idle'] == 1
+
+    with pytest.raises(FakeWebDriverError):
+        with pool.lease("Asia/Kolkata", 13.0827, 80.2707):
+            raise FakeWebDriverError("chrome not reachable")
+    assert drivers[0].quit_called
+    assert pool.stats()['crashed'] == 1
+    assert len(drivers) == 1
+    pool.close()
+
+
+def test_sessions_are_recycled_by_page_loads_not_leases():
+    drivers = []
+
+    def factory():
+        drivers.append(FakeDriver())
+        return drivers[-1]
+
+    pool = BrowserPool(factory, size=1, max_pages=3)
+    with pool.lease("Asia/Kolkata", 13.0827, 80.2707) as driver:
+        driver.get("https://www.drikpanchang.com/muhurat/hora.html")
+    assert pool.stats()['idle'] == 1
+
+    # A lease that retries loads several pages, each counting towards max_pages
+    with pool.lease("Asia/Kolkata", 13.0827, 80.2707) as driver:
+        driver.get("https://www.drikpanchang.com/muhurat/hora.html")
+        driver.get("https://www.drikpanchang.com/muhurat/hora.html")
+    assert drivers[0].quit_called
+    stats = pool.stats()
+    assert stats['recycled'] == 1 and stats['idle'] == 0
+
+    # Leases that load nothing do not count
+    for _ in range(5):
+        with pool.lease("Asia/Kolkata", 13.0827, 80.2707):
+            pass
+    assert pool.stats()['launched'] == 2 and pool.stats()['recycled'] == 1
+    pool.close()
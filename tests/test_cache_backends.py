@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import cache_backends
+import main
+from schedule import DaySchedule, HoraSlot
+
+SCHEDULE = DaySchedule(
+    4671654, "15/01/2026", "Hora Timings for Austin", "Austin",
+    [HoraSlot("Jupiter", "Fruitful", 445, 496), HoraSlot("Mars", "Aggressive", 496, 547)],
+)
+
+
+def _redis_backend():
+    fakeredis = pytest.importorskip("fakeredis")
+    backend = cache_backends.RedisBackend("redis://localhost:6379/0")
+    backend._client = fakeredis.FakeRedis()
+    return backend
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        backend = cache_backends.from_url("memory://")
+    elif request.param == "sqlite":
+        backend = cache_backends.from_url(f"sqlite://{tmp_path / 'hora.db'}")
+    else:
+        backend = _redis_backend()
+    yield backend
+    backend.close()
+
+
+def test_get_put_round_trip(backend):
+    assert backend.get(SCHEDULE.geoname_id, SCHEDULE.date) is None
+    backend.put(SCHEDULE, ttl=60)
+    assert backend.get(SCHEDULE.geoname_id, SCHEDULE.date) == SCHEDULE
+    assert backend.get(SCHEDULE.geoname_id, "16/01/2026") is None
+
+
+def test_entries_expire_after_ttl(backend):
+    # Redis expiries have one-second resolution
+    ttl = 1.0 if backend.name == "redis" else 0.2
+    backend.put(SCHEDULE, ttl=ttl)
+    assert backend.get(SCHEDULE.geoname_id, SCHEDULE.date) is not None
+    time.sleep(ttl + 0.2)
+    assert backend.get(SCHEDULE.geoname_id, SCHEDULE.date) is None
+
+
+def test_lock_is_exclusive(backend):
+    held = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with backend.lock("scrape:key", ttl=30, wait=0) as acquired:
+            assert acquired
+            held.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    try:
+        assert held.wait(5)
+        with backend.lock("scrape:key", ttl=30, wait=0.3, poll=0.05) as acquired:
+            assert not acquired
+        with backend.lock("scrape:other", ttl=30, wait=0) as acquired:
+            assert acquired
+    finally:
+        release.set()
+        thread.join()
+
+    with backend.lock("scrape:key", ttl=30, wait=0) as acquired:
+        assert acquired
+    stats = backend.stats()
+    assert stats['lock_timeouts'] == 1
+    assert stats['lock_acquired'] == 3
+
+
+def test_lock_of_crashed_holder_expires(backend):
+    # A holder that never releases, e.g. a replica that died mid-scrape
+    assert backend._acquire("scrape:key", "dead-holder", 0.3)
+    started = time.monotonic()
+    with backend.lock("scrape:key", ttl=30, wait=5, poll=0.05) as acquired:
+        assert acquired
+    assert 0.2 <= time.monotonic() - started < 5
+    assert backend.stats()['lock_contended'] == 1
+
+
+def test_unreachable_backend_yields_no_lock(backend, monkeypatch):
+    def refuse(*args):
+        raise ConnectionError("Error 111 connecting to 127.0.0.1:1")
+    monkeypatch.setattr(backend, "_acquire", refuse)
+
+    with backend.lock("scrape:key", ttl=30, wait=1) as acquired:
+        assert acquired is False
+    stats = backend.stats()
+    assert stats['lock_errors'] == 1
+    assert stats['lock_timeouts'] == 0
+
+
+def test_service_reads_shared_backend_off_the_event_loop(monkeypatch):
+    threads = []
+
+    class RecordingBackend(cache_backends.MemoryBackend):
+        def get(self, geoname_id, date_str):
+            threads.append(threading.current_thread())
+            return super().get(geoname_id, date_str)
+
+    backend = RecordingBackend()
+    backend.put(SCHEDULE, ttl=60)
+    monkeypatch.setattr(main, "_cache_backend", backend)
+    main._hora_cache.clear()
+
+    async def lookup():
+        return await main.lookup_cached_schedule(SCHEDULE.geoname_id, SCHEDULE.date, "America/Chicago"), threading.current_thread()
+
+    try:
+        schedule, loop_thread = asyncio.run(lookup())
+        assert schedule == SCHEDULE
+        assert threads and threads[0] is not loop_thread
+        # Copied into L1, so the next lookup does not touch the backend
+        asyncio.run(lookup())
+        assert len(threads) == 1
+    finally:
+        main._hora_cache.clear()
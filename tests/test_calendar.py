@@ -0,0 +1,73 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+URL = "/calendar/austin.ics"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "_cache_backend", None)
+    main._hora_cache.clear()
+    main._calendar_feeds.clear()
+    main._calendar_first_rendered.clear()
+    yield TestClient(main.app)
+    main._calendar_feeds.clear()
+    main._calendar_first_rendered.clear()
+
+
+def test_feed_has_validators(client):
+    response = client.get(URL)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/calendar")
+    assert response.headers["ETag"].startswith('"') and response.headers["Last-Modified"].endswith(" GMT")
+    assert "BEGIN:VEVENT" in response.text
+
+
+def test_matching_etag_gets_304(client):
+    first = client.get(URL)
+    renders = main._calendar_stats['renders']
+
+    response = client.get(URL, headers={"If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == first.headers["ETag"]
+    assert main._calendar_stats['renders'] == renders  # Served from the cached render
+
+    assert client.get(URL, headers={"If-None-Match": '"something-else"'}).status_code == 200
+
+
+def test_if_modified_since(client):
+    first = client.get(URL)
+    assert client.get(URL, headers={"If-Modified-Since": first.headers["Last-Modified"]}).status_code == 304
+    assert client.get(URL, headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}).status_code == 200
+    assert client.get(URL, headers={"If-Modified-Since": "not a date"}).status_code == 200
+
+
+def test_if_none_match_takes_precedence(client):
+    first = client.get(URL)
+    response = client.get(URL, headers={
+        "If-None-Match": '"something-else"', "If-Modified-Since": first.headers["Last-Modified"],
+    })
+    assert response.status_code == 200
+
+
+def test_rerendered_feed_keeps_last_modified(client):
+    first = client.get(URL)
+    main._calendar_feeds.clear()  # As if the feed had been evicted
+    time.sleep(1.1)  # Last-Modified has one-second resolution
+
+    again = client.get(URL, headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == first.headers["ETag"]
+    assert again.headers["Last-Modified"] == first.headers["Last-Modified"]
+
+
+def test_different_feeds_get_different_etags(client):
+    jupiter = client.get(URL)
+    venus = client.get(URL, params={"planets": "Venus"})
+    assert venus.status_code == 200
+    assert venus.headers["ETag"] != jupiter.headers["ETag"]
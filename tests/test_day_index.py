@@ -0,0 +1,66 @@
+import os
+from datetime import datetime
+
+import pytest
+
+import hora_parser
+import main
+from schedule import JUPITER, DayIndex, DaySchedule
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+LOCATIONS = ["austin", "chennai", "london", "sydney"]
+DATES = ["15/01/2026", "08/03/2026", "21/06/2026", "25/10/2026", "21/12/2026"]
+
+
+def _local(location: str, date_str: str) -> DaySchedule:
+    info = main.LOCATIONS[location]
+    return main.compute_schedule_local(info["geoname_id"], date_str, info["timezone"], info["lat"], info["lng"])
+
+
+def _scraped(name: str) -> DaySchedule:
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        page = hora_parser.parse_page(f.read())
+    return DaySchedule(4671654, "15/01/2026", page.title, "Austin", page.slots, page.running_hora)
+
+
+SCHEDULES = [
+    *(pytest.param(_local(location, date_str), id=f"{location}-{date_str}") for location in LOCATIONS for date_str in DATES),
+    *(pytest.param(_scraped(name), id=name) for name in ("hora_austin_running.html", "hora_chennai.html")),
+]
+
+
+@pytest.mark.parametrize("schedule", SCHEDULES)
+def test_find_matches_linear_scan_every_minute(schedule):
+    index = DayIndex(schedule)
+    slots = schedule.slots
+    # Some slot crosses (or starts at) midnight, so the wrap is covered
+    assert any(slot.end_minutes < slot.start_minutes or slot.start_minutes == 0 for slot in slots)
+    for minute in range(24 * 60):
+        now = datetime(2026, 1, 15, minute // 60, minute % 60)
+        assert index.find(minute) == main.find_current_slot(slots, now), minute
+
+
+@pytest.mark.parametrize("schedule", SCHEDULES)
+def test_next_jupiter_wraps_to_the_first(schedule):
+    index = DayIndex(schedule)
+    n = len(schedule)
+    jupiters = schedule.jupiter_indexes
+    assert jupiters
+    for i in range(n):
+        # The nearest Jupiter slot strictly after i, wrapping around to the start of the day
+        expected = next(j % n for j in range(i + 1, i + 1 + n) if schedule.planets[j % n] == JUPITER)
+        assert index.next_jupiter[i] == expected
+    assert index.next_jupiter[n - 1] == jupiters[0]  # Past the last slot it wraps to the day's first Jupiter
+
+
+def test_slot_crossing_midnight():
+    schedule = _local("austin", "15/01/2026")
+    midnight = next(i for i, slot in enumerate(schedule.slots) if slot.end_minutes < slot.start_minutes)
+    index = DayIndex(schedule)
+    assert index.find(23 * 60 + 59) == index.find(0) == midnight
+    assert index.find(schedule.ends[midnight]) == midnight + 1
+
+
+def test_empty_schedule():
+    index = DayIndex(DaySchedule(4671654, "15/01/2026", "", "Austin"))
+    assert index.find(0) is None and index.next_jupiter == []
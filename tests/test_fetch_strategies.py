@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+import main
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+AUSTIN = (4671654, "America/Chicago", 30.2672, -97.7431)
+
+
+def _page(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def _unrendered(geoname_id, date_str, timezone_str, lat, lng):
+    page = _page("hora_austin_unrendered.html")
+    return main.parse_hora_page(geoname_id, date_str, main.hora_parser.parse_title(page), page)
+
+
+def _crash(*args):
+    raise TimeoutError("No browser available within 60s")
+
+
+@pytest.fixture
+def strategies(monkeypatch):
+    def use(**functions):
+        monkeypatch.setattr(main, "FETCH_STRATEGIES", list(functions))
+        monkeypatch.setattr(main, "FETCH_STRATEGY_FUNCTIONS", functions)
+    monkeypatch.setattr(main, "_cache_backend", None)
+    main._hora_cache.clear()
+    yield use
+    main._hora_cache.clear()
+
+
+def test_browser_error_is_not_masked_by_an_empty_http_page(strategies):
+    strategies(http=_unrendered, browser=_crash)
+    geoname_id, tz, lat, lng = AUSTIN
+    with pytest.raises(TimeoutError):
+        main.fetch_schedule(geoname_id, "15/01/2026", tz, lat, lng)
+
+    result = main._scrape_and_cache(geoname_id, "15/01/2026", tz, lat, lng)
+    assert result['success'] is False
+    assert "No browser available" in result['error']
+    assert main.get_cached_schedule(geoname_id, "15/01/2026", tz) is None
+
+
+def test_no_rows_from_any_strategy_is_an_error(strategies):
+    strategies(http=_unrendered, browser=_unrendered)
+    geoname_id, tz, lat, lng = AUSTIN
+    with pytest.raises(ValueError, match="No hora rows"):
+        main.fetch_schedule(geoname_id, "15/01/2026", tz, lat, lng)
+
+
+def test_full_schedule_from_fallback_strategy_wins(strategies):
+    def rendered(geoname_id, date_str, timezone_str, lat, lng):
+        page = _page("hora_austin_running.html")
+        return main.parse_hora_page(geoname_id, date_str, main.hora_parser.parse_title(page), page)
+
+    strategies(http=_unrendered, browser=rendered)
+    geoname_id, tz, lat, lng = AUSTIN
+    assert len(main.fetch_schedule(geoname_id, "15/01/2026", tz, lat, lng)) == 24
@@ -0,0 +1,42 @@
+from datetime import date, timedelta, timezone
+
+import pytest
+
+import hora_engine
+
+NEW_YORK = (40.7128, -74.0060, "America/New_York")
+
+
+@pytest.mark.parametrize("day", [date(2026, 3, 7), date(2026, 10, 31)])
+def test_night_horas_are_equal_across_dst_change(day):
+    # The nights of 7-8 March and 31 October-1 November 2026 contain New York's DST changes
+    lat, lng, tz = NEW_YORK
+    horas = hora_engine.compute_horas(day, lat, lng, tz)
+    sunset = hora_engine.sun_times(day, lat, lng, tz)[1]
+    next_sunrise = hora_engine.sun_times(day + timedelta(days=1), lat, lng, tz)[0]
+
+    night = horas[12:]
+    expected = (next_sunrise - sunset.astimezone(timezone.utc)) / 12
+    for _, start, end in night:
+        # Subtract in UTC: between datetimes with the same tzinfo Python subtracts wall-clock times
+        elapsed = end.astimezone(timezone.utc) - start.astimezone(timezone.utc)
+        assert abs(elapsed - expected) < timedelta(seconds=1)
+    assert night[-1][2] == next_sunrise
+
+
+def test_night_hora_local_times_before_spring_forward():
+    lat, lng, tz = NEW_YORK
+    planet, start, _ = hora_engine.compute_horas(date(2026, 3, 7), lat, lng, tz)[15]
+    # Wall-clock arithmetic put this hora at 21:15
+    assert planet == "Jupiter"
+    assert (start.hour, start.minute) == (21, 0)
+    assert start.utcoffset() == timedelta(hours=-5)
+
+
+def test_first_hora_is_weekday_lord():
+    lat, lng, tz = NEW_YORK
+    day = date(2026, 3, 7)  # a Saturday
+    horas = hora_engine.compute_horas(day, lat, lng, tz)
+    assert len(horas) == 24
+    assert horas[0][0] == "Saturn"
+    assert horas[0][1] == hora_engine.sun_times(day, lat, lng, tz)[0]
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+import hora_parser
+from schedule import HoraSlot
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+PAGES = ["hora_austin_running.html", "hora_austin_unrendered.html", "hora_chennai.html"]
+
+
+def _page(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("name", PAGES)
+@pytest.mark.parametrize("pad_kb", [0, 20])  # The legacy parser is quadratic on unrendered pages
+def test_matches_legacy_parser(name, pad_kb):
+    page_source = hora_parser._pad(_page(name), pad_kb)
+    assert hora_parser.parse_page(page_source) == hora_parser.legacy_parse_page(page_source)
+
+
+def test_running_page():
+    page = hora_parser.parse_page(_page("hora_austin_running.html"))
+    assert page.title == "Hora Timings for Austin, Texas, United States"
+    assert len(page.slots) == 24
+    assert page.running_hora == HoraSlot("Jupiter", "Fruitful", 1195, 1264)
+    assert page.running_hora in page.slots
+
+
+def test_page_without_running_hora():
+    page = hora_parser.parse_page(_page("hora_chennai.html"))
+    assert len(page.slots) == 24
+    assert page.running_hora is None
+
+
+def test_unrendered_page_has_no_rows():
+    page = hora_parser.parse_page(_page("hora_austin_unrendered.html"))
+    assert page.title == "Hora Timings for Austin, Texas, United States"
+    assert page.slots == () and page.running_hora is None
+
+
+def test_noon_and_midnight():
+    cell = '<span class="dpVerticalMiddleText">{}</span>'
+    page_source = "".join([
+        cell.format("Sun - Vigorous"), cell.format('12:05 <span>AM</span> <span>to </span>12:59 <span>PM</span>'),
+    ])
+    assert hora_parser.parse_slots(page_source) == (HoraSlot("Sun", "Vigorous", 5, 779),)
+
+
+@pytest.mark.parametrize("cut", [0.25, 0.5, 0.75, 0.99])
+def test_truncated_page(cut):
+    page_source = _page("hora_austin_running.html")
+    page_source = page_source[:int(len(page_source) * cut)]
+    page = hora_parser.parse_page(page_source)
+    assert page.slots == hora_parser.legacy_parse_page(page_source).slots
@@ -0,0 +1,83 @@
+import json
+import os
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import gazetteer
+import main
+from schedule import DaySchedule
+
+UNKNOWN_ID = 999999999
+
+
+@pytest.fixture
+def lenient(monkeypatch):
+    """Serve unknown IDs with the assumed timezone, scraping a locally computed page."""
+    monkeypatch.setattr(main, "GAZETTEER_STRICT", False)
+    monkeypatch.setattr(main, "_cache_backend", None)
+    main._hora_cache.clear()
+
+    def fetch_schedule(geoname_id, date_str, timezone_str, lat, lng):
+        austin = main.LOCATIONS["austin"]
+        full = main.compute_schedule_local(geoname_id, date_str, austin["timezone"], austin["lat"], austin["lng"])
+        return DaySchedule(geoname_id, date_str, full.title, "Somewhere", full.slots, full.slots[0])
+    monkeypatch.setattr(main, "fetch_schedule", fetch_schedule)
+    yield TestClient(main.app)
+    main._hora_cache.clear()
+
+
+@pytest.mark.skipif("GAZETTEER_STRICT" in os.environ, reason="GAZETTEER_STRICT is set in the environment")
+def test_strict_by_default():
+    assert main.GAZETTEER_STRICT
+
+
+@pytest.mark.parametrize("engine", ["scrape", "local", "compare"])
+def test_unknown_geoname_id_is_rejected_in_strict_mode(monkeypatch, engine):
+    monkeypatch.setattr(main, "GAZETTEER_STRICT", True)
+    with pytest.raises(HTTPException) as raised:
+        main.resolve_location(None, UNKNOWN_ID, engine)
+    assert raised.value.status_code == 404
+
+
+def test_assumed_timezone_is_marked_and_has_no_current_hora(lenient):
+    response = lenient.get("/hora", params={"geoname_id": UNKNOWN_ID, "date": "15/01/2026"})
+    assert response.status_code == 200
+    assert response.headers["X-Timezone-Assumed"] == main.ASSUMED_TIMEZONE
+    result = response.json()
+    assert result['timezone_assumed'] is True
+    assert result['current_time'] is None and result['current_hora'] is None and result['next_hora'] is None
+    assert len(result['full_schedule']) == 24
+
+
+def test_known_location_is_not_marked(lenient):
+    response = lenient.get("/hora", params={"location": "austin", "date": "15/01/2026", "engine": "local"})
+    assert response.status_code == 200
+    assert "X-Timezone-Assumed" not in response.headers
+    assert 'timezone_assumed' not in response.json()
+
+
+def test_current_hora_needs_a_known_timezone(lenient):
+    assert lenient.get("/hora/current", params={"geoname_id": UNKNOWN_ID}).status_code == 404
+
+
+def test_build_from_geonamescache_json(tmp_path):
+    cities = tmp_path / "cities15000.json"
+    cities.write_text(json.dumps({
+        "3448439": {
+            "geonameid": 3448439, "name": "São Paulo", "latitude": -23.5475, "longitude": -46.63611,
+            "countrycode": "BR", "population": 12400232, "timezone": "America/Sao_Paulo", "admin1code": "27",
+        },
+        "1": {
+            "geonameid": 1, "name": "Nowhere", "latitude": 0, "longitude": 0,
+            "countrycode": "XX", "population": 0, "timezone": "", "admin1code": "",
+        },
+    }), encoding='utf-8')
+    out = str(tmp_path / "gazetteer.db")
+
+    assert gazetteer.build(str(cities), out) == 1
+    places = gazetteer.Gazetteer(out)
+    assert places.get(3448439) == gazetteer.Place(3448439, "São Paulo", "27", "BR", -23.5475, -46.63611, "America/Sao_Paulo", 12400232)
+    assert [place.geoname_id for place in places.search("sao p")] == [3448439]
+    places.close()
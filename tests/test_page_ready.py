@@ -0,0 +1,91 @@
+from html.parser import HTMLParser
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+import hora_parser
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+# The selectors TABLE_READY_SCRIPT queries, as (tag or None, class)
+SELECTORS = {
+    'span.dpVerticalMiddleText': ("span", "dpVerticalMiddleText"),
+    '.dpPlaceholder': (None, "dpPlaceholder"),
+    '.dpPHeaderLeftTitle': (None, "dpPHeaderLeftTitle"),
+}
+VOID_TAGS = {"meta", "link", "br", "img", "input", "hr"}
+
+
+class _TextContents(HTMLParser):
+    """Collects the textContent of every element matching SELECTORS, in document order."""
+
+    def __init__(self):
+        super().__init__()
+        self.found = {selector: [] for selector in SELECTORS}
+        self._open = []  # [tag, matched selectors, text parts]
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        classes = (dict(attrs).get("class") or "").split()
+        matched = [s for s, (t, c) in SELECTORS.items() if c in classes and t in (None, tag)]
+        self._open.append([tag, matched, []])
+
+    def handle_endtag(self, tag):
+        while self._open:
+            open_tag, matched, parts = self._open.pop()
+            text = "".join(parts)
+            for selector in matched:
+                self.found[selector].append(text)
+            if self._open:
+                self._open[-1][2].append(text)
+            if open_tag == tag:
+                return
+
+    def handle_data(self, data):
+        if self._open:
+            self._open[-1][2].append(data)
+
+
+def run_ready_script(page_source: str, expect_running_hora: bool) -> bool:
+    """Evaluate TABLE_READY_SCRIPT in node against a minimal document built from the page."""
+    parser = _TextContents()
+    parser.feed(page_source)
+    program = f"""
+const found = {json.dumps(parser.found)};
+const document = {{
+    querySelectorAll: s => found[s].map(t => ({{textContent: t}})),
+    querySelector: s => found[s].length ? {{textContent: found[s][0]}} : null,
+}};
+const ready = (function () {{ {hora_parser.TABLE_READY_SCRIPT} }}).apply(null, [{json.dumps(expect_running_hora)}]);
+process.stdout.write(JSON.stringify(ready));
+"""
+    result = subprocess.run(["node", "-e", program], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def _fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="needs node to run the browser-side script")
+
+
+@pytest.mark.parametrize("expect_running_hora", [True, False])
+def test_unrendered_page_is_not_ready(expect_running_hora):
+    # 50 dpVerticalMiddleText spans and a "Running Hora" label, but only placeholders
+    assert not run_ready_script(_fixture("hora_austin_unrendered.html"), expect_running_hora)
+
+
+@pytest.mark.parametrize("expect_running_hora", [True, False])
+def test_rendered_page_is_ready(expect_running_hora):
+    assert run_ready_script(_fixture("hora_austin_running.html"), expect_running_hora)
+
+
+def test_running_hora_is_only_required_for_today():
+    page = _fixture("hora_chennai.html")  # Another day's page: no "Running Hora" block
+    assert run_ready_script(page, expect_running_hora=False)
+    assert not run_ready_script(page, expect_running_hora=True)
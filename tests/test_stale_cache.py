@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+import main
+from schedule import DaySchedule
+
+AUSTIN = (4671654, "America/Chicago", 30.2672, -97.7431)
+DATE = "15/01/2026"
+
+
+def _complete():
+    geoname_id, tz, lat, lng = AUSTIN
+    return main.compute_schedule_local(geoname_id, DATE, tz, lat, lng)
+
+
+def _partial(rows: int):
+    full = _complete()
+    return DaySchedule(full.geoname_id, full.date, full.title, full.location, full.slots[:rows])
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(main, "_cache_backend", None)
+    monkeypatch.setattr(main, "STALE_WHILE_REVALIDATE_SECONDS", 60)
+    monkeypatch.setattr(main, "STALE_IF_ERROR_SECONDS", 3600)
+    main._hora_cache.clear()
+
+    def expired(schedule: DaySchedule, seconds_ago: float):
+        main._hora_cache.set(f"{schedule.geoname_id}_{schedule.date}", schedule, ttl=-seconds_ago, stale_ttl=3600)
+    yield expired
+    main._hora_cache.clear()
+
+
+def _scrapes(monkeypatch, outcome):
+    calls = []
+
+    def fetch_schedule(*args):
+        calls.append(args)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    monkeypatch.setattr(main, "fetch_schedule", fetch_schedule)
+    return calls
+
+
+def _fetch_hora():
+    async def run():
+        result = await main.fetch_hora(*AUSTIN[:1], DATE, *AUSTIN[1:])
+        # Let any background refresh finish before the loop closes
+        while main._background_refreshes:
+            await asyncio.gather(*main._background_refreshes)
+        return result
+    return asyncio.run(run())
+
+
+def test_recently_expired_schedule_is_served_stale_and_refreshed(cache, monkeypatch):
+    cache(_complete(), seconds_ago=10)
+    calls = _scrapes(monkeypatch, _complete())
+
+    result, status = _fetch_hora()
+    assert status == "STALE"
+    assert result['stale'] and 'revalidation_error' not in result
+    assert len(calls) == 1
+    assert main._hora_cache.get_stale(f"{AUSTIN[0]}_{DATE}")[1] == 0.0  # Fresh again
+
+
+def test_failed_scrape_falls_back_to_stale_copy(cache, monkeypatch):
+    cache(_complete(), seconds_ago=600)
+    _scrapes(monkeypatch, RuntimeError("drikpanchang.com timed out"))
+
+    result, status = _fetch_hora()
+    assert status == "STALE"
+    assert result['revalidation_error'] == "drikpanchang.com timed out"
+    assert len(result['full_schedule']) == 24
+
+
+@pytest.mark.parametrize("rows", [1, 23])
+def test_incomplete_refresh_counts_as_failure_and_keeps_stale_copy(cache, monkeypatch, rows):
+    cache(_complete(), seconds_ago=600)
+    _scrapes(monkeypatch, _partial(rows))
+
+    result, status = _fetch_hora()
+    assert status == "STALE"
+    assert result['revalidation_error'] == f"Incomplete schedule: {rows} of 24 horas"
+    assert len(result['full_schedule']) == 24
+    schedule, _ = main._hora_cache.get_stale(f"{AUSTIN[0]}_{DATE}")
+    assert len(schedule) == 24
+
+
+def test_incomplete_background_refresh_keeps_stale_copy(cache, monkeypatch):
+    cache(_complete(), seconds_ago=10)
+    _scrapes(monkeypatch, _partial(5))
+
+    _, status = _fetch_hora()
+    assert status == "STALE"
+    schedule, stale_seconds = main._hora_cache.get_stale(f"{AUSTIN[0]}_{DATE}")
+    assert len(schedule) == 24 and stale_seconds > 0
+
+
+def test_incomplete_schedule_is_cached_briefly_when_nothing_better_exists(cache, monkeypatch):
+    _scrapes(monkeypatch, _partial(20))
+
+    result, status = _fetch_hora()
+    assert status == "MISS"
+    assert len(result['full_schedule']) == 20
+    assert len(main.get_cached_schedule(AUSTIN[0], DATE, AUSTIN[1])) == 20
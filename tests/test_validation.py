@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+import browser_pool
+import main
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+AUSTIN = (4671654, "America/Chicago", 30.2672, -97.7431)
+FIXTURE_DATE = "15/01/2026"
+
+
+def _fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+class PageSequenceDriver:
+    """Fake Chrome session serving the given pages, one per load."""
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.loads = 0
+        self.page_source = ""
+        self.title = ""
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == 'Emulation.setTimezoneOverride':
+            self.timezone = params['timezoneId']
+        return {}
+
+    def execute_script(self, script, *args):
+        if "resolvedOptions().timeZone" in script:
+            return self.timezone
+        return 1
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        self.page_source = self.pages[min(self.loads, len(self.pages) - 1)]
+        self.title = main.hora_parser.parse_title(self.page_source)
+        self.loads += 1
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def browser(monkeypatch):
+    monkeypatch.setattr(main, "wait_for_hora_table", lambda driver, expect_running_hora: 0.0)
+    monkeypatch.setattr(main, "record_page_load", lambda driver: None)
+    monkeypatch.setattr(main, "SCRAPE_VALIDATION_ATTEMPTS", 3)
+    # Let the fixture's schedule pass validation whatever date it was rendered for
+    monkeypatch.setattr(main, "validate_schedule", lambda schedule, *args: True)
+
+    def use(*pages):
+        driver = PageSequenceDriver(pages)
+        monkeypatch.setattr(main, "_browser_pool", browser_pool.BrowserPool(lambda: driver, size=1))
+        return driver
+    return use
+
+
+def test_unrendered_page_is_retried(browser):
+    driver = browser(_fixture("hora_austin_unrendered.html"), _fixture("hora_austin_running.html"))
+    before = dict(main._validation_stats)
+
+    schedule = main.fetch_schedule_browser(AUSTIN[0], FIXTURE_DATE, *AUSTIN[1:])
+    assert len(schedule) == 24
+    assert driver.loads == 2
+    assert main._validation_stats['incomplete'] == before['incomplete'] + 1
+    assert main._validation_stats['retries'] == before['retries'] + 1
+
+
+def test_page_that_never_renders_is_rejected(browser):
+    driver = browser(_fixture("hora_austin_unrendered.html"))
+    before = dict(main._validation_stats)
+
+    with pytest.raises(ValueError, match="only 0 of 24 horas after 3 attempts"):
+        main.fetch_schedule_browser(AUSTIN[0], FIXTURE_DATE, *AUSTIN[1:])
+    assert driver.loads == 3
+    assert main._validation_stats['rejected'] == before['rejected'] + 1
+    assert main._validation_stats['unverifiable'] == before['unverifiable']
+
+
+def test_unknown_coordinates_are_unverifiable():
+    geoname_id, tz, lat, lng = AUSTIN
+    schedule = main.compute_schedule_local(geoname_id, FIXTURE_DATE, tz, lat, lng)
+    before = main._validation_stats['unverifiable']
+    assert main.validate_schedule(schedule, tz, None, None)
+    assert main._validation_stats['unverifiable'] == before + 1